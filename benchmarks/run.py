@@ -0,0 +1,235 @@
+"""
+Offline benchmarks of GoogleSheets against the local stand-in of the Sheets API (tests/fake_sheets_server.py).
+Results are printed and written as JSON, so they can be compared across versions:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --only read
+"""
+import argparse
+import importlib.metadata
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from google_sheets_utils.bodies import collect_values_body
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.planner import coalesce_indices
+from google_sheets_utils.ranges import cells_to_a1, format_range, index_to_column
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'benchmark'
+
+
+def make_matrix(rows: int, cols: int) -> list:
+    return [[f'r{row}c{col}' for col in range(cols)] for row in range(rows)]
+
+
+def measure(fn, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return {'median_s': statistics.median(timings), 'min_s': min(timings), 'repeat': repeat}
+
+
+def bench_read(quick: bool, latency: float) -> list:
+    results = []
+    cols = 20
+    for rows in ((1000, 5000) if quick else (1000, 10000, 50000)):
+        with FakeSheetsServer({SPREADSHEET: {'data': make_matrix(rows, cols)}}, latency=latency) as server:
+            google = GoogleSheets(None, api_endpoint=server.url)
+            timing = measure(lambda: google.get_all_info_from_sheet(SPREADSHEET, 'data'), 3)
+            results.append({
+                'name': 'read.get_all_info_from_sheet',
+                'params': {'rows': rows, 'cols': cols},
+                **timing,
+                'cells_per_s': rows * cols / timing['median_s'],
+            })
+    return results
+
+
+def bench_update_by_indices(quick: bool, latency: float) -> list:
+    results = []
+    for entries in ((100, 1000) if quick else (100, 1000, 5000)):
+        # Every second row, so entries can not be merged into one block.
+        indices = [{'row': row * 2 + 1, 'col': 1, 'data': [['x', 'y', 'z']]} for row in range(entries)]
+        for chunk_size in (100, 1000):
+            with FakeSheetsServer({SPREADSHEET: {'data': []}}, latency=latency) as server:
+                google = GoogleSheets(None, api_endpoint=server.url)
+                timing = measure(
+                    lambda: google.update_sheet_by_indices(SPREADSHEET, 'data', indices, chunk_size=chunk_size), 3
+                )
+                results.append({
+                    'name': 'write.update_sheet_by_indices',
+                    'params': {'entries': entries, 'chunk_size': chunk_size},
+                    **timing,
+                    'requests': len(server.calls) // 3,
+                })
+    return results
+
+
+def bench_metadata(quick: bool, latency: float) -> list:
+    results = []
+    lookups = 100 if quick else 1000
+    sheets = {f'sheet{number}': [] for number in range(50)}
+    with FakeSheetsServer({SPREADSHEET: sheets}, latency=latency) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+
+        def cold():
+            google.invalidate_metadata(SPREADSHEET)
+            google.get_sheet_id_by_name(SPREADSHEET, 'sheet49')
+
+        def warm():
+            for _ in range(lookups):
+                google.get_sheet_id_by_name(SPREADSHEET, 'sheet49')
+                google.rows_count(SPREADSHEET, 'sheet49')
+
+        results.append({'name': 'metadata.cold_lookup', 'params': {'sheets': 50}, **measure(cold, 5)})
+        timing = measure(warm, 3)
+        results.append({
+            'name': 'metadata.warm_lookup',
+            'params': {'sheets': 50, 'lookups': lookups * 2},
+            **timing,
+            'per_lookup_us': timing['median_s'] / (lookups * 2) * 1e6,
+        })
+    return results
+
+
+_STARTUP_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+from google_sheets_utils.buid import GoogleSheets
+imported = time.perf_counter()
+google = GoogleSheets(None, api_endpoint=sys.argv[1])
+created = time.perf_counter()
+google.get_all_info_from_sheet('benchmark', 'data')
+first = time.perf_counter()
+GoogleSheets(None, api_endpoint=sys.argv[1]).get_all_info_from_sheet('benchmark', 'data')
+second = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - started, 'create_s': created - imported,
+    'first_request_s': first - created, 'second_client_first_request_s': second - first,
+}))
+'''
+
+
+def bench_startup(quick: bool, latency: float) -> list:
+    # Every run is a fresh interpreter, so nothing is imported or built yet.
+    runs = []
+    with FakeSheetsServer({SPREADSHEET: {'data': [['a']]}}, latency=latency) as server:
+        for _ in range(3 if quick else 7):
+            output = subprocess.run(
+                [sys.executable, '-c', _STARTUP_SCRIPT, server.url], capture_output=True, text=True, check=True
+            ).stdout
+            runs.append(json.loads(output))
+    return [{
+        'name': 'startup',
+        'params': {'runs': len(runs)},
+        **{key: statistics.median(run[key] for run in runs) for key in runs[0]},
+    }]
+
+
+def bench_ranges(quick: bool, latency: float) -> list:
+    # Pure CPU: A1 encoding of a plan with one entry per cell, "latency" is not used.
+    cells = 20000 if quick else 100000
+    pairs = [(row, col) for row in range(1, cells // 20 + 1) for col in range(1, 21)]
+    indices = [{'row': row, 'col': col, 'data': [['x']]} for row, col in pairs]
+    candidates = {
+        'ranges.cells_to_a1': lambda: cells_to_a1(pairs),
+        'ranges.index_to_column_per_cell': lambda: [index_to_column(col) + str(row) for row, col in pairs],
+        'ranges.collect_values_body': lambda: collect_values_body(indices, 'My sheet', 'RAW', 'ROWS'),
+        'ranges.format_range_per_entry': lambda: [format_range('My sheet', row, col, row, col) for row, col in pairs],
+    }
+    try:
+        from gspread.utils import rowcol_to_a1
+    except ImportError:
+        pass
+    else:
+        candidates['ranges.gspread_rowcol_to_a1'] = lambda: [rowcol_to_a1(row, col) for row, col in pairs]
+        # What "collect_values_body" did before: two gspread calls and string concatenation per entry.
+        candidates['ranges.gspread_body'] = lambda: [
+            {'range': 'My sheet!' + rowcol_to_a1(row, col) + ':' + rowcol_to_a1(row, col), 'values': [['x']]}
+            for row, col in pairs
+        ]
+    results = []
+    for name, function in candidates.items():
+        timing = measure(function, 5)
+        results.append({
+            'name': name,
+            'params': {'cells': cells},
+            **timing,
+            'cells_per_s': cells / timing['median_s'],
+        })
+    return results
+
+
+def bench_planner(quick: bool, latency: float) -> list:
+    # Pure CPU. A large rectangle must cost about as much with coalescing as without it (it is passed through),
+    # small scattered cells are merged.
+    rows = 20000 if quick else 100000
+    block = [{'row': 1, 'col': 1, 'data': make_matrix(rows, 20)}]
+    cells = [{'row': row, 'col': col, 'data': [['x']]} for row in range(1, rows // 20 + 1) for col in range(1, 21)]
+    results = []
+    for name, indices in (('planner.large_block', block), ('planner.single_cells', cells)):
+        timing = measure(lambda: coalesce_indices(indices), 3)
+        baseline = measure(lambda: collect_values_body(indices, 'data', 'RAW', 'ROWS'), 3)
+        results.append({
+            'name': name,
+            'params': {'cells': rows * 20},
+            **timing,
+            'without_coalescing_s': baseline['median_s'],
+            'blocks': len(coalesce_indices(indices)),
+        })
+    return results
+
+
+BENCHMARKS = {
+    'read': bench_read,
+    'update_by_indices': bench_update_by_indices,
+    'metadata': bench_metadata,
+    'startup': bench_startup,
+    'ranges': bench_ranges,
+    'planner': bench_planner,
+}
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='Path of the JSON file with results.')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS), help='Run only these benchmarks.')
+    parser.add_argument('--quick', action='store_true', help='Smaller sizes for a smoke run.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latency of the fake API in seconds.')
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        for result in BENCHMARKS[name](args.quick, args.latency):
+            print(json.dumps(result), flush=True)
+            results.append(result)
+
+    try:
+        version = importlib.metadata.version('google_sheets_api')
+    except importlib.metadata.PackageNotFoundError:
+        version = None
+    report = {
+        'version': version,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'latency_s': args.latency,
+        'quick': args.quick,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    main()
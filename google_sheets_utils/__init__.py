@@ -1,15 +1,45 @@
-import os.path
-import gspread
-import time
-import time
-from ssl import SSLError
-from typing import Any, List
-import gspread.utils
-from googleapiclient.errors import HttpError
-from googleapiclient.http import HttpRequest
-from google.auth.transport.requests import AuthorizedSession
-from google.oauth2.service_account import Credentials
-from google_sheets_utils.errors import *
-from google_sheets_utils.text_handler import all_to_low_and_del_spc as to_low
-from ssl import SSLError
-from googleapiclient.discovery import build
+"""
+Utilities for the Google Sheets API. Submodules and names below are imported on first access,
+so "import google_sheets_utils" does not load the Google client libraries.
+"""
+import importlib
+
+# name -> (module, attribute). Kept for code that used "from google_sheets_utils import *".
+_LAZY = {
+    'GoogleSheets': ('google_sheets_utils.buid', 'GoogleSheets'),
+    'AsyncGoogleSheets': ('google_sheets_utils.async_client', 'AsyncGoogleSheets'),
+    'to_low': ('google_sheets_utils.text_handler', 'all_to_low_and_del_spc'),
+    'os': ('os', None),
+    'time': ('time', None),
+    'gspread': ('gspread', None),
+    'SSLError': ('ssl', 'SSLError'),
+    'Any': ('typing', 'Any'),
+    'List': ('typing', 'List'),
+    'HttpError': ('googleapiclient.errors', 'HttpError'),
+    'HttpRequest': ('googleapiclient.http', 'HttpRequest'),
+    'Credentials': ('google.oauth2.service_account', 'Credentials'),
+    'build': ('googleapiclient.discovery', 'build'),
+}
+_ERRORS = (
+    'CustomError', 'ForbiddenError', 'NotFoundError', 'UnauthorizedError', 'BadRequestError', 'InternalServerError',
+    'TooManyRequestsError', 'ServiceUnavailableError', 'RetriesExhaustedError', 'STATUS_ERRORS', 'http_status',
+    'exceptions_handler_for_requests',
+)
+_LAZY.update({name: ('google_sheets_utils.errors', name) for name in _ERRORS})
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module_name, attribute = _LAZY[name]
+    value = importlib.import_module(module_name)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,159 @@
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+_FLUSH = object()
+_CLOSE = object()
+
+
+def _row_bytes(row: list) -> int:
+    # Rough size of the row in the JSON body.
+    return sum(len(str(value)) + 3 for value in row) + 2
+
+
+class Appender:
+    """
+    Background pipeline that appends rows to the end of a worksheet. Rows from any number of producer threads
+    are put into a bounded queue, a flusher thread sends them in batches with "values().append" (INSERT_ROWS),
+    so concurrent writers never compete for a hand-computed range. When the queue is full, "append" blocks.
+
+        with google.appender(spreadsheet, 'log') as appender:
+            appender.append(['2024-01-01 10:00', 'started'])
+    """
+
+    def __init__(
+            self, client, spreadsheet: str, worksheet: str, max_rows: int = 1000, max_bytes: int = 1000000,
+            max_delay: float = 1.0, queue_size: int = 10000, value_input_option: str = 'USER_ENTERED',
+            on_error: Optional[Callable[[list, Exception], None]] = None
+    ):
+        """
+        :param client: GoogleSheets instance used to send the requests.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name. (string)
+        :param max_rows: Maximum number of rows in one request. (int)
+        :param max_bytes: Maximum estimated size of the rows of one request in bytes. (int)
+        :param max_delay: Maximum time in seconds a row waits for its batch to fill up. (float)
+        :param queue_size: Maximum number of rows waiting in the queue. (int)
+        :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string)
+        :param on_error: Function called with the rows and the exception of a failed batch. If not specified
+        (or if it raises), failed batches are collected in "errors" as (rows, exception). (callable | None)
+        """
+        self.client = client
+        self.spreadsheet = spreadsheet
+        self.worksheet = worksheet
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.value_input_option = value_input_option
+        self.on_error = on_error
+        self.errors = []
+        self.sent_rows = 0
+        self._queue = queue.Queue(queue_size)
+        self._closed = False
+        # Puts in progress. "close" waits for them, so no row lands in the queue behind the CLOSE marker.
+        self._puts = 0
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self.__run, name=f'appender-{worksheet}', daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'Appender':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def append(self, row: list, timeout: Optional[float] = None) -> None:
+        """
+        Queues a row. Blocks while the queue is full.
+        :param row: Row values. (list)
+        :param timeout: Maximum time to wait for free space in seconds, queue.Full is raised after it. (float | None)
+        """
+        self.__put(row, timeout)
+
+    def append_many(self, rows: Iterable[list], timeout: Optional[float] = None) -> None:
+        for row in rows:
+            self.append(row, timeout)
+
+    def flush(self) -> None:
+        """
+        Sends queued rows without waiting for "max_delay" and waits until all of them are sent.
+        Raises RuntimeError after "close".
+        """
+        self.__put(_FLUSH)
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Sends the remaining rows and stops the flusher thread. Called on exit from the "with" block.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.wait_for(lambda: not self._puts)
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def __put(self, item, timeout: Optional[float] = None) -> None:
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Appender is closed')
+            self._puts += 1
+        try:
+            self._queue.put(item, timeout=timeout)
+        finally:
+            with self._condition:
+                self._puts -= 1
+                self._condition.notify_all()
+
+    def __run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _FLUSH or item is _CLOSE:
+                self._queue.task_done()
+                if item is _CLOSE:
+                    return
+                continue
+            batch, marker = self.__collect(item)
+            self.__send(batch)
+            for _ in range(len(batch) + (marker is not None)):
+                self._queue.task_done()
+            if marker is _CLOSE:
+                return
+
+    def __collect(self, first: list) -> tuple:
+        # Takes rows from the queue until a threshold is hit. Returns the batch and a FLUSH/CLOSE marker if met.
+        batch = [first]
+        size = _row_bytes(first)
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_rows and size < self.max_bytes:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _FLUSH or item is _CLOSE:
+                return batch, item
+            batch.append(item)
+            size += _row_bytes(item)
+        return batch, None
+
+    def __send(self, batch: list) -> None:
+        try:
+            self.client.append_rows(self.spreadsheet, self.worksheet, batch, self.value_input_option)
+        except Exception as error:
+            self.__report(batch, error)
+            return
+        self.sent_rows += len(batch)
+
+    def __report(self, batch: list, error: Exception) -> None:
+        if self.on_error is not None:
+            try:
+                self.on_error(batch, error)
+                return
+            except Exception as callback_error:
+                error = callback_error
+        self.errors.append((batch, error))
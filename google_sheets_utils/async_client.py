@@ -0,0 +1,485 @@
+import asyncio
+import json
+from copy import deepcopy
+from typing import Optional, Union, List
+from urllib.parse import quote
+
+import httplib2
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+from googleapiclient.errors import HttpError
+
+from google_sheets_utils.buid import SCOPES, GoogleSheets
+from google_sheets_utils.bodies import (
+    add_sheet_request, clear_range_request, collect_values_body, delete_sheet_request, rename_sheet_request, values_body
+)
+from google_sheets_utils.chunking import (
+    DEFAULT_MAX_BYTES, DEFAULT_MAX_CELLS, is_payload_too_large, plan_chunks, split_chunk
+)
+from google_sheets_utils.metadata import MetadataCache, SHEETS_PROPERTIES_FIELDS
+from google_sheets_utils.planner import plan_blocks
+from google_sheets_utils.ranges import format_range
+from google_sheets_utils.rate_limiter import QuotaLimiter
+from google_sheets_utils.retry import RETRY_EXCEPTIONS, UNSENT_EXCEPTIONS, RetryPolicy, is_idempotent_body
+from google_sheets_utils.single_flight import AsyncSingleFlight, copy_values
+from google_sheets_utils.table import Table
+from google_sheets_utils.token_cache import FileTokenCache
+from google_sheets_utils.text_handler import all_to_low_and_del_spc as to_low
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+DEFAULT_API_ENDPOINT = 'https://sheets.googleapis.com'
+
+
+class AsyncGoogleSheets:
+    """
+    Asyncio version of GoogleSheets. All requests share one aiohttp connection pool,
+    the number of requests in flight is limited by "max_concurrency".
+    Requires "aiohttp" (pip install google_sheets_api[async]).
+
+    Use as an async context manager or call "close()" when done:
+        async with AsyncGoogleSheets(creds_path) as google:
+            names = await google.get_sheets_name(spreadsheet)
+    """
+
+    def __init__(
+            self, creds_path: Optional[str], max_concurrency: int = 50, pool_size: int = 100,
+            timeout: float = 60.0, metadata_ttl: float = 60.0, metadata_cache_size: int = 128,
+            api_endpoint: Optional[str] = None, rate_limiter: Optional[QuotaLimiter] = None,
+            retry_policy: Optional[RetryPolicy] = None, single_flight: bool = True,
+            token_cache: Optional[FileTokenCache] = None
+    ):
+        """
+        :param creds_path: Path to the service account file. If None, requests are sent without credentials
+        (for local stand-ins of the API). (string | None)
+        :param max_concurrency: Maximum number of requests in flight at once. (int)
+        :param pool_size: Maximum number of open connections in the pool. (int)
+        :param timeout: Total timeout of one HTTP request in seconds. (float)
+        :param metadata_ttl: Lifetime of cached spreadsheet metadata in seconds. (float)
+        :param metadata_cache_size: Maximum number of spreadsheets with cached metadata. (int)
+        :param api_endpoint: Base URL of the Sheets API. Default is "https://sheets.googleapis.com". (string | None)
+        :param rate_limiter: Client-side quota limiter. Requests wait for quota instead of failing with 429.
+        (QuotaLimiter | None)
+        :param retry_policy: Retry policy for all requests. By default aiohttp connection errors
+        are retried as well. (RetryPolicy | None)
+        :param single_flight: Identical reads awaited concurrently share one request and its result.
+        A read started after a write through this client never joins an older read. (bool)
+        :param token_cache: File shared by the worker processes of one machine that holds the access token.
+        (FileTokenCache | None)
+        """
+        if aiohttp is None:
+            raise ImportError('AsyncGoogleSheets requires "aiohttp": pip install google_sheets_api[async]')
+        self.creds = Credentials.from_service_account_file(creds_path, scopes=SCOPES) if creds_path else None
+        if self.creds is not None and token_cache is not None:
+            self.creds = token_cache.wrap(self.creds)
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.api_endpoint = (api_endpoint or DEFAULT_API_ENDPOINT).rstrip('/')
+        self.metadata_cache = MetadataCache(metadata_ttl, metadata_cache_size)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy(
+            retry_exceptions=RETRY_EXCEPTIONS + (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                                                 asyncio.TimeoutError),
+            unsent_exceptions=UNSENT_EXCEPTIONS + (aiohttp.ClientConnectorError,)
+        )
+        self._session = None
+        self._semaphore = None
+        self._creds_lock = None
+        self._flights = AsyncSingleFlight() if single_flight else None
+
+    get_columns_indices = staticmethod(GoogleSheets.get_columns_indices)
+
+    async def __aenter__(self) -> 'AsyncGoogleSheets':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Closes the connection pool.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def __get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._creds_lock = asyncio.Lock()
+        return self._session
+
+    async def __headers(self) -> dict:
+        headers = {'Content-Type': 'application/json'}
+        if self.creds is None:
+            return headers
+        if not self.creds.valid:
+            async with self._creds_lock:
+                if not self.creds.valid:
+                    await asyncio.get_running_loop().run_in_executor(None, self.creds.refresh, Request())
+        headers['Authorization'] = f'Bearer {self.creds.token}'
+        return headers
+
+    async def __request(
+            self, method: str, path: str, params: Optional[list] = None, body: Optional[dict] = None,
+            idempotent: bool = True
+    ) -> dict:
+        session = self.__get_session()
+        url = f'{self.api_endpoint}/v4/spreadsheets/{path}'
+        params = [(key, value) for key, value in (params or []) if value is not None]
+        data = json.dumps(body) if body is not None else None
+
+        async def attempt():
+            if self.rate_limiter:
+                delay = self.rate_limiter.reserve('read' if method == 'GET' else 'write')
+                if delay:
+                    await asyncio.sleep(delay)
+            async with self._semaphore:
+                headers = await self.__headers()
+                async with session.request(method, url, params=params, headers=headers, data=data) as response:
+                    content = await response.read()
+                    if response.status >= 400:
+                        info = {'status': response.status}
+                        if 'Retry-After' in response.headers:
+                            info['retry-after'] = response.headers['Retry-After']
+                        raise HttpError(httplib2.Response(info), content, uri=url)
+                    return json.loads(content)
+
+        return await self.retry_policy.run_async(attempt, idempotent)
+
+    async def __req_update(self, spreadsheet: str, body: dict) -> dict:
+        try:
+            return await self.__request('POST', f'{spreadsheet}/values:batchUpdate', body=body)
+        finally:
+            self.__forget_reads(spreadsheet)
+            self.metadata_cache.invalidate_grown(spreadsheet, body['data'])
+
+    async def __req_get(
+            self, spreadsheet: str, range_: str, value_render_option: Optional[str] = None,
+            major_dimension: Optional[str] = None
+    ) -> list:
+        async def read() -> list:
+            response = await self.__request(
+                'GET', f'{spreadsheet}/values/{quote(range_, safe="")}',
+                [('valueRenderOption', value_render_option), ('majorDimension', major_dimension)]
+            )
+            return response.get('values')
+
+        return await self.__single_flight(
+            (spreadsheet, 'get', range_, value_render_option, major_dimension), read, copy_values
+        )
+
+    async def __req_get_info(self, spreadsheet: str, fields: Optional[str] = None) -> dict:
+        return await self.__single_flight(
+            (spreadsheet, 'info', fields), lambda: self.__request('GET', spreadsheet, [('fields', fields)]), deepcopy
+        )
+
+    async def __req_update_info(self, spreadsheet: str, body: dict) -> dict:
+        try:
+            return await self.__request(
+                'POST', f'{spreadsheet}:batchUpdate', body=body, idempotent=is_idempotent_body(body)
+            )
+        finally:
+            self.__forget_reads(spreadsheet)
+
+    async def __single_flight(self, key: tuple, read, copy):
+        if self._flights is None:
+            return await read()
+        return await self._flights.do(key, read, copy)
+
+    def __forget_reads(self, spreadsheet: Optional[str] = None) -> None:
+        # Reads started after a write must not join reads that were sent before it.
+        if self._flights is not None:
+            self._flights.forget(spreadsheet)
+
+    async def __get_sheets_properties(self, spreadsheet: str) -> list:
+        sheets = self.metadata_cache.get(spreadsheet)
+        if sheets is None:
+            response = await self.__req_get_info(spreadsheet, SHEETS_PROPERTIES_FIELDS)
+            sheets = [sheet.get('properties') for sheet in response.get('sheets', [])]
+            self.metadata_cache.set(spreadsheet, sheets)
+        return sheets
+
+    def invalidate_metadata(self, spreadsheet: Optional[str] = None) -> None:
+        """
+        Drops cached metadata (sheet titles, IDs and grid sizes) of the spreadsheet.
+        :param spreadsheet: Spreadsheet ID. If not specified, metadata of all spreadsheets is dropped. (string | None)
+        """
+        self.metadata_cache.invalidate(spreadsheet)
+        self.__forget_reads(spreadsheet)
+
+    async def get_sheets_name(self, spreadsheet: str) -> list:
+        """
+        Gets the list of sheets names in spreadsheet.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :return: List with sheet names.
+        """
+        return [sheet.get('title') for sheet in await self.__get_sheets_properties(spreadsheet)]
+
+    async def rows_count(self, spreadsheet: str, worksheet: Union[str, List[str]]) -> int:
+        """
+        Gets the total number of rows in the specified worksheets.
+        :param spreadsheet: Spreadsheet ID.
+        :param worksheet: String or list with worksheet name.
+        :return: Total number of rows from specified worksheets.
+        """
+        return sum(
+            sheet.get('gridProperties').get('rowCount')
+            for sheet in await self.__get_sheets_properties(spreadsheet) if sheet.get('title') in worksheet
+        )
+
+    async def columns_count(self, spreadsheet: str, worksheet: Union[str, List[str]]) -> int:
+        """
+        Gets the total number of columns in the specified worksheets.
+        :param spreadsheet: Spreadsheet ID.
+        :param worksheet: String or list with worksheet name.
+        :return: Total number of columns from specified worksheets.
+        """
+        return sum(
+            sheet.get('gridProperties').get('columnCount')
+            for sheet in await self.__get_sheets_properties(spreadsheet) if sheet.get('title') in worksheet
+        )
+
+    async def get_sheet_id_by_name(self, spreadsheet: str, sheet_name: str) -> Optional[int]:
+        """
+        Function for getting the ID of the sheet by its name.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param sheet_name: Sheet name. (string)
+        :return: Returns the ID of the sheet.
+        """
+        for sheet in await self.__get_sheets_properties(spreadsheet):
+            if sheet.get('title') == sheet_name:
+                return sheet.get('sheetId')
+        return None
+
+    async def get_all_info_from_sheet(
+            self, spreadsheet: str, worksheet: str, value_render_option: Optional[str] = None,
+            major_dimension: Optional[str] = None, as_table: bool = False
+    ) -> Union[list, Table]:
+        """
+        Function get all info from spreadsheet.
+        :param spreadsheet: spreadsheet ID.
+        :param worksheet: worksheet name.
+        :param value_render_option: ValueRenderOption. Can take values "FORMATTED_VALUE", "UNFORMATTED_VALUE", "FORMULA"
+        :param major_dimension: Dimension. Can take values "ROWS", "COLUMNS". (string | None)
+        :param as_table: Return a column-wise Table instead of a matrix. (bool)
+        :return: All data from the table as a matrix.
+        """
+        values = await self.__req_get(spreadsheet, worksheet, value_render_option, major_dimension)
+        if as_table:
+            return Table(values, major_dimension, value_render_option == 'UNFORMATTED_VALUE')
+        return values
+
+    async def get_columns_names(
+            self, spreadsheet: str, worksheet: str, value_render_option: Optional[str] = None
+    ) -> list:
+        """
+        Function for getting the names of the columns in the table.
+        :param spreadsheet: Spreadsheet ID.
+        :param worksheet: Worksheet name.
+        :param value_render_option: ValueRenderOption. Can take values "FORMATTED_VALUE", "UNFORMATTED_VALUE", "FORMULA"
+        :return: List with column names.
+        """
+        first_row = await self.__req_get(spreadsheet, format_range(worksheet, 1, None, 1, None), value_render_option)
+        return first_row[0]
+
+    async def get_column_index_by_column_name(
+            self, spreadsheet: str, worksheet: str, column_name: str
+    ) -> Optional[int]:
+        """
+        Function for getting the index of the column by its name.
+        :param spreadsheet: Spreadsheet ID.
+        :param worksheet: Worksheet name.
+        :param column_name: Column name.
+        :return: Returns index of the column
+        """
+        columns = await self.get_columns_names(spreadsheet, worksheet)
+        if columns and column_name in columns:
+            return columns.index(column_name)
+        return None
+
+    async def get_column_index_by_name(
+            self, spreadsheet: Optional[str], worksheet: Optional[str],
+            column_name: str, columns_row: Optional[list] = None
+    ) -> Optional[int]:
+        """
+        Function for getting the index of the column by its name.
+        Must be specified spreadsheet and worksheet or the column_row.
+        :param spreadsheet: Spreadsheet ID.
+        :param worksheet: Worksheet name.
+        :param column_name: Column name.
+        :param columns_row: Row with column names from table. If not specified, the first row is used.
+        :return: Index of the column.
+        """
+        if not columns_row:
+            columns_row = await self.get_columns_names(spreadsheet, worksheet)
+        return [to_low(elem) for elem in columns_row].index(to_low(column_name))
+
+    async def get_data_by_column_name(
+            self, spreadsheet: str, worksheet: str, col_name: str, value_render_option: Optional[str] = None,
+            like_matrix: bool = False
+    ) -> Optional[list]:
+        """
+        Allows you to retrieve data from the specified column. Tabs and spaces are omitted.
+        :param spreadsheet: Spreadsheet ID.
+        :param worksheet: Worksheet name.
+        :param col_name: Column name with data.
+        :param value_render_option: ValueRenderOption. Can take values "FORMATTED_VALUE", "UNFORMATTED_VALUE", "FORMULA"
+        :param like_matrix: Return as a matrix or as a regular list.
+        :return: List with data.
+        """
+        all_data = await self.__req_get(spreadsheet, worksheet, value_render_option)
+        first_row = [to_low(elem) for elem in all_data[0]]
+        if to_low(col_name) not in first_row:
+            return None
+        index = first_row.index(to_low(col_name))
+        if like_matrix:
+            return [[row[index]] for row in all_data]
+        return [row[index] for row in all_data]
+
+    async def create_new_sheet(self, spreadsheet: str, sheet_name: str) -> dict:
+        """
+        Function for creating a new sheet in the spreadsheet.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param sheet_name: Sheet name. (string)
+        :return: Returns a dictionary with a response from the Google Sheets API.
+        """
+        response = await self.__req_update_info(spreadsheet, {'requests': [add_sheet_request(sheet_name)]})
+        try:
+            self.metadata_cache.add_sheet(spreadsheet, response['replies'][0]['addSheet']['properties'])
+        except (KeyError, IndexError, TypeError):
+            self.metadata_cache.invalidate(spreadsheet)
+        return response
+
+    async def delete_sheet(
+            self, spreadsheet: str, sheet_name: Optional[str] = None, sheet_id: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Function for deleting a sheet in the spreadsheet.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param sheet_name: Sheet name. (string)
+        :param sheet_id: Need to specify the sheet ID if the sheet name is not unique. (int | None)
+        :return: Returns a dictionary with a response from the Google Sheets API.
+        """
+        if sheet_name and not sheet_id:
+            sheet_id = await self.get_sheet_id_by_name(spreadsheet, sheet_name)
+        if not sheet_id:
+            return None
+
+        response = await self.__req_update_info(spreadsheet, {'requests': [delete_sheet_request(sheet_id)]})
+        self.metadata_cache.remove_sheet(spreadsheet, sheet_id)
+        return response
+
+    async def rename_sheet(self, spreadsheet: str, old_name: str, new_name: str) -> Optional[dict]:
+        """
+        Function for renaming a sheet in the spreadsheet.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param old_name: Old sheet name. (string)
+        :param new_name: New sheet name. (string)
+        :return: Returns a dictionary with a response from the Google Sheets API.
+        """
+        if old_name == new_name:
+            return None
+        old_sheet_id = await self.get_sheet_id_by_name(spreadsheet, old_name)
+        if old_sheet_id is None:
+            return None
+
+        body = {'requests': [rename_sheet_request(old_sheet_id, new_name)]}
+        response = await self.__req_update_info(spreadsheet, body)
+        self.metadata_cache.rename_sheet(spreadsheet, old_sheet_id, new_name)
+        return response
+
+    async def clear_range(
+            self, spreadsheet: str, start_row: int, end_row: int, start_col: int, end_col: int,
+            sheet_name: Optional[str] = None, sheet_id: Optional[int] = None,
+    ) -> Optional[dict]:
+        """
+        Function for clearing a range in the spreadsheet.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param start_row: Start row. (int)
+        :param end_row: End row. (int)
+        :param start_col: Start column. (int)
+        :param end_col: End column. (int)
+        :param sheet_name: Sheet name. (string)
+        :param sheet_id: Need to specify the sheet ID if the sheet name is not unique. (int | None)
+        :return: Returns a dictionary with a response from the Google Sheets API.
+        """
+        if sheet_name and not sheet_id:
+            sheet_id = await self.get_sheet_id_by_name(spreadsheet, sheet_name)
+        if not sheet_id:
+            return None
+
+        body = {'requests': [clear_range_request(sheet_id, start_row, end_row, start_col, end_col)]}
+        return await self.__req_update_info(spreadsheet, body)
+
+    async def update_sheet(
+            self, spreadsheet: str, range_: str,
+            data: list, value_input_option: str = 'USER_ENTERED',
+            major_dimension: str = 'DIMENSION_UNSPECIFIED'
+    ) -> dict:
+        """
+        Writes data to the table relative to the specified diapason.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param range_: Range for writing. Exemple: "Sheet1!A1:C3". (string)
+        :param data: Data to be written. (list)
+        :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string | None)
+        :param major_dimension: majorDimension. Can take values "ROWS", "COLUMNS".
+        :return: Returns a dictionary with a response from the Google Sheets API.
+        """
+        return await self.__req_update(spreadsheet, values_body(range_, data, value_input_option, major_dimension))
+
+    async def update_sheet_by_indices(
+            self, spreadsheet: str, worksheet: str,
+            indices: list, value_input_option: str = 'USER_ENTERED',
+            major_dimension: str = 'DIMENSION_UNSPECIFIED', chunk_size: int = 1000, coalesce: bool = True,
+            max_bytes: int = DEFAULT_MAX_BYTES, max_cells: int = DEFAULT_MAX_CELLS
+    ) -> List[dict]:
+        """
+        Enters data into the table with respect to
+        indices and values specified in the 'indices' dictionary.
+        Requests are filled up to "chunk_size" ranges, "max_bytes" of serialized values and "max_cells" cells,
+        as in GoogleSheets.update_sheet_by_indices. The requests are sent concurrently only with coalesce=True
+        and when no two blocks share a cell, otherwise one after another, so later entries overwrite earlier ones.
+        :param chunk_size: Maximum number of value ranges in one request.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name. (string)
+        :param indices: List with dictionary with index and data indices = [{'col': int, 'data': list}]
+        :param major_dimension: majorDimension. Can take values "ROWS", "COLUMNS".
+        :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string | None)
+        :param coalesce: Merge adjacent entries into rectangular blocks before sending. (bool)
+        :param max_bytes: Maximum serialized size of the values of one request in bytes. (int)
+        :param max_cells: Maximum number of cells in one request. (int)
+        :return: List with responses from the Google Sheets API, in chunk order.
+        """
+        disjoint = False
+        if coalesce:
+            indices, disjoint = plan_blocks(indices, major_dimension)
+            major_dimension = 'ROWS'
+        data = collect_values_body(indices, worksheet, value_input_option, major_dimension)['data']
+        chunks = list(plan_chunks(data, chunk_size, max_bytes, max_cells))
+        if disjoint:
+            results = await asyncio.gather(
+                *(self.__send_chunk(spreadsheet, chunk, value_input_option) for chunk in chunks)
+            )
+        else:
+            results = [await self.__send_chunk(spreadsheet, chunk, value_input_option) for chunk in chunks]
+        return [response for result in results for response in result]
+
+    async def __send_chunk(self, spreadsheet: str, chunk: List[dict], value_input_option: str) -> List[dict]:
+        try:
+            return [await self.__req_update(spreadsheet, {'valueInputOption': value_input_option, 'data': chunk})]
+        except Exception as error:
+            halves = split_chunk(chunk) if is_payload_too_large(error) else None
+            if not halves:
+                raise
+        return [
+            response for half in halves for response in await self.__send_chunk(spreadsheet, half, value_input_option)
+        ]
@@ -0,0 +1,169 @@
+import threading
+import time
+from typing import Optional, List
+
+from google_sheets_utils.bodies import collect_values_body
+from google_sheets_utils.planner import coalesce_indices
+from google_sheets_utils.ranges import contains, intersect, parse_range
+
+
+def _footprint(range_: str, values: list, major_dimension: str) -> Optional[tuple]:
+    """
+    Returns (worksheet, start_row, start_col, end_row, end_col) of the cells written by a value range,
+    or None if the range can not be parsed or the data does not fill a full rectangle.
+    """
+    parsed = parse_range(range_)
+    if parsed is None or parsed[1] is None or parsed[2] is None or not values or None in values:
+        return None
+    width = len(values[0])
+    if not width or any(len(row) != width or None in row for row in values):
+        return None
+    worksheet, start_row, start_col = parsed[:3]
+    height = len(values)
+    if major_dimension == 'COLUMNS':
+        height, width = width, height
+    return worksheet, start_row, start_col, start_row + height - 1, start_col + width - 1
+
+
+class BatchWriter:
+    """
+    Collects value writes to one spreadsheet and sends them as few "values().batchUpdate" requests as possible.
+    Writes that are completely overwritten by a later write are dropped (last writer wins).
+    Buffered writes are flushed on exit from the "with" block, or earlier when one of the thresholds is hit.
+    If the block raises, nothing is sent: the writes stay buffered and can be sent with "flush".
+
+        with google.batch_writer(spreadsheet) as writer:
+            writer.update_sheet('Sheet1!A1', [['status']])
+            writer.update_sheet_by_indices('Sheet2', [{'col': 2, 'row': 5, 'data': [['done']]}])
+    """
+
+    def __init__(
+            self, client, spreadsheet: str, max_ranges: int = 1000, max_cells: int = 100000,
+            max_delay: Optional[float] = None
+    ):
+        """
+        :param client: GoogleSheets instance used to send the requests.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param max_ranges: Maximum number of value ranges in one request. Reaching it triggers a flush. (int)
+        :param max_cells: Maximum number of cells in one request. Reaching it triggers a flush. (int)
+        :param max_delay: Maximum time in seconds a write may stay in the buffer. There is no timer: the age of
+        the buffer is checked on each new write, so the last writes wait for the next write or "flush". (float | None)
+        """
+        self.client = client
+        self.spreadsheet = spreadsheet
+        self.max_ranges = max_ranges
+        self.max_cells = max_cells
+        self.max_delay = max_delay
+        self.responses = []
+        self._pending = []
+        self._cells = 0
+        self._first_write = None
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> 'BatchWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def update_sheet(
+            self, range_: str, data: list, value_input_option: str = 'USER_ENTERED',
+            major_dimension: str = 'DIMENSION_UNSPECIFIED'
+    ) -> None:
+        """
+        Buffers data to be written relative to the specified diapason.
+        :param range_: Range for writing. Exemple: "Sheet1!A1:C3". (string)
+        :param data: Data to be written. (list)
+        :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string)
+        :param major_dimension: majorDimension. Can take values "ROWS", "COLUMNS".
+        """
+        self.__add(value_input_option, [{'range': range_, 'majorDimension': major_dimension, 'values': data}])
+
+    def update_sheet_by_indices(
+            self, worksheet: str, indices: list, value_input_option: str = 'USER_ENTERED',
+            major_dimension: str = 'DIMENSION_UNSPECIFIED'
+    ) -> None:
+        """
+        Buffers data to be written with respect to indices, same as GoogleSheets.update_sheet_by_indices.
+        :param worksheet: Worksheet name. (string)
+        :param indices: List with dictionary with index and data indices = [{'col': int, 'row': int, 'data': list}]
+        :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string)
+        :param major_dimension: majorDimension. Can take values "ROWS", "COLUMNS".
+        """
+        body = collect_values_body(coalesce_indices(indices, major_dimension), worksheet, value_input_option, 'ROWS')
+        self.__add(value_input_option, body['data'])
+
+    def flush(self) -> List[dict]:
+        """
+        Sends all buffered writes. If a request fails, the writes of it and of the following requests
+        stay in the buffer and the exception is raised.
+        :return: List with responses from the Google Sheets API for this flush.
+        """
+        with self._lock:
+            requests = self.__plan(self._pending)
+            responses = []
+            try:
+                for value_input_option, data in requests:
+                    responses.append(self.client.batch_update_values(self.spreadsheet, data, value_input_option))
+            finally:
+                self.responses.extend(responses)
+                self._pending = [
+                    (value_input_option, value_range)
+                    for value_input_option, data in requests[len(responses):] for value_range in data
+                ]
+                self._cells = sum(len(row) for _, value_range in self._pending for row in value_range['values'])
+                self._first_write = time.monotonic() if self._pending else None
+            return responses
+
+    def __add(self, value_input_option: str, data: list) -> None:
+        with self._lock:
+            if self._first_write is None:
+                self._first_write = time.monotonic()
+            for value_range in data:
+                self._pending.append((value_input_option, value_range))
+                self._cells += sum(len(row) for row in value_range['values'])
+            if (
+                    len(self._pending) >= self.max_ranges or self._cells >= self.max_cells
+                    or (self.max_delay is not None and time.monotonic() - self._first_write >= self.max_delay)
+            ):
+                self.flush()
+
+    def __plan(self, pending: list) -> list:
+        # Walk backwards so that each write is checked against the writes made after it.
+        kept = []
+        later = []
+        for value_input_option, value_range in reversed(pending):
+            footprint = _footprint(value_range['range'], value_range['values'], value_range.get('majorDimension'))
+            if footprint is not None and any(contains(newer, footprint) for newer in later):
+                continue
+            kept.append((value_input_option, value_range, footprint))
+            if footprint is not None:
+                later.append(footprint)
+        kept.reverse()
+
+        # A write joins the last request with the same value input option unless a request sent after that one
+        # touches the same cells, so the order of overlapping writes is preserved.
+        requests = []
+        for value_input_option, value_range, footprint in kept:
+            size = sum(len(row) for row in value_range['values'])
+            target = None
+            for request in reversed(requests):
+                if request['option'] == value_input_option:
+                    if len(request['data']) < self.max_ranges and request['cells'] + size <= self.max_cells:
+                        target = request
+                    break
+                if footprint is None or any(
+                        other is None or intersect(other, footprint) is not None for other in request['footprints']
+                ):
+                    break
+            if target is None:
+                target = {'option': value_input_option, 'data': [], 'cells': 0, 'footprints': []}
+                requests.append(target)
+            target['data'].append(value_range)
+            target['cells'] += size
+            target['footprints'].append(footprint)
+        return [(request['option'], request['data']) for request in requests]
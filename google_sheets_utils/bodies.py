@@ -0,0 +1,97 @@
+from google_sheets_utils.ranges import format_ranges
+
+
+def collect_values_body(indices: list, worksheet: str, value_input_option: str, major_dimension: str) -> dict:
+    """
+    Collects the body for "values().batchUpdate" from the list with indices and data.
+    :param indices: List with dictionary with index and data indices = [{'col': int, 'row': int, 'data': list}]
+    :param worksheet: Worksheet name. (string)
+    :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string)
+    :param major_dimension: majorDimension. Can take values "ROWS", "COLUMNS".
+    :return: Body for the request.
+    """
+    boxes = []
+    for data_dict in indices:
+        start_row = data_dict.get('row') or 1
+        col = data_dict.get('col')
+        data = data_dict.get('data')
+
+        height, width = len(data), max(len(values) for values in data)
+        if major_dimension == 'COLUMNS':
+            height, width = width, height
+        boxes.append((start_row, col, start_row + height - 1, col + width - 1))
+
+    return {
+        'valueInputOption': value_input_option,
+        'data': [
+            {
+                'range': range_,
+                'majorDimension': major_dimension,
+                'values': data_dict.get('data')
+            }
+            for range_, data_dict in zip(format_ranges(worksheet, boxes), indices)
+        ]
+    }
+
+
+def add_sheet_request(sheet_name: str) -> dict:
+    return {
+        'addSheet': {
+            'properties': {
+                'title': sheet_name
+            }
+        }
+    }
+
+
+def delete_sheet_request(sheet_id: int) -> dict:
+    return {
+        'deleteSheet': {
+            'sheetId': sheet_id
+        }
+    }
+
+
+def rename_sheet_request(sheet_id: int, new_name: str) -> dict:
+    return {
+        'updateSheetProperties': {
+            'properties': {
+                'sheetId': sheet_id,
+                'title': new_name
+            },
+            'fields': 'title'
+        }
+    }
+
+
+def clear_range_request(
+        sheet_id: int, start_row: int, end_row: int, start_col: int, end_col: int
+) -> dict:
+    return {
+        'updateCells': {
+            'range': {
+                'sheetId': sheet_id,
+                'startRowIndex': start_row - 1,
+                'endRowIndex': end_row,
+                'startColumnIndex': start_col - 1,
+                'endColumnIndex': end_col
+            },
+            'fields': 'userEnteredValue'
+        }
+    }
+
+
+def values_body(range_: str, data: list, value_input_option: str, major_dimension: str) -> dict:
+    """
+    Collects the body for "values().batchUpdate" with a single range.
+    """
+    return {
+        'valueInputOption': value_input_option,
+        'data': [
+            {
+                'range': range_,
+                'majorDimension': major_dimension,
+                'values': data
+            }
+        ]
+    }
@@ -1,97 +1,285 @@
-from google_sheets_utils import *
-from typing import Optional, Union, List
+from google_sheets_utils.appender import Appender
+from google_sheets_utils.bodies import (
+    add_sheet_request, clear_range_request, collect_values_body, delete_sheet_request, rename_sheet_request, values_body
+)
+from google_sheets_utils.batch_writer import BatchWriter
+from google_sheets_utils.chunking import (
+    DEFAULT_MAX_BYTES, DEFAULT_MAX_CELLS, is_payload_too_large, plan_chunks, split_chunk, value_range_size
+)
+from google_sheets_utils.disk_cache import DiskCache
+from google_sheets_utils.header_index import HeaderCache, HeaderIndex
+from google_sheets_utils.key_index import KeyIndex
+from google_sheets_utils.instrumentation import (
+    MeteredHttp, RequestEvent, bind_caller, call_hooks, caller_name, current_span, ranges_count, spreadsheet_id
+)
+from google_sheets_utils.metadata import MetadataCache, SHEETS_PROPERTIES_FIELDS
+from google_sheets_utils.planner import plan_blocks
+from google_sheets_utils.ranges import format_range, parse_range
+from google_sheets_utils.rate_limiter import QuotaLimiter
+from google_sheets_utils.registry import get_credentials, get_resources
+from google_sheets_utils.retry import RetryPolicy, is_idempotent_body
+from google_sheets_utils.single_flight import SingleFlight, copy_value_ranges, copy_values
+from google_sheets_utils.sync import align_by_key, diff_matrices
+from google_sheets_utils.table import Table
+from google_sheets_utils.token_cache import FileTokenCache
+from google_sheets_utils.transport import HttpPool
+from google_sheets_utils.watch import RowChange, Snapshot
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, Union, List
+from urllib.parse import quote
+import threading
+import time
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+_MISSING = object()
+
+
+def _estimate_cells(parsed: Optional[tuple], grids: Optional[dict]) -> int:
+    if parsed is None:
+        return 0
+    sheet, start_row, start_col, end_row, end_col = parsed
+    grid = (grids or {}).get(sheet) or {}
+    end_row = end_row or grid.get('rowCount', 0)
+    end_col = end_col or grid.get('columnCount', 0)
+    return max(0, end_row - (start_row or 1) + 1) * max(0, end_col - (start_col or 1) + 1)
 
 
 class GoogleSheets:
-    def __init__(self, creds_path: str):
-        self.creds = Credentials.from_service_account_file(creds_path)
-        self.service = build('sheets', 'v4', credentials=self.creds)
-
-    def __req_update(self, spreadsheet: str, body: dict, retries: int = 5) -> dict:
-        for retry in range(retries):
-            try:
-                request = self.service.spreadsheets().values().batchUpdate(
-                    spreadsheetId=spreadsheet,
-                    body=body
-                )
-                return request.execute()
-            except Exception as error:
-                err_type = exceptions_handler_for_requests(error)
-                if not err_type:
-                    continue
-                else:
+    def __init__(
+            self, creds_path: Optional[str], metadata_ttl: float = 60.0, metadata_cache_size: int = 128,
+            api_endpoint: Optional[str] = None, rate_limiter: Optional[QuotaLimiter] = None,
+            retry_policy: Optional[RetryPolicy] = None, pool_size: int = 10, timeout: Optional[float] = None,
+            disk_cache: Optional[DiskCache] = None, hooks: Optional[List[Callable[[RequestEvent], Any]]] = None,
+            single_flight: bool = True, token_cache: Optional[FileTokenCache] = None
+    ):
+        """
+        :param creds_path: Path to the service account file. If None, requests are sent without credentials
+        (for local stand-ins of the API). (string | None)
+        :param metadata_ttl: Lifetime of cached spreadsheet metadata and header rows in seconds. (float)
+        :param metadata_cache_size: Maximum number of spreadsheets with cached metadata. (int)
+        :param api_endpoint: Base URL of the Sheets API. Default is "https://sheets.googleapis.com". (string | None)
+        :param rate_limiter: Client-side quota limiter. Requests wait for quota instead of failing with 429.
+        Share one instance between clients to share the quota. (QuotaLimiter | None)
+        :param retry_policy: Retry policy for all requests. Default is RetryPolicy(). (RetryPolicy | None)
+        :param pool_size: Maximum number of HTTP connections. Each request uses a connection exclusively,
+        so one client can be shared between threads. (int)
+        :param timeout: Socket timeout of HTTP connections in seconds. (float | None)
+        :param disk_cache: Persistent cache of range reads. Writes through this client invalidate it,
+        changes made elsewhere are seen after the TTL of the cache. (DiskCache | None)
+        :param hooks: Functions called with a RequestEvent after every attempt of every HTTP call,
+        for example MetricsAggregator(). Without hooks requests are not measured. (list | None)
+        :param single_flight: Identical reads sent concurrently from several threads share one request
+        and its result. A read started after a write through this client never joins an older read. (bool)
+        :param token_cache: File shared by the worker processes of one machine that holds the access token.
+        The token is requested by one process and read by the others. (FileTokenCache | None)
+        """
+        # Credentials and API resources are shared by all clients of the process, see "registry".
+        self.creds = get_credentials(creds_path, SCOPES)
+        self.api_endpoint = api_endpoint
+        self._resources = None
+        self.metadata_cache = MetadataCache(metadata_ttl, metadata_cache_size)
+        self.header_cache = HeaderCache(metadata_ttl)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.http_pool = HttpPool(self.creds, pool_size, timeout, token_cache)
+        # (spreadsheet, worksheet) -> (time, matrix) written by "sync_sheet".
+        self._snapshots = {}
+        # (spreadsheet, worksheet, key column) -> KeyIndex created by "key_index".
+        self._key_indexes = {}
+        self.disk_cache = disk_cache
+        self.hooks = list(hooks or [])
+        self._flights = SingleFlight() if single_flight else None
+        # Lowered when the API rejects a write as too large, caps "max_bytes" of later writes.
+        self.learned_max_bytes = None
+
+    @property
+    def service(self):
+        return self.__get_resources()[0]
+
+    @property
+    def _spreadsheets(self):
+        return self.__get_resources()[1]
+
+    @property
+    def _values(self):
+        return self.__get_resources()[2]
+
+    def __get_resources(self) -> tuple:
+        # The service is built on the first request, not when the client is created.
+        if self._resources is None:
+            self._resources = get_resources(self.api_endpoint)
+        return self._resources
+
+    def __execute(self, kind: str, make_request, idempotent: bool = True) -> dict:
+        if self.hooks:
+            return self.__execute_instrumented(kind, make_request, idempotent)
+
+        def attempt():
+            if self.rate_limiter:
+                self.rate_limiter.acquire(kind)
+            with self.http_pool.connection() as http:
+                return make_request().execute(http=http)
+
+        return self.retry_policy.run(attempt, idempotent)
+
+    def __execute_instrumented(self, kind: str, make_request, idempotent: bool = True) -> dict:
+        method = caller_name(self)
+        label = current_span()
+        attempts = 0
+
+        def attempt():
+            nonlocal attempts
+            attempts += 1
+            if self.rate_limiter:
+                self.rate_limiter.acquire(kind)
+            request = make_request()
+            error = None
+            with self.http_pool.connection() as http:
+                metered = MeteredHttp(http)
+                started = time.perf_counter()
+                try:
+                    return request.execute(http=metered)
+                except Exception as exc:
+                    error = exc
                     raise
+                finally:
+                    event = RequestEvent(
+                        method=method, api_method=request.methodId, span=label, kind=kind,
+                        spreadsheet=spreadsheet_id(request.uri), ranges=ranges_count(request),
+                        request_bytes=len(request.uri) + request.body_size, response_bytes=metered.response_bytes,
+                        latency=time.perf_counter() - started, attempt=attempts,
+                        status=metered.status, error=error, quota_cost=1,
+                    )
+                    call_hooks(self.hooks, event)
+
+        return self.retry_policy.run(attempt, idempotent)
+
+    def __req_update(self, spreadsheet: str, body: dict) -> dict:
+        try:
+            return self.__execute('write', lambda: self._values.batchUpdate(
+                spreadsheetId=spreadsheet,
+                body=body
+            ))
+        finally:
+            ranges = [value_range.get('range') for value_range in body['data']]
+            self.__forget_reads(spreadsheet)
+            self.metadata_cache.invalidate_grown(spreadsheet, body['data'])
+            self.__invalidate_headers(spreadsheet, ranges)
+            self.__invalidate_key_indexes(spreadsheet, ranges)
+            if self.disk_cache is not None:
+                self.disk_cache.invalidate_ranges(spreadsheet, ranges)
+
+    def __invalidate_headers(self, spreadsheet: str, ranges: List[str]) -> None:
+        # Drops cached headers of worksheets whose first row may have been written and their sync snapshots.
+        for range_ in ranges:
+            parsed = parse_range(range_)
+            if parsed is None:
+                self.header_cache.invalidate(spreadsheet)
+                self.__drop_snapshots(spreadsheet)
+                return
+            self._snapshots.pop((spreadsheet, parsed[0]), None)
+            if parsed[1] is None or parsed[1] <= 1:
+                self.header_cache.invalidate(spreadsheet, parsed[0])
+
+    def __drop_snapshots(self, spreadsheet: Optional[str] = None) -> None:
+        for key in list(self._snapshots):
+            if spreadsheet is None or key[0] == spreadsheet:
+                self._snapshots.pop(key, None)
+
+    def __drop_key_indexes(self, spreadsheet: Optional[str] = None) -> None:
+        for key in list(self._key_indexes):
+            if spreadsheet is None or key[0] == spreadsheet:
+                self._key_indexes.pop(key, None)
+
+    def __invalidate_key_indexes(self, spreadsheet: str, ranges: List[str]) -> None:
+        # Value writes may change keys or add rows with new keys; indexes of the touched key columns are rebuilt.
+        for key, index in list(self._key_indexes.items()):
+            if key[0] == spreadsheet:
+                index.invalidate(ranges)
 
     def __req_get(
             self, spreadsheet: str, range_: str, value_render_option: Optional[str] = None,
-            major_dimension: Optional[str] = None, retries: int = 5
+            major_dimension: Optional[str] = None, use_disk_cache: bool = True
     ) -> list:
-        for retry in range(retries):
-            try:
-                request = self.service.spreadsheets().values().get(
-                    spreadsheetId=spreadsheet,
-                    range=range_,
-                    valueRenderOption=value_render_option,
-                    majorDimension=major_dimension
+        if self.disk_cache is not None and use_disk_cache:
+            values = self.disk_cache.get(spreadsheet, range_, value_render_option, major_dimension, _MISSING)
+            if values is not _MISSING:
+                return values
+
+        def _read() -> list:
+            # A write that invalidates the cache while the read is in flight makes the response stale.
+            generation = self.disk_cache.generation(spreadsheet) if self.disk_cache is not None else None
+            response = self.__execute('read', lambda: self._values.get(
+                spreadsheetId=spreadsheet,
+                range=range_,
+                valueRenderOption=value_render_option,
+                majorDimension=major_dimension
+            ))
+            if self.disk_cache is not None:
+                self.disk_cache.set(
+                    spreadsheet, range_, value_render_option, major_dimension, response.get('values'), generation
                 )
-                return request.execute().get('values')
-            except Exception as error:
-                err_type = exceptions_handler_for_requests(error)
-                if not err_type:
-                    continue
-                else:
-                    raise
+            return response.get('values')
 
-    def __req_get_info(self, spreadsheet: str, retries: int = 5) -> dict:
-        for retry in range(retries):
-            try:
-                request = self.service.spreadsheets().get(spreadsheetId=spreadsheet)
-                return request.execute()
-            except Exception as error:
-                err_type = exceptions_handler_for_requests(error)
-                if not err_type:
-                    continue
-                else:
-                    raise
+        return self.__single_flight(
+            (spreadsheet, 'get', range_, value_render_option, major_dimension), _read, copy_values
+        )
 
-    def __req_update_info(self, spreadsheet: str, body: dict, retries: int = 5) -> dict:
-        for retry in range(retries):
-            try:
-                request = self.service.spreadsheets().batchUpdate(
-                    spreadsheetId=spreadsheet,
-                    body=body
-                )
-                return request.execute()
-            except Exception as error:
-                err_type = exceptions_handler_for_requests(error)
-                if not err_type:
-                    continue
-                raise
+    def __req_batch_get(
+            self, spreadsheet: str, ranges: List[str], value_render_option: Optional[str] = None,
+            major_dimension: Optional[str] = None
+    ) -> list:
+        def _read() -> list:
+            response = self.__execute('read', lambda: self._values.batchGet(
+                spreadsheetId=spreadsheet,
+                ranges=ranges,
+                valueRenderOption=value_render_option,
+                majorDimension=major_dimension
+            ))
+            return response.get('valueRanges', [])
 
-    @staticmethod
-    def __collect_body(indices: list, worksheet: str, value_input_option: str, major_dimension: str) -> dict:
-        body = {
-            'valueInputOption': value_input_option,
-            'data': []
-        }
-        for data_dict in indices:
-            start_row = 1
-            col = data_dict.get('col')
-            data = data_dict.get('data')
-            if data_dict.get('row'):
-                start_row = data_dict.get('row')
-
-            start_range = gspread.utils.rowcol_to_a1(start_row, col)
-            end_range = gspread.utils.rowcol_to_a1(start_row + len(data), col + len(data[0]))
-
-            body['data'].append(
-                {
-                    'range': f'{worksheet}!{start_range}:{end_range}',
-                    'majorDimension': major_dimension,
-                    'values': data
-                }
-            )
-        return body
+        return self.__single_flight(
+            (spreadsheet, 'batch_get', tuple(ranges), value_render_option, major_dimension), _read, copy_value_ranges
+        )
+
+    def __req_get_info(self, spreadsheet: str, fields: Optional[str] = None) -> dict:
+        return self.__single_flight(
+            (spreadsheet, 'info', fields),
+            lambda: self.__execute('read', lambda: self._spreadsheets.get(spreadsheetId=spreadsheet, fields=fields)),
+            deepcopy
+        )
+
+    def __single_flight(self, key: tuple, read: Callable[[], Any], copy: Callable[[Any], Any]) -> Any:
+        if self._flights is None:
+            return read()
+        return self._flights.do(key, read, copy)
+
+    def __forget_reads(self, spreadsheet: Optional[str] = None) -> None:
+        # Reads started after a write must not join reads that were sent before it.
+        if self._flights is not None:
+            self._flights.forget(spreadsheet)
+
+    def __req_update_info(self, spreadsheet: str, body: dict) -> dict:
+        try:
+            return self.__execute('write', lambda: self._spreadsheets.batchUpdate(
+                spreadsheetId=spreadsheet,
+                body=body
+            ), is_idempotent_body(body))
+        finally:
+            self.__forget_reads(spreadsheet)
+            self.__drop_snapshots(spreadsheet)
+            self.__drop_key_indexes(spreadsheet)
+            if self.disk_cache is not None:
+                self.disk_cache.invalidate(spreadsheet)
+
+    def __get_sheets_properties(self, spreadsheet: str) -> list:
+        sheets = self.metadata_cache.get(spreadsheet)
+        if sheets is None:
+            response = self.__req_get_info(spreadsheet, SHEETS_PROPERTIES_FIELDS)
+            sheets = [sheet.get('properties') for sheet in response.get('sheets', [])]
+            self.metadata_cache.set(spreadsheet, sheets)
+        return sheets
 
     def get_sheets_name(self, spreadsheet: str) -> list:
         """
@@ -99,11 +287,20 @@ class GoogleSheets:
         :param spreadsheet: Spreadsheet ID. (string)
         :return: List with sheet names.
         """
-        sheets = []
-        response = self.__req_get_info(spreadsheet)
-        for sheet in response.get('sheets'):
-            sheets.append(sheet.get('properties').get('title'))
-        return sheets
+        return [sheet.get('title') for sheet in self.__get_sheets_properties(spreadsheet)]
+
+    def invalidate_metadata(self, spreadsheet: Optional[str] = None) -> None:
+        """
+        Drops cached metadata (sheet titles, IDs, grid sizes, header rows, sync snapshots and key indexes)
+        of the spreadsheet.
+        Use it when the spreadsheet structure was changed outside of this client.
+        :param spreadsheet: Spreadsheet ID. If not specified, metadata of all spreadsheets is dropped. (string | None)
+        """
+        self.metadata_cache.invalidate(spreadsheet)
+        self.header_cache.invalidate(spreadsheet)
+        self.__drop_snapshots(spreadsheet)
+        self.__drop_key_indexes(spreadsheet)
+        self.__forget_reads(spreadsheet)
 
     def rows_count(self, spreadsheet: str, worksheet: Union[str, List[str]]) -> int:
         """
@@ -113,11 +310,9 @@ class GoogleSheets:
         :return: Total number of rows from specified worksheets.
         """
         row_count = 0
-        response = self.__req_get_info(spreadsheet).get('sheets')
-        if response:
-            for sheet in response:
-                if sheet.get('properties').get('title') in worksheet:
-                    row_count += sheet.get('properties').get('gridProperties').get('rowCount')
+        for sheet in self.__get_sheets_properties(spreadsheet):
+            if sheet.get('title') in worksheet:
+                row_count += sheet.get('gridProperties').get('rowCount')
         return row_count
 
     def columns_count(self, spreadsheet: str, worksheet: Union[str, List[str]]) -> int:
@@ -128,11 +323,9 @@ class GoogleSheets:
         :return: Total number of columns from specified worksheets.
         """
         column_count = 0
-        response = self.__req_get_info(spreadsheet).get('sheets')
-        if response:
-            for sheet in response:
-                if sheet.get('properties').get('title') in worksheet:
-                    column_count += sheet.get('properties').get('gridProperties').get('columnCount')
+        for sheet in self.__get_sheets_properties(spreadsheet):
+            if sheet.get('title') in worksheet:
+                column_count += sheet.get('gridProperties').get('columnCount')
         return column_count
 
     def get_column_index_by_column_name(
@@ -145,30 +338,167 @@ class GoogleSheets:
         :param column_name: Column name.
         :return: Returns index of the column
         """
-        columns = self.get_columns_names(spreadsheet, worksheet)
-        if columns:
-            if column_name in columns:
-                return columns.index(column_name)
-        else:
-            return None
+        return self.get_header_index(spreadsheet, worksheet).exact_index(column_name)
 
     def get_all_info_from_sheet(
-            self, spreadsheet: str, worksheet: str, value_render_option: Optional[str] = None,
-            major_dimension: Union[str, List[str], None] = None
-    ) -> list:
+            self, spreadsheet: str, worksheet: Union[str, List[str]], value_render_option: Optional[str] = None,
+            major_dimension: Union[str, List[str], None] = None, as_table: bool = False
+    ) -> Union[list, dict, Table]:
         """
         Function get all info from spreadsheet.
         :param spreadsheet: spreadsheet ID.
-        :param worksheet: worksheet name.
+        :param worksheet: worksheet name or list with worksheet names.
         :param value_render_option: ValueRenderOption. Can take values "FORMATTED_VALUE", "UNFORMATTED_VALUE", "FORMULA"
         :param major_dimension: Dimension. (string | None)
         "DIMENSION_UNSPECIFIED" - Default value, do not use.
         "ROWS" - Work with sheet rows.
         "COLUMNS" - Work with sheet columns.
-        :return: All data from the table as a matrix.
+        :param as_table: Return a column-wise Table instead of a matrix. With "UNFORMATTED_VALUE" numeric
+        columns are stored as arrays of floats. (bool)
+        :return: All data from the table as a matrix. If a list of worksheets is given, all of them are read with
+        "get_many" and a dictionary worksheet name -> matrix is returned.
         """
 
-        return self.__req_get(spreadsheet, worksheet, value_render_option, major_dimension)
+        if isinstance(worksheet, list):
+            result = self.get_many(spreadsheet, worksheet, value_render_option, major_dimension)
+            if as_table:
+                return {
+                    name: Table(values, major_dimension, value_render_option == 'UNFORMATTED_VALUE')
+                    for name, values in result.items()
+                }
+            return result
+        values = self.__req_get(spreadsheet, worksheet, value_render_option, major_dimension)
+        if as_table:
+            return Table(values, major_dimension, value_render_option == 'UNFORMATTED_VALUE')
+        return values
+
+    def get_many(
+            self, spreadsheet: str, ranges: List[str], value_render_option: Optional[str] = None,
+            major_dimension: Optional[str] = None, max_url_length: int = 8000, max_cells: int = 1000000,
+            use_disk_cache: bool = True
+    ) -> dict:
+        """
+        Reads several ranges (of one or several worksheets) with "values().batchGet".
+        Ranges are split into several requests if the URL would be too long or the response too large.
+        The size of a response is estimated from the range bounds and the sheet grid size.
+        :param spreadsheet: Spreadsheet ID.
+        :param ranges: List with ranges in A1 notation. Example: ["Sheet1", "Sheet2!A1:C10"].
+        :param value_render_option: ValueRenderOption. Can take values "FORMATTED_VALUE", "UNFORMATTED_VALUE", "FORMULA"
+        :param major_dimension: Dimension. Can take values "ROWS", "COLUMNS". (string | None)
+        :param max_url_length: Maximum length of the request URL. (int)
+        :param max_cells: Maximum estimated number of cells in one response. (int)
+        :param use_disk_cache: If False, the ranges are read from the API even if the disk cache has them. (bool)
+        :return: Dictionary as a key the requested range, the value is the matrix with data (None if empty).
+        """
+        unique_ranges = list(dict.fromkeys(ranges))
+        result = {}
+        if self.disk_cache is not None and use_disk_cache:
+            for range_ in unique_ranges:
+                values = self.disk_cache.get(spreadsheet, range_, value_render_option, major_dimension, _MISSING)
+                if values is not _MISSING:
+                    result[range_] = values
+            unique_ranges = [range_ for range_ in unique_ranges if range_ not in result]
+        for chunk in self.__split_ranges(spreadsheet, unique_ranges, max_url_length, max_cells):
+            generation = self.disk_cache.generation(spreadsheet) if self.disk_cache is not None else None
+            value_ranges = self.__req_batch_get(spreadsheet, chunk, value_render_option, major_dimension)
+            for range_, value_range in zip(chunk, value_ranges):
+                result[range_] = value_range.get('values')
+                if self.disk_cache is not None:
+                    self.disk_cache.set(
+                        spreadsheet, range_, value_render_option, major_dimension, result[range_], generation
+                    )
+        return {range_: result[range_] for range_ in dict.fromkeys(ranges)}
+
+    def __split_ranges(self, spreadsheet: str, ranges: List[str], max_url_length: int, max_cells: int) -> list:
+        base_length = len(f'https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet}/values:batchGet?'
+                          f'valueRenderOption=UNFORMATTED_VALUE&majorDimension=COLUMNS&alt=json')
+        grids = None
+        chunks = []
+        chunk, length, cells = [], base_length, 0
+        for range_ in ranges:
+            range_length = len('&ranges=') + len(quote(range_, safe=''))
+            parsed = parse_range(range_)
+            if grids is None and len(ranges) > 1 and parsed is not None and None in parsed[1:]:
+                grids = {
+                    sheet.get('title'): sheet.get('gridProperties')
+                    for sheet in self.__get_sheets_properties(spreadsheet)
+                }
+            range_cells = _estimate_cells(parsed, grids)
+            if chunk and (length + range_length > max_url_length or cells + range_cells > max_cells):
+                chunks.append(chunk)
+                chunk, length, cells = [], base_length, 0
+            chunk.append(range_)
+            length += range_length
+            cells += range_cells
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def iter_rows(
+            self, spreadsheet: str, worksheet: str, window: int = 5000, value_render_option: Optional[str] = None,
+            batches: bool = False, prefetch: bool = True
+    ) -> Iterator[list]:
+        """
+        Reads the worksheet in windows of rows, so only one or two windows are kept in memory at once.
+        The number of rows is taken from the sheet metadata. While the caller processes a window,
+        the next one is downloaded in a background thread.
+        Empty rows inside the data are yielded as empty lists, trailing empty rows are omitted.
+        Empty rows at the end of a window are yielded with the next batch, once it is known that data follows.
+        :param spreadsheet: Spreadsheet ID.
+        :param worksheet: Worksheet name.
+        :param window: Number of rows in one request. (int)
+        :param value_render_option: ValueRenderOption. Can take values "FORMATTED_VALUE", "UNFORMATTED_VALUE", "FORMULA"
+        :param batches: Yield lists with the rows of each window instead of single rows. (bool)
+        :param prefetch: Download the next window while the current one is processed. (bool)
+        :return: Iterator over rows (or batches of rows).
+        """
+        total = self.rows_count(spreadsheet, worksheet)
+        starts = range(1, total + 1, window)
+        if not prefetch:
+            fetch_windows = (
+                self.__req_get(
+                    spreadsheet, format_range(worksheet, start, None, start + window - 1, None), value_render_option
+                )
+                for start in starts
+            )
+            yield from self.__join_windows(fetch_windows, window, batches)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        def _fetch(start: int) -> Optional[list]:
+            range_ = format_range(worksheet, start, None, start + window - 1, None)
+            return self.__req_get(spreadsheet, range_, value_render_option)
+
+        fetch = bind_caller(self, _fetch)
+
+        def fetch_windows():
+            future = executor.submit(fetch, starts[0]) if starts else None
+            for position in range(len(starts)):
+                values = future.result()
+                if position + 1 < len(starts):
+                    future = executor.submit(fetch, starts[position + 1])
+                yield values
+
+        try:
+            yield from self.__join_windows(fetch_windows(), window, batches)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def __join_windows(windows: Iterator[Optional[list]], window: int, batches: bool) -> Iterator[list]:
+        # The API omits trailing empty rows of every window. They are restored only when more data follows.
+        blank = 0
+        for values in windows:
+            values = values or []
+            if values:
+                rows = [[] for _ in range(blank)] + values
+                blank = 0
+                if batches:
+                    yield rows
+                else:
+                    yield from rows
+            blank += window - len(values)
 
     @staticmethod
     def get_columns_indices(worksheet_data: list, columns: dict) -> Optional[dict]:
@@ -181,16 +511,12 @@ class GoogleSheets:
         the value is the column index.
         """
 
-        columns_indices = {}
         try:
-            first_row = [to_low(elem) for elem in worksheet_data[0]]
-        except KeyError:
+            first_row = worksheet_data[0]
+        except (IndexError, TypeError):
             raise KeyError('Did not find any data in the worksheet.')
-        for key, value in columns.items():
-            if to_low(value) in first_row:
-                columns_indices[key] = first_row.index(to_low(value))
 
-        return columns_indices
+        return HeaderIndex(first_row).indices(columns)
 
     def get_columns_names(
             self, spreadsheet: str, worksheet: str, value_render_option: Union[str, List[str], None] = None
@@ -202,9 +528,24 @@ class GoogleSheets:
         :param value_render_option: ValueRenderOption. Can take values "FORMATTED_VALUE", "UNFORMATTED_VALUE", "FORMULA"
         :return: List with column names.
         """
-        first_row = self.__req_get(spreadsheet, worksheet + '!1:1', value_render_option)
+        first_row = self.__req_get(spreadsheet, format_range(worksheet, 1, None, 1, None), value_render_option)
         return first_row[0]
 
+    def get_header_index(self, spreadsheet: str, worksheet: str, refresh: bool = False) -> HeaderIndex:
+        """
+        Returns the index of column names of the worksheet. The header row is requested once and cached
+        until the TTL expires or row 1 is written through this client.
+        :param spreadsheet: Spreadsheet ID.
+        :param worksheet: Worksheet name.
+        :param refresh: Request the header row even if it is cached. (bool)
+        :return: HeaderIndex object.
+        """
+        header = None if refresh else self.header_cache.get(spreadsheet, worksheet)
+        if header is None:
+            header = HeaderIndex(self.get_columns_names(spreadsheet, worksheet) or [])
+            self.header_cache.set(spreadsheet, worksheet, header)
+        return header
+
     def get_column_index_by_name(
             self, spreadsheet: Optional[str], worksheet: Optional[str],
             column_name: str, columns_row: Optional[list] = None
@@ -219,11 +560,13 @@ class GoogleSheets:
         :return: Index of the column.
         """
         if not columns_row:
-            columns_row = [to_low(elem) for elem in self.get_columns_names(spreadsheet, worksheet)]
-            return columns_row.index(to_low(column_name))
+            header = self.get_header_index(spreadsheet, worksheet)
         else:
-            columns_row = [to_low(elem) for elem in columns_row]
-            return columns_row.index(to_low(column_name))
+            header = HeaderIndex(columns_row)
+        index = header.index(column_name)
+        if index is None:
+            raise ValueError(f'{column_name!r} is not in the columns row')
+        return index
 
     def get_data_by_column_name(
             self, spreadsheet: str, worksheet: str, col_name: str, value_render_option: Optional[str] = None,
@@ -240,9 +583,11 @@ class GoogleSheets:
         """
 
         all_data = self.__req_get(spreadsheet, worksheet, value_render_option)
-        first_row = [to_low(elem) for elem in all_data[0]]
-        if to_low(col_name) in first_row:
-            index = first_row.index(to_low(col_name))
+        header = HeaderIndex(all_data[0])
+        if not value_render_option:
+            self.header_cache.set(spreadsheet, worksheet, header)
+        index = header.index(col_name)
+        if index is not None:
             if like_matrix:
                 return [[row[index]] for row in all_data]
             else:
@@ -250,6 +595,36 @@ class GoogleSheets:
         else:
             return None
 
+    def get_columns_data(
+            self, spreadsheet: str, worksheet: str, columns: List[str], value_render_option: Optional[str] = None,
+            columns_row: Optional[list] = None, skip_header: bool = False
+    ) -> dict:
+        """
+        Retrieves only the specified columns in one request. Tabs, spaces and case in names are omitted.
+        :param spreadsheet: Spreadsheet ID.
+        :param worksheet: Worksheet name.
+        :param columns: List with column names.
+        :param value_render_option: ValueRenderOption. Can take values "FORMATTED_VALUE", "UNFORMATTED_VALUE", "FORMULA"
+        :param columns_row: Row with column names from table. If not specified, the cached header is used.
+        :param skip_header: Do not include the header cell in the values. (bool)
+        :return: Dictionary as a key the column name, the value is the list with column data.
+        None if the column is not found.
+        """
+        if not columns_row:
+            header = self.get_header_index(spreadsheet, worksheet)
+        else:
+            header = HeaderIndex(columns_row)
+
+        start_row = 2 if skip_header else None
+        ranges = {}
+        for name in columns:
+            index = header.index(name)
+            if index is not None:
+                ranges[name] = format_range(worksheet, start_row, index + 1, None, index + 1)
+
+        values = self.get_many(spreadsheet, list(ranges.values()), value_render_option, 'COLUMNS')
+        return {name: (values[ranges[name]] or [[]])[0] if name in ranges else None for name in columns}
+
     def get_sheet_id_by_name(self, spreadsheet: str, sheet_name: str) -> Optional[int]:
         """
         Function for getting the ID of the sheet by its name.
@@ -257,11 +632,9 @@ class GoogleSheets:
         :param sheet_name: Sheet name. (string)
         :return: Returns the ID of the sheet.
         """
-        request = self.__req_get_info(spreadsheet).get('sheets')
-        if request:
-            for sheet in request:
-                if sheet.get('properties').get('title') == sheet_name:
-                    return sheet.get('properties').get('sheetId')
+        for sheet in self.__get_sheets_properties(spreadsheet):
+            if sheet.get('title') == sheet_name:
+                return sheet.get('sheetId')
         return None
 
     def create_new_sheet(self, spreadsheet: str, sheet_name: str) -> dict:
@@ -272,19 +645,14 @@ class GoogleSheets:
         :return: Returns a dictionary with a response from the Google Sheets API.
         """
 
-        body = {
-            'requests': [
-                {
-                    'addSheet': {
-                        'properties': {
-                            'title': sheet_name
-                        }
-                    }
-                }
-            ]
-        }
+        body = {'requests': [add_sheet_request(sheet_name)]}
 
-        return self.__req_update_info(spreadsheet, body)
+        response = self.__req_update_info(spreadsheet, body)
+        try:
+            self.metadata_cache.add_sheet(spreadsheet, response['replies'][0]['addSheet']['properties'])
+        except (KeyError, IndexError, TypeError):
+            self.metadata_cache.invalidate(spreadsheet)
+        return response
 
     def delete_sheet(
             self, spreadsheet: str, sheet_name: Optional[str] = None, sheet_id: Optional[int] = None
@@ -303,17 +671,12 @@ class GoogleSheets:
         if not sheet_id:
             return None
 
-        body = {
-            'requests': [
-                {
-                    'deleteSheet': {
-                        'sheetId': sheet_id
-                    }
-                }
-            ]
-        }
+        body = {'requests': [delete_sheet_request(sheet_id)]}
 
-        return self.__req_update_info(spreadsheet, body)
+        response = self.__req_update_info(spreadsheet, body)
+        self.metadata_cache.remove_sheet(spreadsheet, sheet_id)
+        self.header_cache.invalidate(spreadsheet)
+        return response
 
     def rename_sheet(self, spreadsheet: str, old_name: str, new_name: str) -> Optional[dict]:
         """
@@ -331,21 +694,13 @@ class GoogleSheets:
         if old_sheet_id is None:
             return None
 
-        body = {
-            'requests': [
-                {
-                    'updateSheetProperties': {
-                        'properties': {
-                            'sheetId': old_sheet_id,
-                            'title': new_name
-                        },
-                        'fields': 'title'
-                    }
-                }
-            ]
-        }
+        body = {'requests': [rename_sheet_request(old_sheet_id, new_name)]}
 
-        return self.__req_update_info(spreadsheet, body)
+        response = self.__req_update_info(spreadsheet, body)
+        self.metadata_cache.rename_sheet(spreadsheet, old_sheet_id, new_name)
+        self.header_cache.invalidate(spreadsheet, old_name)
+        self.header_cache.invalidate(spreadsheet, new_name)
+        return response
 
     def clear_range(
             self, spreadsheet: str, start_row: int, end_row: int, start_col: int, end_col: int,
@@ -369,24 +724,107 @@ class GoogleSheets:
         if not sheet_id:
             return None
 
-        body = {
-            'requests': [
-                {
-                    'updateCells': {
-                        'range': {
-                            'sheetId': sheet_id,
-                            'startRowIndex': start_row - 1,
-                            'endRowIndex': end_row,
-                            'startColumnIndex': start_col - 1,
-                            'endColumnIndex': end_col
-                        },
-                        'fields': 'userEnteredValue'
-                    }
-                }
-            ]
-        }
+        body = {'requests': [clear_range_request(sheet_id, start_row, end_row, start_col, end_col)]}
+
+        response = self.__req_update_info(spreadsheet, body)
+        if start_row <= 1:
+            self.header_cache.invalidate(spreadsheet, sheet_name)
+        return response
+
+    def create_sheets(self, spreadsheet: str, sheet_names: List[str], max_requests: int = 500) -> List[dict]:
+        """
+        Creates several sheets with one "spreadsheets().batchUpdate" request.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param sheet_names: Names of the new sheets. (list)
+        :param max_requests: Maximum number of operations in one request. (int)
+        :return: List with replies, one per sheet: {'addSheet': {'properties': {'sheetId': int, ...}}}
+        """
+        requests = [add_sheet_request(name) for name in sheet_names]
+        replies = self.__batch_update_info(spreadsheet, requests, max_requests)
+        try:
+            for reply in replies:
+                self.metadata_cache.add_sheet(spreadsheet, reply['addSheet']['properties'])
+        except (KeyError, TypeError):
+            self.metadata_cache.invalidate(spreadsheet)
+        return replies
+
+    def delete_sheets(
+            self, spreadsheet: str, sheet_names: Optional[List[str]] = None, sheet_ids: Optional[List[int]] = None,
+            max_requests: int = 500
+    ) -> List[dict]:
+        """
+        Deletes several sheets with one "spreadsheets().batchUpdate" request. Names are resolved with one
+        metadata request, names that are not found are skipped.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param sheet_names: Sheet names. (list | None)
+        :param sheet_ids: Sheet IDs, use them if the sheet names are not unique. (list | None)
+        :param max_requests: Maximum number of operations in one request. (int)
+        :return: List with replies, one per deleted sheet.
+        """
+        ids = self.__sheet_ids(spreadsheet)
+        sheet_ids = list(sheet_ids or []) + [ids[name] for name in sheet_names or [] if name in ids]
+        sheet_ids = list(dict.fromkeys(sheet_ids))
+        replies = self.__batch_update_info(
+            spreadsheet, [delete_sheet_request(sheet_id) for sheet_id in sheet_ids], max_requests
+        )
+        for sheet_id in sheet_ids:
+            self.metadata_cache.remove_sheet(spreadsheet, sheet_id)
+        self.header_cache.invalidate(spreadsheet)
+        return replies
 
-        return self.__req_update_info(spreadsheet, body)
+    def rename_sheets(self, spreadsheet: str, names: dict, max_requests: int = 500) -> List[dict]:
+        """
+        Renames several sheets with one "spreadsheets().batchUpdate" request. Names are resolved with one
+        metadata request, names that are not found are skipped.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param names: Dictionary old name -> new name. (dict)
+        :param max_requests: Maximum number of operations in one request. (int)
+        :return: List with replies, one per renamed sheet.
+        """
+        ids = self.__sheet_ids(spreadsheet)
+        renames = [(ids[old], old, new) for old, new in names.items() if old in ids and old != new]
+        replies = self.__batch_update_info(
+            spreadsheet, [rename_sheet_request(sheet_id, new) for sheet_id, _, new in renames], max_requests
+        )
+        for sheet_id, old, new in renames:
+            self.metadata_cache.rename_sheet(spreadsheet, sheet_id, new)
+            self.header_cache.invalidate(spreadsheet, old)
+            self.header_cache.invalidate(spreadsheet, new)
+        return replies
+
+    def clear_ranges(self, spreadsheet: str, ranges: List[tuple], max_requests: int = 500) -> List[dict]:
+        """
+        Clears several ranges with one "spreadsheets().batchUpdate" request. Sheet names are resolved with one
+        metadata request, ranges of sheets that are not found are skipped.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param ranges: List with tuples (sheet name or ID, start_row, end_row, start_col, end_col). (list)
+        :param max_requests: Maximum number of operations in one request. (int)
+        :return: List with replies, one per cleared range.
+        """
+        ids = self.__sheet_ids(spreadsheet)
+        requests = []
+        for sheet, start_row, end_row, start_col, end_col in ranges:
+            sheet_id = sheet if isinstance(sheet, int) else ids.get(sheet)
+            if sheet_id is None:
+                continue
+            requests.append(clear_range_request(sheet_id, start_row, end_row, start_col, end_col))
+            if start_row <= 1:
+                self.header_cache.invalidate(spreadsheet, None if isinstance(sheet, int) else sheet)
+        return self.__batch_update_info(spreadsheet, requests, max_requests)
+
+    def __sheet_ids(self, spreadsheet: str) -> dict:
+        # Sheet name -> sheet ID. The first sheet wins if names repeat, same as "get_sheet_id_by_name".
+        ids = {}
+        for sheet in self.__get_sheets_properties(spreadsheet):
+            ids.setdefault(sheet.get('title'), sheet.get('sheetId'))
+        return ids
+
+    def __batch_update_info(self, spreadsheet: str, requests: list, max_requests: int) -> List[dict]:
+        replies = []
+        for start in range(0, len(requests), max_requests):
+            response = self.__req_update_info(spreadsheet, {'requests': requests[start:start + max_requests]})
+            replies.extend(response.get('replies', []))
+        return replies
 
     def update_sheet(
             self, spreadsheet: str, range_: str,
@@ -403,42 +841,290 @@ class GoogleSheets:
         :return: Returns a dictionary with a response from the Google Sheets API.
         """
 
-        body = {
-            'valueInputOption': value_input_option,
-            'data': [
-                {
-                    'range': range_,
-                    'majorDimension': major_dimension,
-                    'values': data
-                }
-            ]
-        }
+        body = values_body(range_, data, value_input_option, major_dimension)
 
         return self.__req_update(spreadsheet, body)
 
     def update_sheet_by_indices(
             self, spreadsheet: str, worksheet: str,
             indices: list, value_input_option: str = 'USER_ENTERED',
-            major_dimension: str = 'DIMENSION_UNSPECIFIED', chunk_size: int = 1000
+            major_dimension: str = 'DIMENSION_UNSPECIFIED', chunk_size: int = 1000, coalesce: bool = True,
+            max_bytes: int = DEFAULT_MAX_BYTES, max_cells: int = DEFAULT_MAX_CELLS, max_workers: int = 1
     ) -> List[dict]:
         """
         Enters data into the table with respect to
         indices and values specified in the 'indices' dictionary.
-        :param chunk_size: Size of the chunk.
+        Requests are filled up to "chunk_size" ranges, "max_bytes" of serialized values and "max_cells" cells,
+        a block over the limits is split. If the API rejects a request as too large, it is split in half
+        and the limit is lowered for the following writes of this client.
+        :param chunk_size: Maximum number of value ranges in one request.
         :param spreadsheet: Spreadsheet ID. (string)
         :param worksheet: Worksheet name. (string)
         :param indices: List with dictionary with index and data indices = [{'col': int, 'data': list}]
         :param major_dimension: majorDimension. Can take values "ROWS", "COLUMNS".
         :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string | None)
-        :return: Returns a dictionary with a response from the Google Sheets API.
+        :param coalesce: Merge adjacent entries into rectangular blocks before sending. (bool)
+        :param max_bytes: Maximum serialized size of the values of one request in bytes. (int)
+        :param max_cells: Maximum number of cells in one request. (int)
+        :param max_workers: Number of requests sent in parallel. Used only with coalesce=True and only when
+        no two blocks share a cell; overlapping blocks are sent in order, so the later entry wins. (int)
+        :return: Returns a list with responses from the Google Sheets API.
         """
-        responses = []
-        if len(indices) < chunk_size:
-            body = self.__collect_body(indices, worksheet, value_input_option, major_dimension)
-            return [self.__req_update(spreadsheet, body)]
+        disjoint = False
+        if coalesce:
+            indices, disjoint = plan_blocks(indices, major_dimension)
+            major_dimension = 'ROWS'
+
+        if self.learned_max_bytes:
+            max_bytes = min(max_bytes, self.learned_max_bytes)
+        data = collect_values_body(indices, worksheet, value_input_option, major_dimension)['data']
+        chunks = list(plan_chunks(data, chunk_size, max_bytes, max_cells))
+        if disjoint and max_workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                results = list(executor.map(bind_caller(
+                    self, lambda chunk: self.__send_chunk(spreadsheet, chunk, value_input_option)
+                ), chunks))
         else:
-            for _ in range(0, len(indices), chunk_size):
-                body = self.__collect_body(indices[_:_ + chunk_size], worksheet, value_input_option, major_dimension)
-                responses.append(self.__req_update(spreadsheet, body))
+            results = [self.__send_chunk(spreadsheet, chunk, value_input_option) for chunk in chunks]
+        return [response for result in results for response in result]
+
+    def __send_chunk(self, spreadsheet: str, chunk: List[dict], value_input_option: str) -> List[dict]:
+        try:
+            return [self.__req_update(spreadsheet, {'valueInputOption': value_input_option, 'data': chunk})]
+        except Exception as error:
+            halves = split_chunk(chunk) if is_payload_too_large(error) else None
+            if not halves:
+                raise
+        size = sum(value_range_size(value_range)[0] for value_range in chunk)
+        self.learned_max_bytes = min(self.learned_max_bytes or size, max(size // 2, 1))
+        return [response for half in halves for response in self.__send_chunk(spreadsheet, half, value_input_option)]
+
+    def batch_update_values(
+            self, spreadsheet: str, data: list, value_input_option: str = 'USER_ENTERED'
+    ) -> dict:
+        """
+        Writes several value ranges in one request.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param data: List with value ranges [{'range': str, 'majorDimension': str, 'values': list}]
+        :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string)
+        :return: Returns a dictionary with a response from the Google Sheets API.
+        """
+        body = {
+            'valueInputOption': value_input_option,
+            'data': data
+        }
+
+        return self.__req_update(spreadsheet, body)
+
+    def sync_sheet(
+            self, spreadsheet: str, worksheet: str, new_matrix: list, key: Union[int, str, None] = None,
+            value_input_option: str = 'USER_ENTERED', value_render_option: Optional[str] = None,
+            snapshot_ttl: Optional[float] = None, chunk_size: int = 1000
+    ) -> List[dict]:
+        """
+        Makes the worksheet equal to "new_matrix" writing only the cells that changed. Changed cells are merged
+        into rectangular blocks and sent as batched value ranges, cells that are no longer present are cleared.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name. (string)
+        :param new_matrix: New contents of the worksheet starting from A1. (list)
+        :param key: Key column (index or name from the header row). If specified, the first row is the header,
+        rows keep their current position by key, rows with new keys are added after the last row and rows
+        with vanished keys are cleared. Keys must be unique in the worksheet and in "new_matrix", ValueError
+        is raised otherwise and nothing is written. If None, rows are compared by position. (int | string | None)
+        :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string)
+        :param value_render_option: ValueRenderOption used to read the current contents. (string | None)
+        :param snapshot_ttl: If specified, the contents written by the previous sync of the worksheet are kept
+        and used instead of reading the worksheet while they are younger than "snapshot_ttl" seconds.
+        Any other write to the worksheet through this client drops the snapshot, changes made elsewhere
+        are not seen. (float | None)
+        :param chunk_size: Maximum number of value ranges in one request. (int)
+        :return: List with responses from the Google Sheets API. Empty if nothing changed.
+        """
+        old_matrix = None
+        if snapshot_ttl is not None:
+            snapshot = self._snapshots.get((spreadsheet, worksheet))
+            if snapshot is not None and time.monotonic() - snapshot[0] < snapshot_ttl:
+                old_matrix = snapshot[1]
+        if old_matrix is None:
+            # The diff must be against the current contents: a stale cached copy would skip changed cells.
+            old_matrix = self.__req_get(spreadsheet, worksheet, value_render_option, use_disk_cache=False) or []
+
+        target = new_matrix
+        if key is not None and new_matrix:
+            key_index = key if isinstance(key, int) else HeaderIndex(new_matrix[0]).index(key)
+            if key_index is None:
+                raise ValueError(f'{key!r} is not in the columns row')
+            target = align_by_key(old_matrix, new_matrix, key_index)
 
+        indices = diff_matrices(old_matrix, target)
+        responses = []
+        if indices:
+            responses = self.update_sheet_by_indices(
+                spreadsheet, worksheet, indices, value_input_option, 'ROWS', chunk_size
+            )
+        if snapshot_ttl is not None:
+            self._snapshots[(spreadsheet, worksheet)] = (time.monotonic(), [list(row) for row in target])
         return responses
+
+    def append_rows(
+            self, spreadsheet: str, worksheet: str, rows: list, value_input_option: str = 'USER_ENTERED'
+    ) -> dict:
+        """
+        Appends rows after the last row with data of the worksheet. New rows are inserted, so concurrent
+        appends never overwrite each other.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name. (string)
+        :param rows: Rows to append. (list)
+        :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string)
+        :return: Returns a dictionary with a response from the Google Sheets API.
+        """
+        try:
+            return self.__execute('write', lambda: self._values.append(
+                spreadsheetId=spreadsheet,
+                range=worksheet,
+                valueInputOption=value_input_option,
+                insertDataOption='INSERT_ROWS',
+                body={'values': rows}
+            ), idempotent=False)
+        finally:
+            self.__forget_reads(spreadsheet)
+            # Inserted rows grow the grid, cached row counts would cut "iter_rows" short.
+            self.metadata_cache.invalidate(spreadsheet)
+            self.__invalidate_headers(spreadsheet, [worksheet])
+            self.__invalidate_key_indexes(spreadsheet, [worksheet])
+            if self.disk_cache is not None:
+                self.disk_cache.invalidate_ranges(spreadsheet, [worksheet])
+
+    def key_index(
+            self, spreadsheet: str, worksheet: str, key_column: Union[str, int], max_age: Optional[float] = None
+    ) -> KeyIndex:
+        """
+        Returns the key -> row index of the worksheet, one per (spreadsheet, worksheet, key column).
+        The index is built on first use and dropped when the structure of the spreadsheet changes.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name. (string)
+        :param key_column: Name of the key column in the header row or its index (0-based). (string | int)
+        :param max_age: The index is rebuilt when it is older than "max_age" seconds. (float | None)
+        :return: KeyIndex object.
+        """
+        key = (spreadsheet, worksheet, key_column)
+        index = self._key_indexes.get(key)
+        if index is None:
+            index = self._key_indexes.setdefault(key, KeyIndex(self, spreadsheet, worksheet, key_column, max_age))
+        return index
+
+    def upsert_rows(
+            self, spreadsheet: str, worksheet: str, key_column: Union[str, int], rows: list,
+            value_input_option: str = 'USER_ENTERED', chunk_size: int = 1000
+    ) -> list:
+        """
+        Updates rows whose key already exists in place and appends rows with new keys.
+        The sheet is read only to build the key index (key column only), the writes are batched:
+        one update request per "chunk_size" changed rows and one append request for the new rows.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name. (string)
+        :param key_column: Name of the key column in the header row or its index (0-based). (string | int)
+        :param rows: Rows starting from column A. (list)
+        :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string)
+        :param chunk_size: Maximum number of value ranges in one update request. (int)
+        :return: List with responses from the Google Sheets API.
+        """
+        return self.key_index(spreadsheet, worksheet, key_column).upsert(rows, value_input_option, chunk_size)
+
+    def lookup(self, spreadsheet: str, worksheet: str, key_column: Union[str, int], key) -> Optional[int]:
+        """
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name. (string)
+        :param key_column: Name of the key column in the header row or its index (0-based). (string | int)
+        :param key: Key value. Keys are compared as strings.
+        :return: Row number (1-based) of the key or None.
+        """
+        return self.key_index(spreadsheet, worksheet, key_column).lookup(key)
+
+    def snapshot_range(self, spreadsheet: str, worksheet: str, value_render_option: Optional[str] = None) -> Snapshot:
+        """
+        Reads the range and keeps only a 64-bit fingerprint per row, for "changes_since".
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name or range. (string)
+        :param value_render_option: ValueRenderOption. Can take values "FORMATTED_VALUE", "UNFORMATTED_VALUE", "FORMULA"
+        :return: Snapshot object.
+        """
+        return self.changes_since(Snapshot(spreadsheet, worksheet, value_render_option))[1]
+
+    def changes_since(self, snapshot: Snapshot) -> Tuple[List[RowChange], Snapshot]:
+        """
+        Reads the range of the snapshot again and returns only the rows that were inserted, modified or deleted
+        since it was taken. The disk cache is bypassed. An empty Snapshot(spreadsheet, worksheet) reports
+        every row as inserted.
+        Usage: changes, snapshot = google.changes_since(snapshot)
+        :param snapshot: Snapshot from "snapshot_range" or a previous call. (Snapshot)
+        :return: (list with RowChange objects, new snapshot)
+        """
+        rows = self.__req_get(
+            snapshot.spreadsheet, snapshot.worksheet, snapshot.value_render_option, use_disk_cache=False
+        )
+        return snapshot.advance(rows)
+
+    def watch_range(
+            self, spreadsheet: str, worksheet: str, interval: float = 60.0, value_render_option: Optional[str] = None,
+            include_existing: bool = False, stop: Optional[threading.Event] = None
+    ) -> Iterator[List[RowChange]]:
+        """
+        Polls the range every "interval" seconds and yields the list of changed rows of each poll that found
+        changes. Only row fingerprints are kept between polls, 8 bytes per row.
+        Usage: for changes in google.watch_range(spreadsheet, 'orders', 60): process(changes)
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name or range. (string)
+        :param interval: Seconds between the polls. (float)
+        :param value_render_option: ValueRenderOption. Can take values "FORMATTED_VALUE", "UNFORMATTED_VALUE", "FORMULA"
+        :param include_existing: Yield the rows found by the first poll as inserted. (bool)
+        :param stop: The generator ends when the event is set. (threading.Event | None)
+        :return: Iterator over lists with RowChange objects.
+        """
+        stop = stop or threading.Event()
+        snapshot = Snapshot(spreadsheet, worksheet, value_render_option)
+        if not include_existing:
+            snapshot = self.snapshot_range(spreadsheet, worksheet, value_render_option)
+            stop.wait(interval)
+        while not stop.is_set():
+            changes, snapshot = self.changes_since(snapshot)
+            if changes:
+                yield changes
+            stop.wait(interval)
+
+    def appender(self, spreadsheet: str, worksheet: str, **kwargs) -> Appender:
+        """
+        Creates a background pipeline that appends rows in batches, see Appender for the options.
+        Usage: with google.appender(spreadsheet, 'log', max_delay=2.0) as appender: appender.append(row)
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name. (string)
+        :return: Appender object.
+        """
+        return Appender(self, spreadsheet, worksheet, **kwargs)
+
+    def batch_writer(
+            self, spreadsheet: str, max_ranges: int = 1000, max_cells: int = 100000,
+            max_delay: Optional[float] = None
+    ) -> BatchWriter:
+        """
+        Creates a write buffer that merges many writes into a minimal number of requests.
+        Usage: with google.batch_writer(spreadsheet) as writer: writer.update_sheet(...)
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param max_ranges: Maximum number of value ranges in one request. (int)
+        :param max_cells: Maximum number of cells in one request. (int)
+        :param max_delay: Maximum time in seconds a write may stay in the buffer. (float | None)
+        :return: BatchWriter object.
+        """
+        return BatchWriter(self, spreadsheet, max_ranges, max_cells, max_delay)
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable, max_workers: Optional[int] = None) -> list:
+        """
+        Calls fn(item) for every item in a thread pool. The client is thread-safe, so fn can use it freely.
+        Requests sent by fn keep the span of the calling thread.
+        :param fn: Function of one argument.
+        :param items: Items to process.
+        :param max_workers: Number of threads. Default is the connection pool size. (int | None)
+        :return: List with results in the order of items. The first exception raised by fn is re-raised.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or self.http_pool.size) as executor:
+            return list(executor.map(bind_caller(self, fn), items))
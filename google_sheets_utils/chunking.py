@@ -0,0 +1,106 @@
+import json
+from typing import Iterator, List, Optional
+
+from google_sheets_utils.errors import http_status
+from google_sheets_utils.ranges import format_range, parse_range
+
+# Google recommends keeping request payloads under 2 MB.
+DEFAULT_MAX_BYTES = 2000000
+DEFAULT_MAX_CELLS = 100000
+_TOO_LARGE_MESSAGES = ('exceeds the limit', 'too large', 'payload size')
+
+
+def value_range_size(value_range: dict) -> tuple:
+    """
+    :return: (serialized bytes, number of cells) of a value range, serialized the same way as the request body.
+    """
+    size = len(json.dumps(value_range)) + 2
+    return size, sum(len(values) for values in value_range['values'])
+
+
+def plan_chunks(
+        data: List[dict], max_ranges: int, max_bytes: int = DEFAULT_MAX_BYTES, max_cells: int = DEFAULT_MAX_CELLS
+) -> Iterator[List[dict]]:
+    """
+    Groups value ranges into requests, in order. A request is closed when the next range would exceed
+    one of the limits. A range that alone exceeds a limit is split into equal parts by its major dimension.
+    :param data: Value ranges [{'range': str, 'majorDimension': str, 'values': list}]
+    :param max_ranges: Maximum number of value ranges in one request. (int)
+    :param max_bytes: Maximum serialized size of the value ranges of one request. (int)
+    :param max_cells: Maximum number of cells in one request. (int)
+    """
+    chunk, chunk_bytes, chunk_cells = [], 0, 0
+    for value_range in data:
+        size, cells = value_range_size(value_range)
+        pieces = [(value_range, size, cells)]
+        if size > max_bytes or cells > max_cells:
+            parts = max(-(-size // max_bytes), -(-cells // max_cells))
+            pieces = [
+                (piece, *value_range_size(piece)) for piece in split_value_range(value_range, parts) or [value_range]
+            ]
+        for piece, size, cells in pieces:
+            if chunk and (
+                    len(chunk) >= max_ranges or chunk_bytes + size > max_bytes or chunk_cells + cells > max_cells
+            ):
+                yield chunk
+                chunk, chunk_bytes, chunk_cells = [], 0, 0
+            chunk.append(piece)
+            chunk_bytes += size
+            chunk_cells += cells
+    if chunk:
+        yield chunk
+
+
+def split_chunk(chunk: List[dict]) -> Optional[List[List[dict]]]:
+    """
+    Splits a chunk into two halves. A chunk of one value range is split by its major dimension.
+    :return: Two chunks or None if the chunk can not be split (one row or column).
+    """
+    if len(chunk) > 1:
+        middle = len(chunk) // 2
+        return [chunk[:middle], chunk[middle:]]
+    halves = split_value_range(chunk[0], 2)
+    return [[half] for half in halves] if halves else None
+
+
+def split_value_range(value_range: dict, parts: int) -> Optional[List[dict]]:
+    """
+    Splits a value range into up to "parts" ranges by its major dimension (rows or columns).
+    :return: List with value ranges or None if the range can not be split.
+    """
+    values = value_range['values']
+    parsed = parse_range(value_range['range'])
+    if len(values) < 2 or parsed is None or None in parsed[1:]:
+        return None
+    prefix = value_range['range'].rpartition('!')[0]
+    _, start_row, start_col, end_row, end_col = parsed
+    columns = value_range.get('majorDimension') == 'COLUMNS'
+    step = -(-len(values) // min(parts, len(values)))
+    pieces = []
+    for offset in range(0, len(values), step):
+        part = values[offset:offset + step]
+        if columns:
+            row1, col1, row2, col2 = start_row, start_col + offset, end_row, start_col + offset + len(part) - 1
+        else:
+            row1, col1, row2, col2 = start_row + offset, start_col, start_row + offset + len(part) - 1, end_col
+        range_ = f'{prefix}!{format_range(None, row1, col1, row2, col2)}'
+        pieces.append({**value_range, 'range': range_, 'values': part})
+    return pieces
+
+
+def is_payload_too_large(error: Exception) -> bool:
+    """
+    Checks whether the API rejected a request because of its size (413, or 400 with a size message).
+    The typed errors of "exceptions_handler_for_requests" keep the original HttpError as __context__.
+    """
+    while error is not None:
+        status = http_status(error)
+        if status == 413:
+            return True
+        if status == 400:
+            content = getattr(error, 'content', b'') or b''
+            if isinstance(content, bytes):
+                content = content.decode('utf-8', 'replace')
+            return any(message in content.lower() for message in _TOO_LARGE_MESSAGES)
+        error = error.__cause__ or error.__context__
+    return False
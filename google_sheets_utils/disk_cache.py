@@ -0,0 +1,159 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Optional
+
+from google_sheets_utils.ranges import parse_range
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    spreadsheet TEXT NOT NULL,
+    sheet TEXT,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_sheet ON entries (spreadsheet, sheet);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+class DiskCache:
+    """
+    Persistent read-through cache of range reads stored in a SQLite file, so it survives process restarts
+    and can be shared by several processes. Entries are keyed by spreadsheet, range, value render option
+    and major dimension, stored as zlib-compressed JSON and expire after "ttl" seconds.
+    When the file grows over "max_bytes", the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, ttl: float = 3600.0, max_bytes: int = 256 * 1024 * 1024):
+        """
+        :param path: Path to the SQLite file. ":memory:" keeps the cache in memory. (string)
+        :param ttl: Lifetime of an entry in seconds. (float)
+        :param max_bytes: Maximum total size of compressed entries in bytes. (int)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Invalidation counters, see "generation".
+        self._epoch = 0
+        self._generations = {}
+        self._connection = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        if path != ':memory:':
+            self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(_SCHEMA)
+
+    def get(
+            self, spreadsheet: str, range_: str, value_render_option: Optional[str] = None,
+            major_dimension: Optional[str] = None, default: Any = None
+    ) -> Any:
+        """
+        :return: Cached values of the range or "default" if there is no fresh entry.
+        """
+        key = self.__key(spreadsheet, range_, value_render_option, major_dimension)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT data, expires FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return default
+            if row[1] <= now:
+                self._connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+                return default
+            self._connection.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(
+            self, spreadsheet: str, range_: str, value_render_option: Optional[str], major_dimension: Optional[str],
+            values: Optional[list], generation: Optional[int] = None
+    ) -> None:
+        """
+        :param generation: Value of "generation" taken before the read. If the spreadsheet was invalidated
+        since then, the values may be older than the write and are not stored. (int | None)
+        """
+        key = self.__key(spreadsheet, range_, value_render_option, major_dimension)
+        data = zlib.compress(json.dumps(values, separators=(',', ':')).encode())
+        if len(data) > self.max_bytes:
+            return
+        parsed = parse_range(range_)
+        now = time.time()
+        with self._lock:
+            if generation is not None and generation != self.__generation(spreadsheet):
+                return
+            self._connection.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, spreadsheet, parsed[0] if parsed else None, now + self.ttl, now, len(data), data)
+            )
+            self.__evict()
+
+    def invalidate(self, spreadsheet: Optional[str] = None, sheet: Optional[str] = None) -> None:
+        """
+        Drops entries of the worksheet, of the whole spreadsheet (sheet=None) or all entries.
+        Entries of ranges that can not be attributed to a worksheet (named ranges) are dropped with any worksheet.
+        """
+        with self._lock:
+            if spreadsheet is None:
+                self._epoch += 1
+            else:
+                self._generations[spreadsheet] = self._generations.get(spreadsheet, 0) + 1
+            if spreadsheet is None:
+                self._connection.execute('DELETE FROM entries')
+            elif sheet is None:
+                self._connection.execute('DELETE FROM entries WHERE spreadsheet = ?', (spreadsheet,))
+            else:
+                self._connection.execute(
+                    'DELETE FROM entries WHERE spreadsheet = ? AND (sheet = ? OR sheet IS NULL)', (spreadsheet, sheet)
+                )
+
+    def invalidate_ranges(self, spreadsheet: str, ranges: list) -> None:
+        """
+        Drops entries of all worksheets touched by "ranges".
+        """
+        sheets = set()
+        for range_ in ranges:
+            parsed = parse_range(range_ or '')
+            if parsed is None:
+                self.invalidate(spreadsheet)
+                return
+            sheets.add(parsed[0])
+        for sheet in sheets:
+            self.invalidate(spreadsheet, sheet)
+
+    def generation(self, spreadsheet: str) -> int:
+        """
+        :return: Counter that changes whenever entries of the spreadsheet are invalidated by this object.
+        """
+        with self._lock:
+            return self.__generation(spreadsheet)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __generation(self, spreadsheet: str) -> int:
+        return self._epoch + self._generations.get(spreadsheet, 0)
+
+    def __evict(self) -> None:
+        total = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self._connection.execute('DELETE FROM entries WHERE expires <= ?', (time.time(),))
+        rows = self._connection.execute('SELECT key, size FROM entries ORDER BY accessed').fetchall()
+        total = sum(size for _, size in rows)
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._connection.executemany('DELETE FROM entries WHERE key = ?', evicted)
+
+    @staticmethod
+    def __key(spreadsheet: str, range_: str, value_render_option: Optional[str], major_dimension: Optional[str]) -> str:
+        return json.dumps([spreadsheet, range_, value_render_option, major_dimension])
@@ -1,54 +1,82 @@
-def exceptions_handler_for_requests(error: Exception) -> str:
-    from googleapiclient.errors import HttpError
+from typing import Optional
+
+
+class CustomError(Exception):
+    pass
+
+
+class ForbiddenError(CustomError):
+    def __str__(self):
+        return 'Forbidden error: service email does not have access to the table'
+
+
+class NotFoundError(CustomError):
+    def __str__(self):
+        return 'Not found error: the requested resource was not found'
+
+
+class UnauthorizedError(CustomError):
+    def __str__(self):
+        return 'Unauthorized error: invalid credentials'
+
 
-    class CustomError(Exception):
-        pass
+class BadRequestError(CustomError):
+    def __str__(self):
+        return 'Bad request error: the request was invalid or cannot be otherwise served'
 
-    class ForbiddenError(CustomError):
-        def __str__(self):
-            return 'Forbidden error: service email does not have access to the table'
 
-    class NotFoundError(CustomError):
-        def __str__(self):
-            return 'Not found error: the requested resource was not found'
+class InternalServerError(CustomError):
+    def __str__(self):
+        return 'Internal server error: the server encountered an error and could not complete your request'
 
-    class UnauthorizedError(CustomError):
-        def __str__(self):
-            return 'Unauthorized error: invalid credentials'
 
-    class BadRequestError(CustomError):
-        def __str__(self):
-            return 'Bad request error: the request was invalid or cannot be otherwise served'
+class TooManyRequestsError(CustomError):
+    def __str__(self):
+        return 'Too many requests error: the user has sent too many requests in a given amount of time'
 
-    class InternalServerError(CustomError):
-        def __str__(self):
-            return 'Internal server error: the server encountered an error and could not complete your request'
 
-    class TooManyRequestsError(CustomError):
-        def __str__(self):
-            return 'Too many requests error: the user has sent too many requests in a given amount of time'
+class ServiceUnavailableError(CustomError):
+    def __str__(self):
+        return ('Service unavailable error: the server is currently unavailable '
+                '(because it is overloaded or down for maintenance)')
 
-    class ServiceUnavailableError(CustomError):
-        def __str__(self):
-            return ('Service unavailable error: the server is currently unavailable '
-                    '(because it is overloaded or down for maintenance)')
+
+class RetriesExhaustedError(CustomError):
+    def __init__(self, last_error: Exception, attempts: int, budget_exhausted: bool = False):
+        super().__init__(last_error, attempts)
+        self.last_error = last_error
+        self.attempts = attempts
+        self.budget_exhausted = budget_exhausted
+
+    def __str__(self):
+        reason = 'retry budget exhausted' if self.budget_exhausted else 'no retries left'
+        return f'Retries exhausted error: request failed after {self.attempts} attempts ({reason}): {self.last_error!r}'
+
+
+STATUS_ERRORS = {
+    400: BadRequestError,
+    401: UnauthorizedError,
+    403: ForbiddenError,
+    404: NotFoundError,
+    429: TooManyRequestsError,
+    500: InternalServerError,
+    503: ServiceUnavailableError,
+}
+
+
+def http_status(error: Exception) -> Optional[int]:
+    from googleapiclient.errors import HttpError
 
     if isinstance(error, HttpError):
-        status = error.status_code
-        if status == 400:
-            raise BadRequestError()
-        elif status == 401:
-            raise UnauthorizedError()
-        elif status == 403:
-            raise ForbiddenError()
-        elif status == 404:
-            raise NotFoundError()
-        elif status == 429:
-            raise TooManyRequestsError()
-        elif status == 500:
-            raise InternalServerError()
-        elif status == 503:
-            raise ServiceUnavailableError()
+        return error.status_code
+    return None
+
+
+def exceptions_handler_for_requests(error: Exception) -> str:
+    status = http_status(error)
+    if status is not None:
+        if status in STATUS_ERRORS:
+            raise STATUS_ERRORS[status]()
         else:
             return f'http_error_{status}'
     else:
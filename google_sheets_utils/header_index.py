@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from google_sheets_utils.text_handler import all_to_low_and_del_spc as to_low
+
+
+class HeaderIndex:
+    """
+    Column name -> index lookups for one header row. Names are normalized once (case, tabs and spaces are omitted),
+    every lookup after that is a dictionary access. If a name repeats, the first column wins, same as "list.index".
+    """
+    __slots__ = ('names', '_exact', '_normalized')
+
+    def __init__(self, names: list):
+        """
+        :param names: Header row (column names). (list)
+        """
+        self.names = list(names)
+        self._exact = {}
+        self._normalized = {}
+        for index, name in enumerate(self.names):
+            name = str(name)
+            self._exact.setdefault(name, index)
+            self._normalized.setdefault(to_low(name), index)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return to_low(name) in self._normalized
+
+    def index(self, name: str) -> Optional[int]:
+        """
+        :param name: Column name. Case, tabs and spaces are omitted.
+        :return: Index of the column or None if not found.
+        """
+        return self._normalized.get(to_low(name))
+
+    def exact_index(self, name: str) -> Optional[int]:
+        """
+        :param name: Column name, compared as is.
+        :return: Index of the column or None if not found.
+        """
+        return self._exact.get(name)
+
+    def indices(self, columns: dict) -> dict:
+        """
+        Same as GoogleSheets.get_columns_indices.
+        :param columns: Headword. key is the definition of the column. value is its actual name in the table.
+        :return: Dictionary as a key the column name (specified in the head dictionary), the value is the column index.
+        """
+        result = {}
+        for key, value in columns.items():
+            index = self._normalized.get(to_low(value))
+            if index is not None:
+                result[key] = index
+        return result
+
+
+class HeaderCache:
+    """
+    LRU cache with TTL for HeaderIndex objects keyed by (spreadsheet, worksheet).
+    """
+
+    def __init__(self, ttl: float = 60.0, max_size: int = 512):
+        """
+        :param ttl: Time in seconds after which an entry is considered stale. (float)
+        :param max_size: Maximum number of worksheets kept in the cache. (int)
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, spreadsheet: str, worksheet: str) -> Optional[HeaderIndex]:
+        with self._lock:
+            entry = self._entries.get((spreadsheet, worksheet))
+            if entry is None:
+                return None
+            expires_at, header = entry
+            if expires_at < time.monotonic():
+                del self._entries[(spreadsheet, worksheet)]
+                return None
+            self._entries.move_to_end((spreadsheet, worksheet))
+            return header
+
+    def set(self, spreadsheet: str, worksheet: str, header: HeaderIndex) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[(spreadsheet, worksheet)] = (time.monotonic() + self.ttl, header)
+            self._entries.move_to_end((spreadsheet, worksheet))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, spreadsheet: Optional[str] = None, worksheet: Optional[str] = None) -> None:
+        """
+        Drops cached headers. Without a worksheet all headers of the spreadsheet are dropped,
+        without a spreadsheet the whole cache is cleared.
+        :param spreadsheet: Spreadsheet ID. (string | None)
+        :param worksheet: Worksheet name. (string | None)
+        """
+        with self._lock:
+            if spreadsheet is None:
+                self._entries.clear()
+            elif worksheet is not None:
+                self._entries.pop((spreadsheet, worksheet), None)
+            else:
+                for key in [key for key in self._entries if key[0] == spreadsheet]:
+                    del self._entries[key]
@@ -0,0 +1,200 @@
+import json
+import logging
+import random
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_SPAN = ContextVar('google_sheets_span', default=None)
+# Public method that started the work of a worker thread, see "bind_caller".
+_CALLER = ContextVar('google_sheets_caller', default=None)
+_SPREADSHEET_RE = re.compile(r'/spreadsheets/([^/:?]+)')
+
+
+class RequestEvent:
+    """
+    One attempt of one HTTP call to the Sheets API. Hooks receive it after the attempt finished.
+    """
+    __slots__ = (
+        'method', 'api_method', 'span', 'spreadsheet', 'ranges', 'request_bytes', 'response_bytes',
+        'latency', 'attempt', 'status', 'error', 'quota_cost', 'kind',
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'error'}
+
+    def __repr__(self) -> str:
+        return f'RequestEvent({self.as_dict()!r})'
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Labels all requests sent inside the block (in this thread or task): with span('nightly-refresh'): ...
+    The label is available as "RequestEvent.span".
+    """
+    token = _SPAN.set(name)
+    try:
+        yield
+    finally:
+        _SPAN.reset(token)
+
+
+def current_span() -> Optional[str]:
+    return _SPAN.get()
+
+
+def caller_name(client, depth: int = 1) -> Optional[str]:
+    """
+    Returns the name of the innermost public method of "client" on the call stack. In a worker thread
+    without one, returns the method that handed the work over with "bind_caller".
+    """
+    frame = sys._getframe(depth)
+    while frame is not None:
+        name = frame.f_code.co_name
+        if name[0] not in '_<' and frame.f_locals.get('self') is client:
+            return name
+        frame = frame.f_back
+    return _CALLER.get()
+
+
+def bind_caller(client, function: Callable) -> Callable:
+    """
+    Wraps a function that is going to run in another thread (a thread pool), so that its requests keep
+    the span and the calling method of the current thread.
+    """
+    name = caller_name(client, 2)
+    context = copy_context()
+
+    def call(*args, **kwargs) -> Any:
+        # Every call gets its own copy: a context can not be entered by two threads at once.
+        return context.copy().run(_call_as, name, function, args, kwargs)
+
+    return call
+
+
+def _call_as(name: Optional[str], function: Callable, args: tuple, kwargs: dict) -> Any:
+    _CALLER.set(name)
+    return function(*args, **kwargs)
+
+
+def call_hooks(hooks: Iterable[Callable[[RequestEvent], Any]], event: RequestEvent) -> None:
+    """
+    Calls every hook with the event. A failing hook is logged and does not fail the request or the other hooks.
+    """
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception:
+            logger.exception('Request hook %r failed', hook)
+
+
+def spreadsheet_id(uri: str) -> Optional[str]:
+    match = _SPREADSHEET_RE.search(uri)
+    return match.group(1) if match else None
+
+
+def ranges_count(request) -> int:
+    if request.methodId and request.methodId.endswith('values.batchGet'):
+        return request.uri.count('ranges=')
+    if request.body and request.methodId and request.methodId.endswith('values.batchUpdate'):
+        return len(json.loads(request.body).get('data', []))
+    return 1 if '/values/' in request.uri else 0
+
+
+class MeteredHttp:
+    """
+    Wraps an httplib2.Http object and counts bytes of the request and response bodies.
+    """
+    __slots__ = ('http', 'response_bytes', 'status')
+
+    def __init__(self, http):
+        self.http = http
+        self.response_bytes = 0
+        self.status = None
+
+    def request(self, uri, method='GET', *args, **kwargs):
+        resp, content = self.http.request(uri, method, *args, **kwargs)
+        self.response_bytes += len(content or b'')
+        self.status = resp.status
+        return resp, content
+
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
+
+class MetricsAggregator:
+    """
+    In-memory hook that collects latency percentiles, retries, errors, bytes and quota units per method.
+    Usage: metrics = MetricsAggregator(); GoogleSheets(creds_path, hooks=[metrics]); print(metrics.dump())
+    """
+
+    def __init__(self, max_samples: int = 10000, key: str = 'method'):
+        """
+        :param max_samples: Maximum number of latency samples kept per method (reservoir sampling). (int)
+        :param key: Event attribute used to group events: "method", "api_method" or "span". (string)
+        """
+        self.max_samples = max_samples
+        self.key = key
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def __call__(self, event: RequestEvent) -> None:
+        key = getattr(event, self.key) or 'unknown'
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    'count': 0, 'errors': 0, 'retries': 0, 'request_bytes': 0, 'response_bytes': 0,
+                    'quota_cost': 0, 'samples': [],
+                }
+            stats['count'] += 1
+            stats['errors'] += event.error is not None
+            stats['retries'] += event.attempt > 1
+            stats['request_bytes'] += event.request_bytes
+            stats['response_bytes'] += event.response_bytes
+            stats['quota_cost'] += event.quota_cost
+            samples = stats['samples']
+            if len(samples) < self.max_samples:
+                samples.append(event.latency)
+            else:
+                index = self._random.randrange(stats['count'])
+                if index < self.max_samples:
+                    samples[index] = event.latency
+
+    def summary(self) -> dict:
+        """
+        :return: Dictionary method -> counters and p50/p95/p99 latency in seconds.
+        """
+        with self._lock:
+            result = {}
+            for key, stats in self._stats.items():
+                samples = sorted(stats['samples'])
+                result[key] = {name: value for name, value in stats.items() if name != 'samples'}
+                for percent in (50, 95, 99):
+                    result[key][f'p{percent}'] = _percentile(samples, percent)
+            return result
+
+    def dump(self) -> str:
+        return json.dumps(self.summary(), indent=2, sort_keys=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+def _percentile(samples: list, percent: float) -> Optional[float]:
+    if not samples:
+        return None
+    index = max(0, min(len(samples) - 1, -(-len(samples) * percent // 100) - 1))
+    return samples[int(index)]
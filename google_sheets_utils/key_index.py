@@ -0,0 +1,162 @@
+import threading
+import time
+from typing import Optional, Union
+
+from google_sheets_utils.ranges import format_range, parse_range
+
+
+class KeyIndex:
+    """
+    Hash index business key -> row number of one worksheet. It is built from a read of the key column only
+    and kept up to date by "upsert": rows appended through it are added to the index from the API response,
+    without re-reading the sheet. Other value writes of the client to the key column (or whole rows) drop the
+    index, it is rebuilt on next use. Changes made elsewhere (rows inserted or deleted by other writers) are seen
+    after "refresh" or when "max_age" expires.
+    A key found in several rows is listed in "duplicates"; "lookup" returns its first row and "upsert" refuses it.
+
+        index = google.key_index(spreadsheet, 'products', 'ASIN')
+        index.upsert([['B0001', 'title', 10], ['B0002', 'other', 5]])
+        index.lookup('B0001')  # -> row number
+    """
+
+    def __init__(
+            self, client, spreadsheet: str, worksheet: str, key_column: Union[str, int],
+            max_age: Optional[float] = None
+    ):
+        """
+        :param client: GoogleSheets instance used to send the requests.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name. (string)
+        :param key_column: Name of the key column in the header row or its index (0-based). (string | int)
+        :param max_age: The index is rebuilt when it is older than "max_age" seconds. (float | None)
+        """
+        self.client = client
+        self.spreadsheet = spreadsheet
+        self.worksheet = worksheet
+        self.key_column = key_column
+        self.max_age = max_age
+        self.column_index = None
+        self.duplicates = {}
+        self._rows = None
+        self._built = 0.0
+        self._writing = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.__index())
+
+    def __contains__(self, key) -> bool:
+        return self.lookup(key) is not None
+
+    def lookup(self, key) -> Optional[int]:
+        """
+        :param key: Key value. Keys are compared as strings.
+        :return: Row number (1-based) of the key or None. The first row if the key is in several rows.
+        """
+        with self._lock:
+            return self.__index().get(str(key))
+
+    def invalidate(self, ranges: Optional[list] = None) -> None:
+        """
+        Drops the index if one of "ranges" may have changed the key column. Writes made by "upsert" itself
+        keep the index, it is updated from their responses.
+        :param ranges: Written ranges in A1 notation. If not specified, the index is dropped. (list | None)
+        """
+        with self._lock:
+            if self._writing:
+                return
+            if ranges is None or any(self.__touches(range_) for range_ in ranges):
+                self._rows = None
+
+    def refresh(self) -> None:
+        """
+        Rebuilds the index from one read of the key column.
+        """
+        with self._lock:
+            if isinstance(self.key_column, int):
+                self.column_index = self.key_column
+            else:
+                self.column_index = self.client.get_column_index_by_name(
+                    self.spreadsheet, self.worksheet, self.key_column
+                )
+            range_ = format_range(self.worksheet, None, self.column_index + 1, None, self.column_index + 1)
+            values = self.client.get_many(
+                self.spreadsheet, [range_], major_dimension='COLUMNS', use_disk_cache=False
+            )[range_]
+            rows, duplicates = {}, {}
+            for row, value in enumerate((values or [[]])[0], 1):
+                if row > 1 and value not in ('', None):
+                    key = str(value)
+                    first = rows.setdefault(key, row)
+                    if first != row:
+                        duplicates.setdefault(key, [first]).append(row)
+            self._rows = rows
+            self.duplicates = duplicates
+            self._built = time.monotonic()
+
+    def upsert(self, rows: list, value_input_option: str = 'USER_ENTERED', chunk_size: int = 1000) -> list:
+        """
+        Updates rows with known keys in place and appends rows with new keys. Rows start from column A and
+        contain the key in the key column. If a key repeats in "rows", the last row wins.
+        Raises ValueError if a key of "rows" is in several rows of the worksheet, as the row to update is unknown.
+        :param rows: Rows to write. (list)
+        :param value_input_option: ValueInputOption. Can take values "RAW", "USER_ENTERED". (string)
+        :param chunk_size: Maximum number of value ranges in one update request. (int)
+        :return: List with responses from the Google Sheets API.
+        """
+        with self._lock:
+            index = self.__index()
+            by_key = {}
+            for row in rows:
+                key = row[self.column_index] if self.column_index < len(row) else ''
+                if key in ('', None):
+                    raise ValueError(f'Row without a key: {row!r}')
+                by_key[str(key)] = row
+            ambiguous = [key for key in by_key if key in self.duplicates]
+            if ambiguous:
+                raise ValueError(f'Keys found in several rows of {self.worksheet!r}: {ambiguous[:10]!r}')
+
+            updates, new_keys = [], []
+            for key, row in by_key.items():
+                if key in index:
+                    updates.append({'row': index[key], 'col': 1, 'data': [row]})
+                else:
+                    new_keys.append(key)
+
+            responses = []
+            self._writing = True
+            try:
+                if updates:
+                    responses.extend(self.client.update_sheet_by_indices(
+                        self.spreadsheet, self.worksheet, updates, value_input_option, 'ROWS', chunk_size
+                    ))
+                if new_keys:
+                    response = self.client.append_rows(
+                        self.spreadsheet, self.worksheet, [by_key[key] for key in new_keys], value_input_option
+                    )
+                    responses.append(response)
+            finally:
+                self._writing = False
+            if new_keys:
+                parsed = parse_range(response.get('updates', {}).get('updatedRange') or '')
+                if parsed is None or parsed[1] is None:
+                    # The position of the appended rows is unknown, the index is rebuilt on next use.
+                    self._rows = None
+                else:
+                    for offset, key in enumerate(new_keys):
+                        index[key] = parsed[1] + offset
+            return responses
+
+    def __touches(self, range_: Optional[str]) -> bool:
+        parsed = parse_range(range_ or '')
+        if parsed is None or self.column_index is None:
+            return True
+        sheet, _, start_col, _, end_col = parsed
+        column = self.column_index + 1
+        return sheet == self.worksheet and (start_col or 1) <= column and (end_col is None or column <= end_col)
+
+    def __index(self) -> dict:
+        if self._rows is None or (self.max_age is not None and time.monotonic() - self._built > self.max_age):
+            self.refresh()
+        return self._rows
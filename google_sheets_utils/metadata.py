@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from google_sheets_utils.ranges import parse_range
+
+SHEETS_PROPERTIES_FIELDS = 'sheets.properties(sheetId,title,gridProperties(rowCount,columnCount))'
+
+
+class MetadataCache:
+    """
+    LRU cache with TTL for spreadsheet metadata (sheet titles, IDs and grid sizes).
+    Entries are stored per spreadsheet as a list of sheet "properties" dictionaries.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_size: int = 128):
+        """
+        :param ttl: Time in seconds after which an entry is considered stale. (float)
+        :param max_size: Maximum number of spreadsheets kept in the cache. (int)
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, spreadsheet: str) -> Optional[list]:
+        """
+        Returns cached sheets properties of the spreadsheet or None if missing or expired.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :return: List with sheets properties.
+        """
+        with self._lock:
+            entry = self._entries.get(spreadsheet)
+            if entry is None:
+                return None
+            expires_at, sheets = entry
+            if expires_at < time.monotonic():
+                del self._entries[spreadsheet]
+                return None
+            self._entries.move_to_end(spreadsheet)
+            return sheets
+
+    def set(self, spreadsheet: str, sheets: list) -> None:
+        """
+        Stores sheets properties of the spreadsheet, evicting the least recently used entries.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param sheets: List with sheets properties. (list)
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[spreadsheet] = (time.monotonic() + self.ttl, sheets)
+            self._entries.move_to_end(spreadsheet)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, spreadsheet: Optional[str] = None) -> None:
+        """
+        Drops the cached entry of the spreadsheet. If not specified, the whole cache is cleared.
+        :param spreadsheet: Spreadsheet ID. (string | None)
+        """
+        with self._lock:
+            if spreadsheet is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(spreadsheet, None)
+
+    def invalidate_grown(self, spreadsheet: str, data: list) -> None:
+        """
+        Drops the cached entry of the spreadsheet if one of the written value ranges ends past the cached grid:
+        the API grows the grid for such writes, so cached row and column counts would be too small.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param data: Written value ranges [{'range': str, 'majorDimension': str, 'values': list}]
+        """
+        sheets = self.get(spreadsheet)
+        if sheets is None:
+            return
+        grids = {sheet.get('title'): sheet.get('gridProperties', {}) for sheet in sheets}
+        for value_range in data:
+            parsed = parse_range(value_range.get('range') or '')
+            grid = grids.get(parsed[0]) if parsed else None
+            if grid is None:
+                self.invalidate(spreadsheet)
+                return
+            values = value_range.get('values') or []
+            height, width = len(values), max(map(len, values), default=0)
+            if value_range.get('majorDimension') == 'COLUMNS':
+                height, width = width, height
+            if (
+                    (parsed[1] or 1) + height - 1 > grid.get('rowCount', 0)
+                    or (parsed[2] or 1) + width - 1 > grid.get('columnCount', 0)
+            ):
+                self.invalidate(spreadsheet)
+                return
+
+    def add_sheet(self, spreadsheet: str, properties: dict) -> None:
+        """
+        Adds properties of a newly created sheet to the cached entry.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param properties: Sheet properties from the "addSheet" reply. (dict)
+        """
+        self.__patch(spreadsheet, lambda sheets: sheets + [properties])
+
+    def remove_sheet(self, spreadsheet: str, sheet_id: int) -> None:
+        """
+        Removes a deleted sheet from the cached entry.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param sheet_id: Sheet ID. (int)
+        """
+        self.__patch(spreadsheet, lambda sheets: [sheet for sheet in sheets if sheet.get('sheetId') != sheet_id])
+
+    def rename_sheet(self, spreadsheet: str, sheet_id: int, title: str) -> None:
+        """
+        Changes the title of a sheet in the cached entry.
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param sheet_id: Sheet ID. (int)
+        :param title: New sheet title. (string)
+        """
+        self.__patch(spreadsheet, lambda sheets: [
+            dict(sheet, title=title) if sheet.get('sheetId') == sheet_id else sheet for sheet in sheets
+        ])
+
+    def __patch(self, spreadsheet: str, patch) -> None:
+        # Lists are replaced rather than mutated, so callers iterating a previously returned list are not affected.
+        with self._lock:
+            entry = self._entries.get(spreadsheet)
+            if entry is not None:
+                expires_at, sheets = entry
+                self._entries[spreadsheet] = (expires_at, patch(sheets))
@@ -0,0 +1,121 @@
+from itertools import zip_longest
+
+# Entries with more cells than this are sent as they are.
+MERGE_MAX_CELLS = 1000
+
+
+def coalesce_indices(indices: list, major_dimension: str = 'ROWS', merge_max_cells: int = MERGE_MAX_CELLS) -> list:
+    """
+    Merges small entries of "update_sheet_by_indices" into the smallest set of rectangular blocks.
+    Horizontally adjacent cells of a row are joined into one run, runs with the same columns in consecutive rows
+    are stacked into one block. Entries larger than "merge_max_cells" are passed through without being split
+    into cells: the API skips None values and the ends of short rows the same way.
+    When entries overlap, the later entry wins, same as with separate ranges. Blocks of overlapping large entries
+    may overlap too, so they must be written in order, see "plan_blocks".
+    None values are skipped by the API, so they are not written here either.
+    :param indices: List with dictionary with index and data indices = [{'col': int, 'row': int, 'data': list}]
+    :param major_dimension: majorDimension of the "data" in indices. Can take values "ROWS", "COLUMNS".
+    :param merge_max_cells: Entries up to this number of cells are merged with their neighbours. (int)
+    :return: List with blocks in the same format as indices. Data of every block is row-major.
+    """
+    return plan_blocks(indices, major_dimension, merge_max_cells)[0]
+
+
+def plan_blocks(indices: list, major_dimension: str = 'ROWS', merge_max_cells: int = MERGE_MAX_CELLS) -> tuple:
+    """
+    Same as "coalesce_indices", and also tells whether the blocks can be written in any order.
+    :return: (blocks, disjoint). "disjoint" is True if no two blocks share a cell, so they may be sent
+    concurrently; otherwise the blocks must be sent in order for the later entries to win.
+    """
+    blocks = []
+    cells = {}
+    # Bounding box of the cells waiting to be merged: [start_row, start_col, end_row, end_col].
+    box = None
+    # Bounding boxes of the passed through entries and of every group of merged cells. Merged cells of one
+    # group never overlap each other, so the blocks are disjoint if these boxes are.
+    footprints = []
+    for data_dict in indices:
+        start_row = data_dict.get('row') or 1
+        start_col = data_dict.get('col')
+        data = data_dict.get('data')
+        size = sum(map(len, data))
+        if size > merge_max_cells:
+            if major_dimension == 'COLUMNS':
+                data = [list(row) for row in zip_longest(*data)]
+            height, width = len(data), max(map(len, data))
+            end_row, end_col = start_row + height - 1, start_col + width - 1
+            if box is not None and (
+                    start_row <= box[2] and box[0] <= end_row and start_col <= box[3] and box[1] <= end_col
+            ):
+                # Earlier small entries touch this block: they must be sent before it.
+                blocks.extend(_merge_cells(cells))
+                footprints.append(tuple(box))
+                cells, box = {}, None
+            blocks.append({'row': start_row, 'col': start_col, 'data': data})
+            footprints.append((start_row, start_col, end_row, end_col))
+            continue
+
+        if major_dimension == 'COLUMNS':
+            for col, column in enumerate(data, start_col):
+                for row, value in enumerate(column, start_row):
+                    if value is not None:
+                        cells[(row, col)] = value
+            height, width = max(map(len, data), default=0), len(data)
+        else:
+            for row, values in enumerate(data, start_row):
+                for col, value in enumerate(values, start_col):
+                    if value is not None:
+                        cells[(row, col)] = value
+            height, width = len(data), max(map(len, data), default=0)
+        end_row, end_col = start_row + height - 1, start_col + width - 1
+        if box is None:
+            box = [start_row, start_col, end_row, end_col]
+        else:
+            box = [min(box[0], start_row), min(box[1], start_col), max(box[2], end_row), max(box[3], end_col)]
+    blocks.extend(_merge_cells(cells))
+    if box is not None:
+        footprints.append(tuple(box))
+    return blocks, _disjoint(footprints)
+
+
+def _disjoint(boxes: list) -> bool:
+    # Sweep by start row: only boxes that are still open at the start row of a box can overlap it.
+    active = []
+    for start_row, start_col, end_row, end_col in sorted(boxes):
+        active = [other for other in active if other[2] >= start_row]
+        if any(start_col <= other[3] and other[1] <= end_col for other in active):
+            return False
+        active.append((start_row, start_col, end_row, end_col))
+    return True
+
+
+def _merge_cells(cells: dict) -> list:
+    blocks = []
+    open_blocks = {}
+    current_row = None
+    runs = []
+    for row, col in sorted(cells):
+        if row != current_row:
+            open_blocks = _stack_runs(blocks, open_blocks, current_row, runs)
+            current_row, runs = row, []
+        if runs and runs[-1][1] == col - 1:
+            runs[-1][1] = col
+            runs[-1][2].append(cells[(row, col)])
+        else:
+            runs.append([col, col, [cells[(row, col)]]])
+    _stack_runs(blocks, open_blocks, current_row, runs)
+    return blocks
+
+
+def _stack_runs(blocks: list, open_blocks: dict, row: int, runs: list) -> dict:
+    # Continues a block from the previous row when a run spans exactly the same columns, otherwise starts a new one.
+    stacked = {}
+    for start_col, end_col, values in runs:
+        block = open_blocks.get((start_col, end_col))
+        if block is not None and block['row'] + len(block['data']) == row:
+            block['data'].append(values)
+        else:
+            block = {'row': row, 'col': start_col, 'data': [values]}
+            blocks.append(block)
+        stacked[(start_col, end_col)] = block
+    return stacked
@@ -0,0 +1,219 @@
+"""
+A1 notation and range algebra. Ranges are tuples (sheet, start_row, start_col, end_row, end_col), 1-based and
+inclusive, as returned by "parse_range"; unbounded sides are None ("Sheet1!A:A" has no rows, "Sheet1" no cells).
+Column letters come from a table built once, so encoding many cells costs a list lookup and a concatenation each.
+"""
+import re
+from functools import lru_cache
+from itertools import product
+from typing import Iterable, Iterator, List, Optional
+
+_RANGE_RE = re.compile(r"^(?:'((?:[^']|'')+)'|([^!]+))(?:!(.*))?$")
+_CELLS_RE = re.compile(r'^([A-Za-z]*)(\d*)(?::([A-Za-z]*)(\d*))?$')
+# Sheet names that can be used without quotes: no spaces or punctuation and not readable as a cell (A1 or R1C1).
+_PLAIN_SHEET_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+_CELL_LIKE_RE = re.compile(r'^(?:[A-Za-z]{1,3}\d+|[Rr]\d*[Cc]\d*|true|false)$', re.IGNORECASE)
+# The widest grid of the Sheets API ends at column ZZZ.
+MAX_TABLE_COLUMN = 18278
+
+_columns = None
+_column_indices = None
+
+
+def _column_table() -> List[str]:
+    # Index -> letters for 1..MAX_TABLE_COLUMN ("" for 0). Built on first use; assignment is atomic.
+    global _columns, _column_indices
+    if _columns is None:
+        letters = [''] + [chr(65 + number) for number in range(26)]
+        letters += [first + second for first, second in product(letters[1:27], repeat=2)]
+        letters += [first + second for first, second in product(letters[1:27], letters[27:])]
+        _column_indices = {name: index for index, name in enumerate(letters)}
+        _columns = letters
+    return _columns
+
+
+def column_to_index(letters: str) -> int:
+    if _column_indices is None:
+        _column_table()
+    index = _column_indices.get(letters)
+    if index is not None:
+        return index
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + ord(char) - 64
+    return index
+
+
+def index_to_column(index: int) -> str:
+    columns = _columns or _column_table()
+    if 0 <= index <= MAX_TABLE_COLUMN:
+        return columns[index]
+    letters = ''
+    while index > 0:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+@lru_cache(maxsize=1024)
+def quote_sheet(sheet: str) -> str:
+    """
+    Quotes a sheet name for A1 notation when needed: "Sheet1" -> "Sheet1", "My sheet" -> "'My sheet'",
+    "Bob's" -> "'Bob''s'", "A1" -> "'A1'". A name that is already quoted ("'My sheet'", as in a range taken
+    from a response) is returned unchanged, so a sheet whose raw name starts and ends with a quote can not be used.
+    """
+    if _PLAIN_SHEET_RE.match(sheet) and not _CELL_LIKE_RE.match(sheet):
+        return sheet
+    if len(sheet) > 2 and sheet[0] == sheet[-1] == "'" and "'" not in sheet[1:-1].replace("''", ''):
+        return sheet
+    return "'" + sheet.replace("'", "''") + "'"
+
+
+def cell_to_a1(row: Optional[int], col: Optional[int]) -> str:
+    """
+    :return: "B3" for (3, 2). A missing side is omitted: (None, 2) -> "B", (3, None) -> "3".
+    """
+    return (index_to_column(col) if col else '') + (str(row) if row else '')
+
+
+def cells_to_a1(cells: Iterable[tuple]) -> List[str]:
+    """
+    Batch version of "cell_to_a1" for many (row, col) pairs with both sides set.
+    """
+    columns = _columns or _column_table()
+    if not isinstance(cells, (list, tuple)):
+        cells = list(cells)
+    if any(not 0 < col <= MAX_TABLE_COLUMN for _, col in cells):
+        return [cell_to_a1(row, col) for row, col in cells]
+    return [columns[col] + str(row) for row, col in cells]
+
+
+def format_range(
+        sheet: Optional[str], start_row: Optional[int] = None, start_col: Optional[int] = None,
+        end_row: Optional[int] = None, end_col: Optional[int] = None
+) -> str:
+    """
+    Inverse of "parse_range": format_range('My sheet', 1, 1, 2, 3) -> "'My sheet'!A1:C2",
+    format_range('data', 1, None, 1, None) -> "data!1:1", format_range('data') -> "data".
+    :param sheet: Raw sheet name, quoted when needed, or an already quoted name. Without a sheet only the cells
+    are returned. (string | None)
+    :return: Range in A1 notation.
+    """
+    if start_row is None and start_col is None and end_row is None and end_col is None:
+        return quote_sheet(sheet) if sheet else ''
+    if end_row is None and end_col is None:
+        end_row, end_col = start_row, start_col
+    cells = f'{cell_to_a1(start_row, start_col)}:{cell_to_a1(end_row, end_col)}'
+    return f'{quote_sheet(sheet)}!{cells}' if sheet else cells
+
+
+def format_ranges(sheet: Optional[str], boxes: Iterable[tuple]) -> List[str]:
+    """
+    Batch version of "format_range" for many bounded boxes (start_row, start_col, end_row, end_col)
+    of one sheet. The sheet name is quoted once.
+    """
+    columns = _columns or _column_table()
+    prefix = quote_sheet(sheet) + '!' if sheet else ''
+    result = []
+    for start_row, start_col, end_row, end_col in boxes:
+        if 0 < start_col <= MAX_TABLE_COLUMN and 0 < end_col <= MAX_TABLE_COLUMN:
+            result.append(f'{prefix}{columns[start_col]}{start_row}:{columns[end_col]}{end_row}')
+        else:
+            result.append(prefix + format_range(None, start_row, start_col, end_row, end_col))
+    return result
+
+
+@lru_cache(maxsize=4096)
+def parse_range(range_: str) -> Optional[tuple]:
+    """
+    Parses A1 notation like "Sheet1!A1:C3", "'My sheet'!B:B" or "Sheet1".
+    :param range_: Range in A1 notation. (string)
+    :return: (sheet, start_row, start_col, end_row, end_col), 1-based and inclusive, unbounded sides are None.
+    None if the range can not be parsed (for example, a named range).
+    """
+    match = _RANGE_RE.match(range_)
+    if not match:
+        return None
+    sheet = match.group(1).replace("''", "'") if match.group(1) else match.group(2)
+    cells = match.group(3)
+    if not cells:
+        return sheet, None, None, None, None
+    cells_match = _CELLS_RE.match(cells)
+    if not cells_match:
+        return None
+    col1, row1, col2, row2 = cells_match.groups()
+    if col2 is None and row2 is None:
+        col2, row2 = col1, row1
+    return (
+        sheet,
+        int(row1) if row1 else None, column_to_index(col1) if col1 else None,
+        int(row2) if row2 else None, column_to_index(col2) if col2 else None,
+    )
+
+
+def _bounds(range_: tuple) -> tuple:
+    # Unbounded sides become 1 and infinity.
+    sheet, start_row, start_col, end_row, end_col = range_
+    inf = float('inf')
+    return (
+        sheet, start_row or 1, start_col or 1,
+        inf if end_row is None else end_row, inf if end_col is None else end_col,
+    )
+
+
+def _unbounds(sheet: str, start_row, start_col, end_row, end_col) -> tuple:
+    inf = float('inf')
+    return (
+        sheet, start_row, start_col,
+        None if end_row == inf else end_row, None if end_col == inf else end_col,
+    )
+
+
+def contains(outer: tuple, inner: tuple) -> bool:
+    """
+    :return: True if every cell of "inner" is in "outer".
+    """
+    sheet1, row1, col1, row2, col2 = _bounds(outer)
+    sheet2, row3, col3, row4, col4 = _bounds(inner)
+    return sheet1 == sheet2 and row1 <= row3 and col1 <= col3 and row4 <= row2 and col4 <= col2
+
+
+def intersect(first: tuple, second: tuple) -> Optional[tuple]:
+    """
+    :return: Range with the cells of both ranges or None if they do not overlap.
+    """
+    sheet1, row1, col1, row2, col2 = _bounds(first)
+    sheet2, row3, col3, row4, col4 = _bounds(second)
+    if sheet1 != sheet2:
+        return None
+    start_row, start_col, end_row, end_col = max(row1, row3), max(col1, col3), min(row2, row4), min(col2, col4)
+    if start_row > end_row or start_col > end_col:
+        return None
+    return _unbounds(sheet1, start_row, start_col, end_row, end_col)
+
+
+def union(first: tuple, second: tuple) -> Optional[tuple]:
+    """
+    :return: The smallest range that contains both ranges (bounding box) or None for different sheets.
+    """
+    sheet1, row1, col1, row2, col2 = _bounds(first)
+    sheet2, row3, col3, row4, col4 = _bounds(second)
+    if sheet1 != sheet2:
+        return None
+    return _unbounds(sheet1, min(row1, row3), min(col1, col3), max(row2, row4), max(col2, col4))
+
+
+def tiles(range_: tuple, rows: int, cols: Optional[int] = None) -> Iterator[tuple]:
+    """
+    Splits a bounded range into tiles of up to "rows" x "cols" cells, row by row.
+    :param range_: Range tuple with all sides set.
+    :param rows: Maximum number of rows in a tile. (int)
+    :param cols: Maximum number of columns in a tile. If not specified, tiles span all columns. (int | None)
+    """
+    sheet, start_row, start_col, end_row, end_col = range_
+    if None in (start_row, start_col, end_row, end_col):
+        raise ValueError(f'Range must be bounded: {range_!r}')
+    cols = cols or end_col - start_col + 1
+    for row in range(start_row, end_row + 1, rows):
+        for col in range(start_col, end_col + 1, cols):
+            yield sheet, row, col, min(row + rows - 1, end_row), min(col + cols - 1, end_col)
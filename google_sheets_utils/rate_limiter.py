@@ -0,0 +1,184 @@
+import os
+import struct
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_STATE = struct.Struct('dd')
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Tokens are reserved in order of arrival, so waiting callers are served one after
+    another with an even interval instead of all retrying at the same moment.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        :param rate: Tokens added per second. (float)
+        :param capacity: Maximum number of tokens that can be spent at once after an idle period. (float)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Takes tokens from the bucket, going into debt if there are not enough of them.
+        :param tokens: Number of tokens. (float)
+        :return: Time in seconds the caller must wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, self._updated = _take(self._tokens, self._updated, now, self.rate, self.capacity, tokens)
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens: float = 1) -> None:
+        """
+        Blocks until the tokens are available.
+        :param tokens: Number of tokens. (float)
+        """
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    def close(self) -> None:
+        """
+        Releases the resources of the bucket. Nothing to release for an in-memory bucket.
+        """
+
+    def __enter__(self) -> 'TokenBucket':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket with the state stored in a file, so several processes on one host share the same quota.
+    The file is locked with "fcntl.flock" while the state is updated (POSIX only). A flock belongs to the
+    open file, which a forked child shares with its parent, so the child reopens the file on first use.
+    """
+
+    def __init__(self, path: str, rate: float, capacity: float):
+        """
+        :param path: Path to the state file. It is created if missing. (string)
+        :param rate: Tokens added per second. (float)
+        :param capacity: Maximum number of tokens that can be spent at once after an idle period. (float)
+        """
+        if fcntl is None:
+            raise OSError('FileTokenBucket requires fcntl, it is not available on this platform')
+        super().__init__(rate, capacity)
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        self._pid = os.getpid()
+
+    def reserve(self, tokens: float = 1) -> float:
+        with self._lock:
+            if self._fd is None:
+                raise ValueError('FileTokenBucket is closed')
+            if self._pid != os.getpid():
+                # The inherited descriptor stays open for the parent, only this process' copy is replaced.
+                os.close(self._fd)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+                self._pid = os.getpid()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                state = os.pread(self._fd, _STATE.size, 0)
+                current, updated = _STATE.unpack(state) if len(state) == _STATE.size else (self.capacity, now)
+                current, updated = _take(current, updated, now, self.rate, self.capacity, tokens)
+                os.pwrite(self._fd, _STATE.pack(current, updated), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            return max(0.0, -current / self.rate)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def _take(current: float, updated: float, now: float, rate: float, capacity: float, tokens: float) -> tuple:
+    current = min(capacity, current + max(0.0, now - updated) * rate)
+    return current - tokens, now
+
+
+class QuotaLimiter:
+    """
+    Client-side limiter for the Sheets API per-minute quotas. Read and write requests have separate buckets,
+    each request takes a token from the per-project and from the per-user bucket of its kind.
+    Defaults are the standard Sheets API quotas: 300 requests per minute per project and
+    60 requests per minute per user, for reads and for writes.
+    """
+
+    def __init__(
+            self, read_per_minute: int = 300, write_per_minute: int = 300,
+            user_read_per_minute: Optional[int] = 60, user_write_per_minute: Optional[int] = 60,
+            burst: float = 0.1, shared_path: Optional[str] = None
+    ):
+        """
+        :param read_per_minute: Read requests per minute per project. (int)
+        :param write_per_minute: Write requests per minute per project. (int)
+        :param user_read_per_minute: Read requests per minute per user. None disables the bucket. (int | None)
+        :param user_write_per_minute: Write requests per minute per user. None disables the bucket. (int | None)
+        :param burst: Share of the per-minute quota that can be spent at once after an idle period. (float)
+        :param shared_path: Path prefix for state files. If specified, the quota is shared by all processes
+        using the same prefix. (string | None)
+        """
+        self.buckets = {'read': [], 'write': []}
+        limits = (
+            ('read', 'project', read_per_minute), ('read', 'user', user_read_per_minute),
+            ('write', 'project', write_per_minute), ('write', 'user', user_write_per_minute),
+        )
+        for kind, scope, per_minute in limits:
+            if not per_minute:
+                continue
+            capacity = max(1.0, per_minute * burst)
+            # Refill slower by the burst size, so that no 60 seconds window goes over the quota.
+            rate = max(per_minute - capacity, 1.0) / 60
+            if shared_path:
+                bucket = FileTokenBucket(f'{shared_path}-{kind}-{scope}', rate, capacity)
+            else:
+                bucket = TokenBucket(rate, capacity)
+            self.buckets[kind].append(bucket)
+
+    def reserve(self, kind: str) -> float:
+        """
+        Reserves quota for one request.
+        :param kind: Request kind. Can take values "read", "write". (string)
+        :return: Time in seconds the caller must wait before sending the request.
+        """
+        return max([bucket.reserve() for bucket in self.buckets[kind]] + [0.0])
+
+    def acquire(self, kind: str) -> None:
+        """
+        Blocks until there is quota for one request.
+        :param kind: Request kind. Can take values "read", "write". (string)
+        """
+        delay = self.reserve(kind)
+        if delay:
+            time.sleep(delay)
+
+    def close(self) -> None:
+        """
+        Closes the state files of a shared limiter.
+        """
+        for buckets in self.buckets.values():
+            for bucket in buckets:
+                bucket.close()
+
+    def __enter__(self) -> 'QuotaLimiter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
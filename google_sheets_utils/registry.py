@@ -0,0 +1,89 @@
+"""
+Process-level registry of credentials and built API resources. Clients created with the same credentials file
+and scopes share one scoped credentials object, so the service account file is read once and one access token
+is requested per process. Requests are always executed with connections
+of the client's own HttpPool, so the Sheets API resources (which take hundreds of milliseconds to build from
+the discovery document) do not depend on credentials and are built once per endpoint, on the first request.
+"""
+import json
+import os
+import threading
+from typing import Optional
+
+_lock = threading.Lock()
+_credentials = {}
+_resources = {}
+
+
+def _creds_key(creds_path: Optional[str], scopes: Optional[list]) -> Optional[tuple]:
+    return (os.path.abspath(creds_path), tuple(sorted(scopes or ()))) if creds_path else None
+
+
+def get_credentials(creds_path: Optional[str], scopes: Optional[list] = None):
+    """
+    :param creds_path: Path to the service account file. (string | None)
+    :param scopes: OAuth scopes of the credentials. (list | None)
+    :return: Shared scoped credentials of the file, None if no path is given.
+    """
+    key = _creds_key(creds_path, scopes)
+    if key is None:
+        return None
+    creds = _credentials.get(key)
+    if creds is None:
+        from google.oauth2.service_account import Credentials
+
+        with _lock:
+            creds = _credentials.get(key)
+            if creds is None:
+                creds = _credentials[key] = Credentials.from_service_account_file(key[0], scopes=scopes or None)
+    return creds
+
+
+def _slim_document() -> Optional[dict]:
+    # Schemas of the discovery document are only used to generate docstrings of the API methods, which takes
+    # most of the build time (~0.4 s). Request bodies are not validated against them, so they are replaced by stubs.
+    from googleapiclient import discovery_cache
+
+    content = discovery_cache.get_static_doc('sheets', 'v4')
+    if content is None:
+        return None
+    document = json.loads(content)
+    document['schemas'] = {name: {'id': name, 'type': 'object'} for name in document.get('schemas', {})}
+    return document
+
+
+def get_resources(api_endpoint: Optional[str] = None) -> tuple:
+    """
+    Builds the Sheets API service from the discovery document bundled with google-api-python-client
+    (no network request) or returns the already built one.
+    :param api_endpoint: Base URL of the Sheets API. (string | None)
+    :return: (service, spreadsheets resource, values resource)
+    """
+    key = api_endpoint
+    resources = _resources.get(key)
+    if resources is None:
+        import httplib2
+        from googleapiclient.discovery import build, build_from_document
+
+        with _lock:
+            resources = _resources.get(key)
+            if resources is None:
+                client_options = {'api_endpoint': api_endpoint} if api_endpoint else None
+                # This transport is never used: requests are executed with "http" of the client's HttpPool.
+                document = _slim_document()
+                if document is not None:
+                    service = build_from_document(document, http=httplib2.Http(), client_options=client_options)
+                else:
+                    service = build('sheets', 'v4', http=httplib2.Http(), client_options=client_options)
+                spreadsheets = service.spreadsheets()
+                resources = _resources[key] = (service, spreadsheets, spreadsheets.values())
+    return resources
+
+
+def clear() -> None:
+    """
+    Forgets all shared credentials and resources (for example, after the credentials file was replaced).
+    """
+    with _lock:
+        _credentials.clear()
+        _resources.clear()
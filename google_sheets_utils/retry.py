@@ -0,0 +1,191 @@
+import http.client
+import random
+import socket
+import ssl
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional
+
+import httplib2
+
+from google_sheets_utils.errors import RetriesExhaustedError, exceptions_handler_for_requests, http_status
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Network failures only: other OSErrors (a missing credentials file, a full disk) are not transient.
+RETRY_EXCEPTIONS = (
+    ConnectionError, TimeoutError, socket.timeout, socket.gaierror, ssl.SSLError,
+    http.client.HTTPException, httplib2.HttpLib2Error,
+)
+# Failures that happen before the request reaches the server (no connection), safe to retry for any request.
+UNSENT_EXCEPTIONS = (ConnectionRefusedError, socket.gaierror, httplib2.ServerNotFoundError)
+# Requests of "spreadsheets().batchUpdate" that add something on every call and must not be repeated blindly.
+NON_IDEMPOTENT_REQUESTS = frozenset((
+    'addSheet', 'duplicateSheet', 'insertDimension', 'appendDimension', 'moveDimension', 'appendCells',
+    'insertRange', 'addNamedRange', 'addProtectedRange', 'addFilterView', 'duplicateFilterView', 'addChart',
+    'addConditionalFormatRule', 'addBanding', 'addDimensionGroup', 'addSlicer', 'addDataSource',
+))
+
+
+def is_idempotent_body(body: dict) -> bool:
+    """
+    :param body: Body of a "spreadsheets().batchUpdate" request. (dict)
+    :return: False if repeating the request could apply it twice (for example add a second sheet).
+    """
+    return not any(NON_IDEMPOTENT_REQUESTS.intersection(request) for request in body.get('requests', ()))
+
+
+class RetryBudget:
+    """
+    Limits retries across all requests that share the budget. Every first attempt deposits "ratio" tokens,
+    every retry withdraws one, and "min_per_second" tokens are added over time. When the API is struggling,
+    the budget runs out and requests fail fast instead of multiplying the load with retries.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, capacity: float = 20.0):
+        """
+        :param ratio: Tokens deposited by every request. 0.2 allows one retry per five requests. (float)
+        :param min_per_second: Tokens added per second regardless of the traffic. (float)
+        :param capacity: Maximum number of saved tokens. (float)
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.__refill()
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Takes a token for one retry.
+        :return: False if the budget is exhausted and the request must not be retried.
+        """
+        with self._lock:
+            self.__refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+
+DEFAULT_RETRY_BUDGET = RetryBudget()
+
+
+class RetryPolicy:
+    """
+    Retries transient failures (HTTP 429/5xx, SSL and socket errors) with exponential backoff and full jitter.
+    A "Retry-After" header of the response is honored up to "max_delay". Other errors are converted by
+    "exceptions_handler_for_requests". When no attempts are left, RetriesExhaustedError is raised.
+    Non-idempotent requests (appends, added sheets) may have been applied when a 5xx or a timeout comes back,
+    so they are retried only on 429 and on errors raised before the request was sent.
+    """
+
+    def __init__(
+            self, retries: int = 5, base_delay: float = 0.5, max_delay: float = 32.0,
+            retry_statuses: tuple = RETRY_STATUSES, retry_exceptions: tuple = RETRY_EXCEPTIONS,
+            budget: Optional[RetryBudget] = None, unsent_exceptions: tuple = UNSENT_EXCEPTIONS
+    ):
+        """
+        :param retries: Maximum number of attempts of one request. (int)
+        :param base_delay: Upper bound of the first backoff delay in seconds. (float)
+        :param max_delay: Upper bound of any backoff delay in seconds. (float)
+        :param retry_statuses: HTTP statuses that are retried. (tuple)
+        :param retry_exceptions: Exception types that are retried. (tuple)
+        :param budget: Retry budget. If not specified, the process-wide DEFAULT_RETRY_BUDGET is used.
+        (RetryBudget | None)
+        :param unsent_exceptions: Exception types raised before the request is sent. Only these and 429
+        are retried for non-idempotent requests. (tuple)
+        """
+        self.retries = max(1, retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+        self.retry_exceptions = retry_exceptions
+        self.budget = budget or DEFAULT_RETRY_BUDGET
+        self.unsent_exceptions = unsent_exceptions
+
+    def is_retryable(self, error: Exception, idempotent: bool = True) -> bool:
+        status = http_status(error)
+        if status is not None:
+            return status in self.retry_statuses and (idempotent or status == 429)
+        if not idempotent:
+            return isinstance(error, self.unsent_exceptions)
+        return isinstance(error, self.retry_exceptions)
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """
+        Returns the delay before the next attempt.
+        :param attempt: Number of the failed attempt, starting from 1. (int)
+        :param error: Error of the failed attempt. (Exception)
+        :return: Delay in seconds.
+        """
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def run(self, attempt: Callable[[], Any], idempotent: bool = True) -> Any:
+        """
+        Calls "attempt" until it succeeds or the request can not be retried any more.
+        :param attempt: Function that sends the request and returns its result.
+        :param idempotent: False for requests that must not be applied twice. (bool)
+        :return: Result of the successful attempt.
+        """
+        self.budget.deposit()
+        for number in range(1, self.retries + 1):
+            try:
+                return attempt()
+            except Exception as error:
+                time.sleep(self.__next_delay(number, error, idempotent))
+
+    async def run_async(self, attempt: Callable[[], Any], idempotent: bool = True) -> Any:
+        """
+        Same as "run" for a function returning a coroutine.
+        :param attempt: Function that returns a coroutine sending the request.
+        :param idempotent: False for requests that must not be applied twice. (bool)
+        :return: Result of the successful attempt.
+        """
+        import asyncio
+
+        self.budget.deposit()
+        for number in range(1, self.retries + 1):
+            try:
+                return await attempt()
+            except Exception as error:
+                await asyncio.sleep(self.__next_delay(number, error, idempotent))
+
+    def __next_delay(self, number: int, error: Exception, idempotent: bool) -> float:
+        # Raises if the error is final, otherwise returns the delay before the next attempt.
+        if not self.is_retryable(error, idempotent):
+            exceptions_handler_for_requests(error)
+            raise error
+        if number >= self.retries:
+            raise RetriesExhaustedError(error, number) from error
+        if not self.budget.withdraw():
+            raise RetriesExhaustedError(error, number, budget_exhausted=True) from error
+        return self.backoff(number, error)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    resp = getattr(error, 'resp', None)
+    value = resp.get('retry-after') if resp is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,145 @@
+import threading
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+def copy_values(values: Optional[list]) -> Optional[list]:
+    """
+    Copies a matrix of values (list of rows), so callers sharing one response can change their rows.
+    """
+    if values is None:
+        return None
+    return [list(row) if isinstance(row, list) else row for row in values]
+
+
+def copy_value_ranges(value_ranges: list) -> list:
+    """
+    Copies value ranges of a "values().batchGet" response.
+    """
+    return [
+        {**value_range, 'values': copy_values(value_range['values'])} if 'values' in value_range else dict(value_range)
+        for value_range in value_ranges
+    ]
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Merges identical concurrent calls: while a call with some key is in flight, other threads calling with
+    the same key wait for it and receive its result or its exception instead of sending their own request.
+    A key is forgotten as soon as its call completes, so a result is never reused after that.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: Hashable, function: Callable[[], Any], copy: Optional[Callable[[Any], Any]] = None) -> Any:
+        """
+        :param key: Key of the call, for example (spreadsheet, range, value render option, major dimension).
+        :param function: Function that sends the request.
+        :param copy: Function applied to the result for every caller when the call was shared, so each of them
+        (the first one included) gets its own object and the shared result is never changed. If not specified,
+        all callers receive the same object. (callable | None)
+        :return: Result of "function".
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy(call.result) if copy else call.result
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            self.__release(key, call)
+            call.done.set()
+        # No caller joins after the release, so an unshared result is returned without a copy.
+        return copy(call.result) if copy and call.followers else call.result
+
+    def forget(self, spreadsheet: Optional[str] = None) -> None:
+        """
+        Makes calls started after this point send their own request even if an identical call is in flight,
+        for example after a write to the spreadsheet. Keys are tuples starting with the spreadsheet ID.
+        :param spreadsheet: Spreadsheet ID. If not specified, all keys are forgotten. (string | None)
+        """
+        with self._lock:
+            for key in list(self._calls):
+                if spreadsheet is None or key[0] == spreadsheet:
+                    del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __release(self, key: Hashable, call: _Call) -> None:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio version of SingleFlight. The call runs in its own task, so cancelling one of the waiting
+    coroutines (including the first one) does not cancel the request for the others.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(
+            self, key: Hashable, function: Callable[[], Awaitable[Any]], copy: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
+        """
+        :param key: Key of the call, for example (spreadsheet, range, value render option, major dimension).
+        :param function: Coroutine function that sends the request.
+        :param copy: Function applied to the result returned to the waiting callers. (callable | None)
+        :return: Result of "function".
+        """
+        import asyncio
+
+        task = self._calls.get(key)
+        leader = task is None
+        if leader:
+            task = self._calls[key] = asyncio.ensure_future(function())
+            task.followers = 0
+            task.add_done_callback(lambda done: self.__release(key, done))
+        else:
+            task.followers += 1
+        result = await asyncio.shield(task)
+        # The release callback runs before the callers resume, so "followers" is final here.
+        return copy(result) if copy is not None and task.followers else result
+
+    def forget(self, spreadsheet: Optional[str] = None) -> None:
+        """
+        Same as SingleFlight.forget.
+        """
+        for key in list(self._calls):
+            if spreadsheet is None or key[0] == spreadsheet:
+                del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __release(self, key: Hashable, task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Marks the exception as retrieved when every waiting coroutine was cancelled.
+            task.exception()
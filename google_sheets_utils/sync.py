@@ -0,0 +1,102 @@
+from typing import Optional
+
+
+def _render(value) -> str:
+    """
+    Renders a cell value the way the API returns it with the "FORMATTED_VALUE" render option:
+    booleans become "TRUE"/"FALSE" and whole floats lose their fractional part.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def same_value(old, new) -> bool:
+    """
+    Compares a cell read from the sheet with a new value. Values read back from the API are often strings,
+    so both values are rendered the way the API formats them: "10" and 10, "TRUE" and True, "1" and 1.0
+    are considered equal. Empty string and None both mean an empty cell.
+    """
+    return old == new or _render(old) == _render(new)
+
+
+def diff_matrices(old: list, new: list) -> list:
+    """
+    Finds cells that differ between the current and the new contents of a worksheet.
+    Cells that exist only in the current contents are cleared (written as empty strings).
+    :param old: Current contents of the worksheet (matrix, rows may be ragged).
+    :param new: New contents of the worksheet (matrix, rows may be ragged).
+    :return: List in the format of "update_sheet_by_indices": one entry per run of changed cells in a row.
+    """
+    indices = []
+    for row_index in range(max(len(old), len(new))):
+        old_row = old[row_index] if row_index < len(old) else []
+        new_row = new[row_index] if row_index < len(new) else []
+        run_start, run = None, []
+        for col_index in range(max(len(old_row), len(new_row))):
+            old_value = old_row[col_index] if col_index < len(old_row) else ''
+            new_value = new_row[col_index] if col_index < len(new_row) else ''
+            if same_value(old_value, new_value):
+                if run:
+                    indices.append({'row': row_index + 1, 'col': run_start + 1, 'data': [run]})
+                    run_start, run = None, []
+                continue
+            if not run:
+                run_start = col_index
+            run.append('' if new_value is None else new_value)
+        if run:
+            indices.append({'row': row_index + 1, 'col': run_start + 1, 'data': [run]})
+    return indices
+
+
+def align_by_key(old: list, new: list, key_index: int) -> list:
+    """
+    Arranges the new rows so that a row keeps its current position in the worksheet if its key is already there.
+    Rows with new keys are placed after the current rows, rows whose key disappeared become empty.
+    The first row (header) is compared by position. Raises ValueError if a key is in several rows of "old"
+    or of "new", as the rows can not be matched.
+    :param old: Current contents of the worksheet, header row first.
+    :param new: New contents of the worksheet, header row first.
+    :param key_index: Index of the key column.
+    :return: Matrix with the target contents of the worksheet.
+    """
+    positions = {}
+    for row_index in range(1, len(old)):
+        key = _key(old[row_index], key_index)
+        if key is not None:
+            positions.setdefault(key, row_index)
+    _check_unique(old, key_index, len(positions), 'the worksheet')
+    _check_unique(new, key_index, None, 'the new rows')
+
+    target = [new[0] if new else []] + [[] for _ in range(max(len(old) - 1, 0))]
+    for row in new[1:]:
+        position = positions.pop(_key(row, key_index), None)
+        if position is None:
+            target.append(row)
+        else:
+            target[position] = row
+    return target
+
+
+def _check_unique(matrix: list, key_index: int, unique: Optional[int], where: str) -> None:
+    keys = [key for key in (_key(row, key_index) for row in matrix[1:]) if key is not None]
+    if unique is None:
+        unique = len(set(keys))
+    if unique == len(keys):
+        return
+    seen, duplicates = set(), []
+    for key in keys:
+        if key in seen and key not in duplicates:
+            duplicates.append(key)
+        seen.add(key)
+    raise ValueError(f'Keys found in several rows of {where}: {duplicates[:10]!r}')
+
+
+def _key(row: list, key_index: int) -> Optional[str]:
+    if key_index >= len(row) or row[key_index] in ('', None):
+        return None
+    return str(row[key_index])
@@ -0,0 +1,109 @@
+from array import array
+from itertools import zip_longest
+from typing import Iterator, Optional, Union
+
+from google_sheets_utils.header_index import HeaderIndex
+
+_NAN = float('nan')
+
+
+class Table:
+    """
+    Column-wise worksheet data. Ragged rows returned by the API are padded with empty strings once,
+    columns are stored as tuples and converted on first access. With numeric=True (data read with
+    "UNFORMATTED_VALUE") a column that holds only numbers and empty cells becomes array('d'),
+    empty cells are NaN. Columns are available by index or by header name (case, tabs and spaces are omitted).
+    """
+    __slots__ = ('header', 'height', 'numeric', '_columns', '_converted', '_index')
+
+    def __init__(self, values: Optional[list], major_dimension: Optional[str] = None, numeric: bool = False):
+        """
+        :param values: Data in the format returned by the API, the first row (column) is the header. (list | None)
+        :param major_dimension: majorDimension of "values". Can take values "ROWS", "COLUMNS". (string | None)
+        :param numeric: Convert numeric columns to array('d'). (bool)
+        """
+        values = values or []
+        if major_dimension == 'COLUMNS':
+            header = [column[0] if column else '' for column in values]
+            height = max([len(column) for column in values] + [1]) - 1
+            columns = [tuple(column[1:]) + ('',) * (height - len(column[1:])) for column in values]
+        else:
+            header = list(values[0]) if values else []
+            columns = list(zip_longest(*values[1:], fillvalue=''))
+            height = max(len(values) - 1, 0)
+            columns += [('',) * height] * (len(header) - len(columns))
+            header += [''] * (len(columns) - len(header))
+        self.header = header
+        self.height = height
+        self.numeric = numeric
+        self._columns = columns
+        self._converted = [False] * len(columns)
+        self._index = HeaderIndex(header)
+
+    def __len__(self) -> int:
+        return self.height
+
+    @property
+    def width(self) -> int:
+        return len(self._columns)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __getitem__(self, key: Union[int, str]) -> Union[tuple, array]:
+        return self.column(key)
+
+    def column_index(self, name: str) -> Optional[int]:
+        """
+        :param name: Column name. Case, tabs and spaces are omitted.
+        :return: Index of the column or None if not found.
+        """
+        return self._index.index(name)
+
+    def columns_indices(self, columns: dict) -> dict:
+        """
+        Same as GoogleSheets.get_columns_indices for the header of the table.
+        """
+        return self._index.indices(columns)
+
+    def column(self, key: Union[int, str]) -> Union[tuple, array]:
+        """
+        :param key: Column index or name.
+        :return: Column values without the header: tuple or array('d') for numeric columns.
+        """
+        index = key if isinstance(key, int) else self._index.index(key)
+        if index is None:
+            raise KeyError(key)
+        if not self._converted[index]:
+            if self.numeric:
+                self._columns[index] = self.__convert(self._columns[index])
+            self._converted[index] = True
+        return self._columns[index]
+
+    def row(self, index: int) -> list:
+        """
+        :param index: Row index without the header (0 is the first data row).
+        :return: Padded row.
+        """
+        if not -self.height <= index < self.height:
+            raise IndexError(index)
+        return [self.column(col)[index] for col in range(self.width)]
+
+    def rows(self) -> Iterator[tuple]:
+        """
+        Iterates over padded data rows.
+        """
+        return zip(*[self.column(col) for col in range(self.width)])
+
+    def to_list(self) -> list:
+        """
+        :return: Padded matrix with the header row.
+        """
+        return [list(self.header)] + [list(row) for row in self.rows()]
+
+    @staticmethod
+    def __convert(values: tuple) -> Union[tuple, array]:
+        for value in values:
+            if value != '' and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                return values
+        return array('d', [_NAN if value == '' else value for value in values])
@@ -1,5 +1,7 @@
 import re
 
+_SPACES = re.compile(r'[\t\s]')
+
 
 def all_to_low_and_del_spc(string: str) -> str:
-    return re.sub(r'[\t\s]', '', string).lower()
+    return _SPACES.sub('', string).lower()
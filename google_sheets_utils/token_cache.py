@@ -0,0 +1,178 @@
+"""
+Access tokens shared by the processes of one machine. Every process that uses the same cache file gets the token
+from the file; only the process that finds no usable token there asks the token endpoint, under an exclusive
+file lock, and writes the new token for the others. After a restart of N workers the endpoint is called once.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    # Exclusive lock between processes, released when the file is closed (also if the process dies).
+    with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), 'r+b') as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FileTokenCache:
+    """
+    JSON file with tokens of several credentials: {key: {"token": str, "expiry": unix time}}.
+    Writes are atomic (temporary file + rename), so readers never see a partial file. The file holds bearer
+    tokens: it is created readable by the owner only, keep it in a directory other users can not write to.
+
+        cache = FileTokenCache(os.path.expanduser('~/.cache/google_sheets_tokens.json'))
+        google = GoogleSheets(creds_path, token_cache=cache)
+    """
+
+    def __init__(self, path: str, refresh_margin: float = 300.0):
+        """
+        :param path: Path of the cache file. The lock file is "path" + ".lock". (string)
+        :param refresh_margin: A token is refreshed when it expires in less than "refresh_margin" seconds. (float)
+        """
+        self.path = path
+        self.refresh_margin = refresh_margin
+        self.lock_path = path + '.lock'
+
+    def wrap(self, creds, key: Optional[str] = None) -> 'SharedTokenCredentials':
+        """
+        :param creds: Google credentials that can refresh their token (for example service account credentials).
+        :param key: Key of the token in the file. Default is the service account email and the scopes. (string | None)
+        :return: Credentials that take the token from the cache.
+        """
+        return SharedTokenCredentials(creds, self, key)
+
+    def get(self, key: str) -> Optional[tuple]:
+        """
+        :return: (token, expiry as unix time) or None.
+        """
+        entry = self.__read().get(key)
+        if not entry or not entry.get('token'):
+            return None
+        return entry['token'], float(entry.get('expiry') or 0)
+
+    def set(self, key: str, token: str, expiry: float) -> None:
+        # Called under the lock, see "SharedTokenCredentials.refresh".
+        entries = {
+            name: entry for name, entry in self.__read().items() if float(entry.get('expiry') or 0) > time.time()
+        }
+        entries[key] = {'token': token, 'expiry': expiry}
+        # mkstemp creates a new file with mode 0600 (O_EXCL), so an existing file or symlink is never followed.
+        directory, name = os.path.split(os.path.abspath(self.path))
+        descriptor, temp_path = tempfile.mkstemp(prefix=name + '.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(descriptor, 'w') as file:
+                json.dump(entries, file)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        with _file_lock(self.lock_path):
+            yield
+
+    def __read(self) -> dict:
+        try:
+            with open(self.path) as file:
+                entries = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+
+class SharedTokenCredentials:
+    """
+    Wraps credentials so that their token comes from a FileTokenCache. Implements the part of the
+    google.auth credentials interface used by the HTTP transports (valid, token, refresh, before_request, apply).
+    """
+
+    def __init__(self, creds, cache: FileTokenCache, key: Optional[str] = None):
+        self.creds = creds
+        self.cache = cache
+        self.key = key or self.__default_key(creds)
+        self.token = None
+        self.expires_at = 0.0
+        self.network_refreshes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def expiry(self) -> Optional[datetime]:
+        # Naive UTC datetime, same as google.auth credentials.
+        if not self.token:
+            return None
+        return datetime.fromtimestamp(self.expires_at, timezone.utc).replace(tzinfo=None)
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at - self.cache.refresh_margin
+
+    @property
+    def valid(self) -> bool:
+        return self.token is not None and not self.expired
+
+    def refresh(self, request) -> None:
+        """
+        Takes a fresh token from the cache file. If there is none, or the cached token is the one this object
+        already holds (it expires soon or was rejected by the API), gets a new token with "request".
+        """
+        with self._lock, self.cache.lock():
+            cached = self.cache.get(self.key)
+            if cached is not None and cached[0] != self.token and cached[1] - time.time() > self.cache.refresh_margin:
+                self.token, self.expires_at = cached
+                return
+            self.creds.refresh(request)
+            self.network_refreshes += 1
+            self.token = self.creds.token
+            self.expires_at = self.__expiry_time(self.creds.expiry)
+            self.cache.set(self.key, self.token, self.expires_at)
+
+    def apply(self, headers: dict, token: Optional[str] = None) -> None:
+        headers['authorization'] = f'Bearer {token or self.token}'
+
+    def before_request(self, request, method, url, headers) -> None:
+        if not self.valid:
+            self.refresh(request)
+        self.apply(headers)
+
+    @staticmethod
+    def __default_key(creds) -> str:
+        scopes = getattr(creds, 'scopes', None) or getattr(creds, 'default_scopes', None) or []
+        identity = getattr(creds, 'service_account_email', None) or type(creds).__name__
+        return f'{identity} {" ".join(sorted(scopes))}'.strip()
+
+    @staticmethod
+    def __expiry_time(expiry: Optional[datetime]) -> float:
+        # google.auth returns naive UTC datetimes. Without an expiry the token is kept for an hour.
+        if expiry is None:
+            return time.time() + 3600
+        if expiry.tzinfo is None:
+            expiry = expiry.replace(tzinfo=timezone.utc)
+        return expiry.timestamp()
@@ -0,0 +1,61 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import httplib2
+
+
+class HttpPool:
+    """
+    Bounded pool of keep-alive HTTP connections. httplib2.Http is not thread-safe, so every request checks out
+    a connection for its own exclusive use and returns it afterwards. Connections are created lazily,
+    when all "size" connections are busy the caller waits for a free one.
+    """
+
+    def __init__(self, creds=None, size: int = 10, timeout: Optional[float] = None, token_cache=None):
+        """
+        :param creds: Google credentials with scopes, used as is (shared clients share the token).
+        If None, requests are sent without authorization.
+        :param size: Maximum number of connections. (int)
+        :param timeout: Socket timeout in seconds. (float | None)
+        :param token_cache: Cache that shares access tokens between processes. (FileTokenCache | None)
+        """
+        if creds is not None and token_cache is not None:
+            creds = token_cache.wrap(creds)
+        self.creds = creds
+        self.size = size
+        self.timeout = timeout
+        self.created = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[httplib2.Http]:
+        """
+        Checks out a connection: with pool.connection() as http: request.execute(http=http)
+        """
+        http = self.__checkout()
+        try:
+            yield http
+        finally:
+            self._idle.put(http)
+
+    def __checkout(self) -> httplib2.Http:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self.created < self.size:
+                self.created += 1
+                return self.__create()
+        return self._idle.get()
+
+    def __create(self) -> httplib2.Http:
+        http = httplib2.Http(timeout=self.timeout)
+        if self.creds is None:
+            return http
+        from google_auth_httplib2 import AuthorizedHttp
+
+        return AuthorizedHttp(self.creds, http=http)
@@ -0,0 +1,128 @@
+import time
+from array import array
+from difflib import SequenceMatcher
+from hashlib import blake2b
+from typing import List, Optional, Tuple
+
+
+def row_fingerprint(row: list) -> int:
+    """
+    :return: 64-bit hash of the row values. Trailing empty cells are ignored, as the API omits them.
+    """
+    end = len(row)
+    while end and row[end - 1] in ('', None):
+        end -= 1
+    # repr keeps the types apart ("1" and 1) and is faster than JSON for the str/number/bool values of the API.
+    data = repr(row[:end] if end < len(row) else row).encode('utf-8', 'surrogatepass')
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'little')
+
+
+def fingerprints(rows: Optional[list]) -> array:
+    return array('Q', map(row_fingerprint, rows or []))
+
+
+class RowChange:
+    """
+    One changed row. "row" is the 1-based row number in the new data for inserted and modified rows,
+    and in the previous snapshot for deleted rows ("values" is None for them).
+    """
+    __slots__ = ('kind', 'row', 'values')
+
+    INSERTED = 'inserted'
+    MODIFIED = 'modified'
+    DELETED = 'deleted'
+
+    def __init__(self, kind: str, row: int, values: Optional[list] = None):
+        self.kind = kind
+        self.row = row
+        self.values = values
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RowChange) and (self.kind, self.row, self.values) == (
+            other.kind, other.row, other.values
+        )
+
+    def __repr__(self) -> str:
+        return f'RowChange({self.kind!r}, {self.row}, {self.values!r})'
+
+
+class Snapshot:
+    """
+    State of a watched range: one 64-bit fingerprint per row (8 bytes per row), not the values.
+    """
+    __slots__ = ('spreadsheet', 'worksheet', 'value_render_option', 'fingerprints', 'taken')
+
+    def __init__(
+            self, spreadsheet: str, worksheet: str, value_render_option: Optional[str] = None,
+            row_fingerprints: Optional[array] = None, taken: Optional[float] = None
+    ):
+        """
+        :param spreadsheet: Spreadsheet ID. (string)
+        :param worksheet: Worksheet name or range. (string)
+        :param value_render_option: ValueRenderOption used to read the range. (string | None)
+        :param row_fingerprints: Fingerprints of the rows. An empty snapshot reports all rows as inserted. (array)
+        :param taken: Time of the read (time.time()). (float | None)
+        """
+        self.spreadsheet = spreadsheet
+        self.worksheet = worksheet
+        self.value_render_option = value_render_option
+        self.fingerprints = row_fingerprints if row_fingerprints is not None else array('Q')
+        self.taken = taken
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def advance(self, rows: Optional[list]) -> Tuple[List[RowChange], 'Snapshot']:
+        """
+        Compares new data of the range with the snapshot.
+        :param rows: Current values of the range. (list | None)
+        :return: (changes in row order, snapshot of the new data)
+        """
+        rows = rows or []
+        new = fingerprints(rows)
+        changes = diff_fingerprints(self.fingerprints, new, rows)
+        return changes, Snapshot(self.spreadsheet, self.worksheet, self.value_render_option, new, time.time())
+
+
+def diff_fingerprints(old: array, new: array, rows: list) -> List[RowChange]:
+    """
+    :param old: Fingerprints of the previous data.
+    :param new: Fingerprints of the current data.
+    :param rows: Current data, used for the values of inserted and modified rows.
+    :return: List with RowChange objects.
+    """
+    # The common head and tail are skipped first, so appends and single inserts do not reach the matcher.
+    head = 0
+    limit = min(len(old), len(new))
+    while head < limit and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old[len(old) - 1 - tail] == new[len(new) - 1 - tail]:
+        tail += 1
+
+    if len(old) == len(new):
+        # Usual case: cells were edited in place, compared position by position in O(rows). If a changed
+        # position holds a row that was at another changed position, rows were moved (for example a delete
+        # and an append) and the rows below must not be reported as modified, so the matcher aligns them.
+        changed = [index for index in range(head, len(new) - tail) if old[index] != new[index]]
+        replaced = {old[index] for index in changed}
+        if not any(new[index] in replaced for index in changed):
+            return [RowChange(RowChange.MODIFIED, index + 1, rows[index]) for index in changed]
+
+    # Rows were inserted, deleted or moved: align equal rows so that the rows below are not reported as modified.
+    changes = []
+    matcher = SequenceMatcher(
+        None, old[head:len(old) - tail].tolist(), new[head:len(new) - tail].tolist(), autojunk=False
+    )
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        old_start, old_end, new_start, new_end = old_start + head, old_end + head, new_start + head, new_end + head
+        common = min(old_end - old_start, new_end - new_start) if tag == 'replace' else 0
+        for offset in range(common):
+            changes.append(RowChange(RowChange.MODIFIED, new_start + offset + 1, rows[new_start + offset]))
+        for index in range(old_start + common, old_end):
+            changes.append(RowChange(RowChange.DELETED, index + 1))
+        for index in range(new_start + common, new_end):
+            changes.append(RowChange(RowChange.INSERTED, index + 1, rows[index]))
+    return changes
@@ -12,5 +12,8 @@ setup(
     author_email="ltrix02@gmail.com",
     url="https://github.com/ltrix07/google_sheet_api_utils",
     packages=find_packages(),
-    install_requires=requirements
+    install_requires=requirements,
+    extras_require={
+        'async': ['aiohttp']
+    }
 )
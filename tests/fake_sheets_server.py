@@ -0,0 +1,336 @@
+"""
+In-memory stand-in for the Google Sheets v4 REST API, served over HTTP on localhost.
+Point a client at it with ``api_endpoint=server.url`` and ``creds_path=None``.
+Latency, 429/503 responses and payload size limits can be configured to test retries and benchmark the client.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+_RANGE_RE = re.compile(r"^(?:'((?:[^']|'')+)'|([^!]+))(?:!(.*))?$")
+_CELLS_RE = re.compile(r'^([A-Za-z]*)(\d*)(?::([A-Za-z]*)(\d*))?$')
+
+
+def _col_to_index(letters: str) -> int:
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + ord(char) - 64
+    return index
+
+
+def _index_to_col(index: int) -> str:
+    letters = ''
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def parse_range(range_: str) -> tuple:
+    """
+    Parses A1 notation into (title, start_row, start_col, end_row, end_col), 1-based and inclusive.
+    Unbounded sides are None.
+    """
+    match = _RANGE_RE.match(range_)
+    title = match.group(1).replace("''", "'") if match.group(1) else match.group(2)
+    cells = match.group(3)
+    if not cells:
+        return title, None, None, None, None
+    col1, row1, col2, row2 = _CELLS_RE.match(cells).groups()
+    if col2 is None and row2 is None:
+        col2, row2 = col1, row1
+    return (
+        title,
+        int(row1) if row1 else None, _col_to_index(col1) if col1 else None,
+        int(row2) if row2 else None, _col_to_index(col2) if col2 else None,
+    )
+
+
+class FakeSpreadsheet:
+    def __init__(self, sheets: dict):
+        self.sheets = []
+        self.next_id = 0
+        for title, values in sheets.items():
+            self.add_sheet(title, values)
+
+    def add_sheet(self, title: str, values: list = None, rows: int = 1000, cols: int = 26) -> dict:
+        values = [list(row) for row in (values or [])]
+        sheet = {
+            'properties': {
+                'sheetId': self.next_id,
+                'title': title,
+                'index': len(self.sheets),
+                'gridProperties': {
+                    'rowCount': max(rows, len(values)),
+                    'columnCount': max([cols] + [len(row) for row in values]),
+                },
+            },
+            'values': values,
+        }
+        self.next_id += 1
+        self.sheets.append(sheet)
+        return sheet
+
+    def sheet(self, title: str = None, sheet_id: int = None) -> dict:
+        for sheet in self.sheets:
+            properties = sheet['properties']
+            if properties['title'] == title or (sheet_id is not None and properties['sheetId'] == sheet_id):
+                return sheet
+        raise KeyError(title if title is not None else sheet_id)
+
+    def read(self, range_: str, major_dimension: str = None) -> dict:
+        title, r1, c1, r2, c2 = parse_range(range_)
+        sheet = self.sheet(title)
+        grid = sheet['properties']['gridProperties']
+        r1, c1 = r1 or 1, c1 or 1
+        r2, c2 = r2 or grid['rowCount'], c2 or grid['columnCount']
+        rows = [list(row[c1 - 1:c2]) for row in sheet['values'][r1 - 1:r2]]
+        if major_dimension == 'COLUMNS':
+            width = max([len(row) for row in rows] + [0])
+            rows = [[row[i] if i < len(row) else '' for row in rows] for i in range(width)]
+        rows = [self.__rstrip(row) for row in rows]
+        while rows and not rows[-1]:
+            rows.pop()
+        quoted = "'" + title.replace("'", "''") + "'"
+        result = {
+            'range': f'{quoted}!{_index_to_col(c1)}{r1}:{_index_to_col(c2)}{r2}',
+            'majorDimension': major_dimension or 'ROWS',
+        }
+        if rows:
+            result['values'] = rows
+        return result
+
+    def write(self, range_: str, values: list, major_dimension: str = None) -> dict:
+        title, r1, c1, _, _ = parse_range(range_)
+        sheet = self.sheet(title)
+        r1, c1 = r1 or 1, c1 or 1
+        if major_dimension == 'COLUMNS':
+            height = max([len(col) for col in values] + [0])
+            values = [[col[i] if i < len(col) else None for col in values] for i in range(height)]
+        cells = 0
+        for i, row in enumerate(values):
+            for j, value in enumerate(row):
+                if value is not None:
+                    self.set_cell(sheet, r1 + i, c1 + j, value)
+                    cells += 1
+        return {'updatedRange': range_, 'updatedRows': len(values), 'updatedCells': cells}
+
+    def append(self, range_: str, values: list) -> dict:
+        title = parse_range(range_)[0]
+        sheet = self.sheet(title)
+        start = len(sheet['values']) + 1
+        for i, row in enumerate(values):
+            for j, value in enumerate(row):
+                self.set_cell(sheet, start + i, 1 + j, value)
+        return {'updates': {'updatedRows': len(values), 'updatedRange': f'{title}!A{start}'}}
+
+    @staticmethod
+    def set_cell(sheet: dict, row: int, col: int, value) -> None:
+        data = sheet['values']
+        while len(data) < row:
+            data.append([])
+        while len(data[row - 1]) < col:
+            data[row - 1].append('')
+        data[row - 1][col - 1] = value
+        grid = sheet['properties']['gridProperties']
+        grid['rowCount'] = max(grid['rowCount'], row)
+        grid['columnCount'] = max(grid['columnCount'], col)
+
+    def batch_update(self, requests: list) -> dict:
+        replies = []
+        for request in requests:
+            if 'addSheet' in request:
+                title = request['addSheet'].get('properties', {}).get('title') or f'Sheet{self.next_id + 1}'
+                sheet = self.add_sheet(title)
+                replies.append({'addSheet': {'properties': sheet['properties']}})
+            elif 'deleteSheet' in request:
+                self.sheets.remove(self.sheet(sheet_id=request['deleteSheet']['sheetId']))
+                replies.append({})
+            elif 'updateSheetProperties' in request:
+                properties = request['updateSheetProperties']['properties']
+                self.sheet(sheet_id=properties['sheetId'])['properties']['title'] = properties['title']
+                replies.append({})
+            elif 'updateCells' in request:
+                grid_range = request['updateCells']['range']
+                sheet = self.sheet(sheet_id=grid_range['sheetId'])
+                for row in sheet['values'][grid_range['startRowIndex']:grid_range['endRowIndex']]:
+                    for col in range(grid_range['startColumnIndex'], min(grid_range['endColumnIndex'], len(row))):
+                        row[col] = ''
+                replies.append({})
+            else:
+                raise ValueError(f'Unsupported request: {list(request)}')
+        return {'replies': replies}
+
+    @staticmethod
+    def __rstrip(row: list) -> list:
+        while row and row[-1] in ('', None):
+            row.pop()
+        return row
+
+
+class FakeSheetsServer:
+    """
+    Serves FakeSpreadsheet objects. Every handled call is recorded in ``calls`` as (method, path)
+    and its parsed query string in ``queries``.
+    "POST /token" is an OAuth token endpoint for service account credentials with "token_uri" = url + "/token".
+    """
+
+    def __init__(
+            self, spreadsheets: dict = None, latency: float = 0.0, error_rate: float = 0.0,
+            max_request_bytes: int = None, max_response_bytes: int = None, seed: int = 0
+    ):
+        """
+        :param spreadsheets: Spreadsheet ID -> {worksheet title -> matrix}.
+        :param latency: Delay of every response in seconds.
+        :param error_rate: Share of requests randomly answered with 429 or 503.
+        :param max_request_bytes: Requests with a larger body are rejected with 400.
+        :param max_response_bytes: Responses with a larger body are replaced with 400.
+        :param seed: Seed of the random error injection.
+        """
+        self.spreadsheets = {key: FakeSpreadsheet(value) for key, value in (spreadsheets or {}).items()}
+        self.calls = []
+        self.queries = []
+        # Authorization headers of the Sheets API calls and the number of issued tokens.
+        self.authorizations = []
+        self.issued_tokens = 0
+        self.token_lifetime = 3600
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_request_bytes = max_request_bytes
+        self.max_response_bytes = max_response_bytes
+        self.faults = deque()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self.__make_handler())
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        self.thread = None
+
+    def start(self) -> 'FakeSheetsServer':
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'FakeSheetsServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def inject(self, status: int, count: int = 1, retry_after: float = None) -> None:
+        """
+        Answers the next "count" requests with the error status (for example 429 or 503).
+        """
+        for _ in range(count):
+            self.faults.append((status, retry_after))
+
+    def next_fault(self) -> tuple:
+        if self.faults:
+            return self.faults.popleft()
+        if self.error_rate and self.random.random() < self.error_rate:
+            return self.random.choice((429, 503)), None
+        return None, None
+
+    @staticmethod
+    def error(status: int, message: str) -> dict:
+        reasons = {400: 'INVALID_ARGUMENT', 429: 'RESOURCE_EXHAUSTED', 503: 'UNAVAILABLE'}
+        return {'error': {'code': status, 'message': message, 'status': reasons.get(status, 'UNKNOWN')}}
+
+    def handle(self, method: str, path: str, query: dict, body: dict) -> tuple:
+        match = re.match(r'^/v4/spreadsheets/([^/:]+)(.*)$', path)
+        if not match or match.group(1) not in self.spreadsheets:
+            return 404, {'error': {'code': 404, 'message': 'Requested entity was not found.'}}
+        book, rest = self.spreadsheets[match.group(1)], match.group(2)
+        dimension = query.get('majorDimension', [None])[0]
+        if method == 'GET' and rest == '':
+            return 200, {'sheets': [{'properties': sheet['properties']} for sheet in book.sheets]}
+        if method == 'POST' and rest == ':batchUpdate':
+            return 200, book.batch_update(body.get('requests', []))
+        if method == 'GET' and rest == '/values:batchGet':
+            ranges = query.get('ranges', [])
+            return 200, {'valueRanges': [book.read(range_, dimension) for range_ in ranges]}
+        if method == 'POST' and rest == '/values:batchUpdate':
+            responses = [book.write(item['range'], item['values'], item.get('majorDimension')) for item in body['data']]
+            return 200, {
+                'totalUpdatedCells': sum(response['updatedCells'] for response in responses),
+                'responses': responses,
+            }
+        if method == 'POST' and rest.startswith('/values/') and rest.endswith(':append'):
+            return 200, book.append(unquote(rest[len('/values/'):-len(':append')]), body['values'])
+        if method == 'GET' and rest.startswith('/values/'):
+            return 200, book.read(unquote(rest[len('/values/'):]), dimension)
+        return 400, {'error': {'code': 400, 'message': f'Unsupported call: {method} {path}'}}
+
+    def __make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.__dispatch('GET')
+
+            def do_POST(self):
+                self.__dispatch('POST')
+
+            def __dispatch(self, method):
+                url = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                headers = {}
+                with server.lock:
+                    server.calls.append((method, unquote(url.path)))
+                    server.queries.append(parse_qs(url.query))
+                    if url.path != '/token':
+                        server.authorizations.append(self.headers.get('Authorization'))
+                    fault, retry_after = server.next_fault()
+                    if fault:
+                        status, payload = fault, server.error(fault, 'Injected error.')
+                        if retry_after is not None:
+                            headers['Retry-After'] = str(retry_after)
+                    elif url.path == '/token':
+                        server.issued_tokens += 1
+                        status, payload = 200, {
+                            'access_token': f'token-{server.issued_tokens}', 'token_type': 'Bearer',
+                            'expires_in': server.token_lifetime,
+                        }
+                    elif server.max_request_bytes is not None and length > server.max_request_bytes:
+                        status, payload = 400, server.error(
+                            400, f'Request payload size exceeds the limit: {server.max_request_bytes} bytes.'
+                        )
+                    else:
+                        try:
+                            body = json.loads(raw) if raw else {}
+                            status, payload = server.handle(method, url.path, parse_qs(url.query), body)
+                        except (KeyError, ValueError) as error:
+                            status, payload = 400, server.error(400, str(error))
+                data = json.dumps(payload).encode()
+                if server.max_response_bytes is not None and len(data) > server.max_response_bytes:
+                    status = 400
+                    data = json.dumps(server.error(
+                        400, f'Response size exceeds the limit: {server.max_response_bytes} bytes.'
+                    )).encode()
+                if server.latency:
+                    time.sleep(server.latency)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
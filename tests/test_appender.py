@@ -0,0 +1,125 @@
+import queue
+import threading
+
+import pytest
+
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.retry import RetryBudget, RetryPolicy
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def append_calls(server):
+    return [call for call in server.calls if call[1].endswith(':append')]
+
+
+def test_rows_from_many_threads_are_batched():
+    with FakeSheetsServer({SPREADSHEET: {'log': [['thread', 'number']]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        with google.appender(SPREADSHEET, 'log', max_rows=100, max_delay=5) as appender:
+            threads = [
+                threading.Thread(target=appender.append_many, args=([[str(t), str(n)] for n in range(50)],))
+                for t in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert appender.sent_rows == 400 and not appender.errors
+        assert len(append_calls(server)) == 4
+        rows = google.get_all_info_from_sheet(SPREADSHEET, 'log')
+        assert len(rows) == 401
+        assert sorted(rows[1:]) == sorted([str(t), str(n)] for t in range(8) for n in range(50))
+
+
+def test_flush_and_time_threshold():
+    with FakeSheetsServer({SPREADSHEET: {'log': []}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        appender = google.appender(SPREADSHEET, 'log', max_delay=60)
+        appender.append(['a'])
+        appender.flush()
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'log') == [['a']]
+        appender.close()
+        with pytest.raises(RuntimeError):
+            appender.append(['b'])
+        with pytest.raises(RuntimeError):
+            appender.flush()
+
+        with google.appender(SPREADSHEET, 'log', max_delay=0.05) as appender:
+            appender.append(['b'])
+            for _ in range(100):
+                if appender.sent_rows:
+                    break
+                threading.Event().wait(0.01)
+            assert appender.sent_rows == 1
+
+
+def test_backpressure():
+    with FakeSheetsServer({SPREADSHEET: {'log': []}}, latency=0.2) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        with google.appender(SPREADSHEET, 'log', max_rows=1, max_delay=0, queue_size=1) as appender:
+            appender.append(['a'])
+            appender.append(['b'])
+            with pytest.raises(queue.Full):
+                appender.append(['c'], timeout=0.01)
+
+
+def test_rows_put_during_close_are_sent():
+    with FakeSheetsServer({SPREADSHEET: {'log': []}}, latency=0.05) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        appender = google.appender(SPREADSHEET, 'log', max_rows=10, max_delay=0, queue_size=5)
+        accepted = []
+
+        def produce(number):
+            for index in range(20):
+                try:
+                    appender.append([f'{number}-{index}'])
+                except RuntimeError:
+                    return
+                accepted.append(index)
+
+        threads = [threading.Thread(target=produce, args=(number,)) for number in range(4)]
+        for thread in threads:
+            thread.start()
+        appender.close()
+        for thread in threads:
+            thread.join()
+        assert appender.sent_rows == len(accepted) and not appender.errors
+        assert len(google.get_all_info_from_sheet(SPREADSHEET, 'log') or []) == len(accepted)
+
+
+def test_failed_batches_are_reported():
+    failed = []
+    policy = RetryPolicy(retries=1, budget=RetryBudget())
+    with FakeSheetsServer({SPREADSHEET: {'log': []}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url, retry_policy=policy)
+        with google.appender(SPREADSHEET, 'missing', on_error=lambda rows, error: failed.append(rows)) as appender:
+            appender.append(['a'])
+        with google.appender(SPREADSHEET, 'missing') as appender:
+            appender.append(['b'])
+    assert failed == [[['a']]]
+    assert appender.errors[0][0] == [['b']]
+
+
+def test_append_updates_row_count():
+    rows = [[str(number)] for number in range(1000)]
+    with FakeSheetsServer({SPREADSHEET: {'log': rows}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        assert google.rows_count(SPREADSHEET, 'log') == 1000
+        google.append_rows(SPREADSHEET, 'log', [['a'], ['b']])
+        assert google.rows_count(SPREADSHEET, 'log') == 1002
+        assert list(google.iter_rows(SPREADSHEET, 'log', window=300)) == rows + [['a'], ['b']]
+
+
+def test_append_is_not_repeated_after_a_server_error():
+    policy = RetryPolicy(base_delay=0.001, budget=RetryBudget())
+    with FakeSheetsServer({SPREADSHEET: {'log': []}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url, retry_policy=policy)
+        server.inject(503)
+        with pytest.raises(Exception):
+            google.append_rows(SPREADSHEET, 'log', [['a']])
+        server.inject(429)
+        google.append_rows(SPREADSHEET, 'log', [['b']])
+        assert len(append_calls(server)) == 3
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'log') == [['b']]
@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+from google_sheets_utils.async_client import AsyncGoogleSheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def make_server():
+    return FakeSheetsServer({SPREADSHEET: {
+        'read': [['Name', 'Price'], ['a', '1'], ['b', '2']],
+        'write': [],
+    }})
+
+
+def test_reads_and_metadata():
+    async def scenario(google):
+        async with google:
+            assert await google.get_sheets_name(SPREADSHEET) == ['read', 'write']
+            assert await google.get_all_info_from_sheet(SPREADSHEET, 'read') == [['Name', 'Price'], ['a', '1'], ['b', '2']]
+            assert await google.get_data_by_column_name(SPREADSHEET, 'read', 'price') == ['Price', '1', '2']
+            assert await google.get_sheet_id_by_name(SPREADSHEET, 'write') == 1
+
+    with make_server() as server:
+        run(scenario(AsyncGoogleSheets(None, api_endpoint=server.url)))
+        assert [call for call in server.calls if call[1] == f'/v4/spreadsheets/{SPREADSHEET}'] == \
+               [('GET', f'/v4/spreadsheets/{SPREADSHEET}')]
+
+
+def test_concurrent_fan_out_is_capped():
+    async def scenario(google):
+        async with google:
+            cells = [google.update_sheet(SPREADSHEET, f'write!A{row}', [[row]]) for row in range(1, 201)]
+            await asyncio.gather(*cells)
+            return await google.get_all_info_from_sheet(SPREADSHEET, 'write')
+
+    with make_server() as server:
+        values = run(scenario(AsyncGoogleSheets(None, max_concurrency=8, pool_size=8, api_endpoint=server.url)))
+        assert [row[0] for row in values] == list(range(1, 201))
+
+
+def test_structure_changes_patch_cache():
+    async def scenario(google):
+        async with google:
+            await google.create_new_sheet(SPREADSHEET, 'new')
+            await google.rename_sheet(SPREADSHEET, 'write', 'renamed')
+            return await google.get_sheets_name(SPREADSHEET)
+
+    with make_server() as server:
+        assert run(scenario(AsyncGoogleSheets(None, api_endpoint=server.url))) == ['read', 'renamed', 'new']
+
+
+def test_update_by_indices_keeps_order_and_size_limits():
+    async def scenario(google):
+        async with google:
+            indices = [{'row': 1, 'col': 1, 'data': [[value]]} for value in range(10)]
+            await google.update_sheet_by_indices(SPREADSHEET, 'write', indices, chunk_size=1, coalesce=False)
+            first = await google.get_all_info_from_sheet(SPREADSHEET, 'write')
+            block = [{'row': 2, 'col': 1, 'data': [[str(row)] * 10 for row in range(100)]}]
+            responses = await google.update_sheet_by_indices(SPREADSHEET, 'write', block, max_cells=300)
+            return first, responses, await google.get_all_info_from_sheet(SPREADSHEET, 'write')
+
+    with FakeSheetsServer({SPREADSHEET: {'write': []}}, latency=0.01) as server:
+        first, responses, values = run(scenario(AsyncGoogleSheets(None, api_endpoint=server.url)))
+    assert first == [[9]]
+    assert len(responses) == 4
+    assert values[1:] == [[str(row)] * 10 for row in range(100)]
+
+
+def test_overlapping_blocks_are_written_in_order():
+    first = [['first'] * 40 for _ in range(40)]
+    second = [['second'] * 40 for _ in range(40)]
+    indices = [{'row': 1, 'col': 1, 'data': first}, {'row': 21, 'col': 21, 'data': second}]
+
+    async def scenario(google):
+        async with google:
+            await google.update_sheet_by_indices(SPREADSHEET, 'write', indices, chunk_size=1)
+            return await google.get_all_info_from_sheet(SPREADSHEET, 'write')
+
+    with FakeSheetsServer({SPREADSHEET: {'write': []}}, latency=0.05) as server:
+        started = time.perf_counter()
+        values = run(scenario(AsyncGoogleSheets(None, api_endpoint=server.url)))
+        elapsed = time.perf_counter() - started
+    assert values[30][30] == 'second'
+    # Two writes and a read, one after another.
+    assert elapsed >= 0.15
@@ -0,0 +1,66 @@
+import pytest
+
+from google_sheets_utils.buid import GoogleSheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def batch_update_calls(server):
+    return [call for call in server.calls if call[1].endswith('values:batchUpdate')]
+
+
+def test_writes_are_merged_into_one_request():
+    with FakeSheetsServer({SPREADSHEET: {'first': [], 'second': []}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        with google.batch_writer(SPREADSHEET) as writer:
+            for row in range(1, 301):
+                writer.update_sheet(f'first!A{row}', [['status']])
+            writer.update_sheet_by_indices('second', [{'col': 2, 'row': 3, 'data': [['x']]}])
+        assert len(batch_update_calls(server)) == 1
+        assert len(google.get_all_info_from_sheet(SPREADSHEET, 'first')) == 300
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'second') == [[], [], ['', 'x']]
+
+
+def test_superseded_ranges_are_dropped():
+    with FakeSheetsServer({SPREADSHEET: {'first': []}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        writer = google.batch_writer(SPREADSHEET)
+        writer.update_sheet('first!B2', [['old']])
+        writer.update_sheet('first!A1', [['a', 'b'], ['c', 'new']])
+        writer.update_sheet('first!A1', [['partial']], value_input_option='RAW')
+        writer.flush()
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'first') == [['partial', 'b'], ['c', 'new']]
+        assert len(batch_update_calls(server)) == 2
+        assert len(writer.responses) == 2 and writer.responses[0]['totalUpdatedCells'] == 4
+
+
+def test_size_threshold_triggers_flush():
+    with FakeSheetsServer({SPREADSHEET: {'first': []}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        with google.batch_writer(SPREADSHEET, max_ranges=10) as writer:
+            for row in range(1, 26):
+                writer.update_sheet(f'first!A{row}', [[row]])
+            assert len(batch_update_calls(server)) == 2
+        assert len(batch_update_calls(server)) == 3
+
+
+def test_failed_flush_keeps_the_unsent_writes():
+    with FakeSheetsServer({SPREADSHEET: {'first': []}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        writer = google.batch_writer(SPREADSHEET)
+        writer.update_sheet('first!A1', [['a']])
+        writer.update_sheet('first!B1', [['b']], value_input_option='RAW')
+        server.inject(400)
+        with pytest.raises(Exception):
+            writer.flush()
+        assert len(writer) == 2
+        assert len(writer.flush()) == 2 and len(writer) == 0
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'first') == [['a', 'b']]
+
+        with pytest.raises(KeyError):
+            with google.batch_writer(SPREADSHEET) as writer:
+                writer.update_sheet('first!A2', [['c']])
+                raise KeyError('original error')
+        assert len(writer) == 1
+        assert len(batch_update_calls(server)) == 3
@@ -0,0 +1,50 @@
+from google_sheets_utils.buid import GoogleSheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def batch_update_calls(server):
+    return [call for call in server.calls if call[1].endswith(':batchUpdate')]
+
+
+def test_create_sheets_in_one_request():
+    with FakeSheetsServer({SPREADSHEET: {'main': [['a']]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        assert google.get_sheets_name(SPREADSHEET) == ['main']
+        replies = google.create_sheets(SPREADSHEET, [f'day {n}' for n in range(30)])
+        assert len(batch_update_calls(server)) == 1
+        assert len({reply['addSheet']['properties']['sheetId'] for reply in replies}) == 30
+        calls = len(server.calls)
+        assert google.get_sheets_name(SPREADSHEET) == ['main'] + [f'day {n}' for n in range(30)]
+        assert len(server.calls) == calls
+
+
+def test_max_requests_splits_operations():
+    with FakeSheetsServer({SPREADSHEET: {'main': []}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        replies = google.create_sheets(SPREADSHEET, [str(n) for n in range(5)], max_requests=2)
+        assert len(replies) == 5
+        assert len(batch_update_calls(server)) == 3
+
+
+def test_rename_clear_and_delete_sheets():
+    data = {
+        'a': [['h1', 'h2'], ['1', '2'], ['3', '4']],
+        'b': [['h1'], ['x']],
+        'c': [['h1'], ['y']],
+    }
+    with FakeSheetsServer({SPREADSHEET: data}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        google.rename_sheets(SPREADSHEET, {'a': 'first', 'b': 'second', 'missing': 'x'})
+        assert len(batch_update_calls(server)) == 1
+        assert google.get_sheets_name(SPREADSHEET) == ['first', 'second', 'c']
+
+        google.clear_ranges(SPREADSHEET, [('first', 2, 3, 1, 1), ('second', 1, 2, 1, 1), ('missing', 1, 1, 1, 1)])
+        assert len(batch_update_calls(server)) == 2
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'first') == [['h1', 'h2'], ['', '2'], ['', '4']]
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'second') is None
+
+        google.delete_sheets(SPREADSHEET, ['second', 'c'])
+        assert len(batch_update_calls(server)) == 3
+        assert google.get_sheets_name(SPREADSHEET) == ['first']
@@ -0,0 +1,73 @@
+import time
+
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.chunking import plan_chunks, split_value_range, value_range_size
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def value_range(range_, values, major_dimension='ROWS'):
+    return {'range': range_, 'majorDimension': major_dimension, 'values': values}
+
+
+def batch_update_calls(server):
+    return [call for call in server.calls if call[1].endswith('values:batchUpdate')]
+
+
+def test_chunks_are_limited_by_bytes_and_cells():
+    data = [value_range(f'data!A{row}:C{row}', [['x' * 10] * 3]) for row in range(100, 200)]
+    size = value_range_size(data[0])[0]
+    assert [len(chunk) for chunk in plan_chunks(data, 1000, max_bytes=size * 30)] == [30, 30, 30, 10]
+    assert [len(chunk) for chunk in plan_chunks(data, 1000, max_cells=150)] == [50, 50]
+    assert [len(chunk) for chunk in plan_chunks(data, 40)] == [40, 40, 20]
+
+
+def test_large_block_is_split():
+    block = value_range('data!B2:C101', [[row, row] for row in range(100)])
+    chunks = list(plan_chunks([block], 1000, max_cells=50))
+    assert [chunk[0]['range'] for chunk in chunks] == ['data!B2:C26', 'data!B27:C51', 'data!B52:C76', 'data!B77:C101']
+    columns = split_value_range(value_range('data!A1:D2', [[1, 2], [3, 4], [5, 6], [7, 8]], 'COLUMNS'), 2)
+    assert [piece['range'] for piece in columns] == ['data!A1:B2', 'data!C1:D2']
+
+
+def test_rejected_requests_are_halved():
+    with FakeSheetsServer({SPREADSHEET: {'data': []}}, max_request_bytes=20000) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        indices = [{'row': row * 2 + 1, 'col': 1, 'data': [[f'value {row}'] * 10]} for row in range(500)]
+        responses = google.update_sheet_by_indices(SPREADSHEET, 'data', indices)
+        assert sum(response['totalUpdatedCells'] for response in responses) == 5000
+        assert google.learned_max_bytes is not None
+        rows = google.get_all_info_from_sheet(SPREADSHEET, 'data')
+        assert rows[998] == ['value 499'] * 10
+
+        calls = len(batch_update_calls(server))
+        responses = google.update_sheet_by_indices(SPREADSHEET, 'data', indices)
+        assert len(batch_update_calls(server)) - calls == len(responses)
+
+
+def test_parallel_chunks():
+    with FakeSheetsServer({SPREADSHEET: {'data': []}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        indices = [{'row': row * 2 + 1, 'col': 1, 'data': [[row]]} for row in range(100)]
+        responses = google.update_sheet_by_indices(SPREADSHEET, 'data', indices, chunk_size=10, max_workers=4)
+        assert len(responses) == 10
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data')[198] == [99]
+
+
+def test_overlapping_blocks_are_sent_in_order():
+    spans = []
+
+    def record(event):
+        finished = time.perf_counter()
+        spans.append((finished - event.latency, finished))
+
+    first = [['first'] * 40 for _ in range(40)]
+    second = [['second'] * 40 for _ in range(40)]
+    indices = [{'row': 1, 'col': 1, 'data': first}, {'row': 21, 'col': 21, 'data': second}]
+    with FakeSheetsServer({SPREADSHEET: {'data': []}}, latency=0.05) as server:
+        google = GoogleSheets(None, api_endpoint=server.url, hooks=[record])
+        google.update_sheet_by_indices(SPREADSHEET, 'data', indices, chunk_size=1, max_workers=2)
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data')[30][30] == 'second'
+    writes = sorted(spans[:2])
+    assert writes[0][1] <= writes[1][0]
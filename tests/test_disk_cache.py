@@ -0,0 +1,81 @@
+import os
+import time
+
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.disk_cache import DiskCache
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def read_calls(server):
+    return [call for call in server.calls if call[0] == 'GET' and '/values' in call[1]]
+
+
+def test_cache_survives_restart(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    with FakeSheetsServer({SPREADSHEET: {'data': [['a', 'b'], [1, 2]], 'other': [['x']]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url, disk_cache=DiskCache(path))
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data') == [['a', 'b'], [1, 2]]
+        google.disk_cache.close()
+
+        google = GoogleSheets(None, api_endpoint=server.url, disk_cache=DiskCache(path))
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data') == [['a', 'b'], [1, 2]]
+        assert google.get_many(SPREADSHEET, ['data', 'other']) == {'data': [['a', 'b'], [1, 2]], 'other': [['x']]}
+        assert google.get_many(SPREADSHEET, ['other', 'data'])['other'] == [['x']]
+        assert len(read_calls(server)) == 2
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data', 'UNFORMATTED_VALUE') == [['a', 'b'], [1, 2]]
+        assert len(read_calls(server)) == 3
+
+
+def test_writes_invalidate_the_cache():
+    with FakeSheetsServer({SPREADSHEET: {'data': [['a']], 'other': [['x']]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url, disk_cache=DiskCache(':memory:'))
+        google.get_all_info_from_sheet(SPREADSHEET, 'data')
+        google.get_all_info_from_sheet(SPREADSHEET, 'other')
+        google.update_sheet(SPREADSHEET, 'data!A2', [['b']])
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data') == [['a'], ['b']]
+        google.get_all_info_from_sheet(SPREADSHEET, 'other')
+        assert len(read_calls(server)) == 3
+
+
+def test_ttl_and_size_bound(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache.sqlite'), ttl=0.05, max_bytes=400)
+    cache.set(SPREADSHEET, 'data', None, None, None)
+    assert cache.get(SPREADSHEET, 'data', default='miss') is None
+    time.sleep(0.06)
+    assert cache.get(SPREADSHEET, 'data', default='miss') == 'miss'
+
+    cache.ttl = 60
+    values = [[os.urandom(8).hex() for _ in range(4)]]
+    for number in range(5):
+        cache.set(SPREADSHEET, f'data!A{number + 1}', None, None, values)
+        time.sleep(0.001)
+    cache.get(SPREADSHEET, 'data!A1')
+    cache.set(SPREADSHEET, 'data!A9', None, None, values)
+    assert cache.get(SPREADSHEET, 'data!A1') == values
+    assert cache.get(SPREADSHEET, 'data!A2') is None
+    assert cache.get(SPREADSHEET, 'data!A9') == values
+
+
+def test_read_older_than_an_invalidation_is_not_stored():
+    cache = DiskCache(':memory:')
+    generation = cache.generation(SPREADSHEET)
+    cache.invalidate(SPREADSHEET, 'data')
+    cache.set(SPREADSHEET, 'data', None, None, [['old']], generation)
+    assert cache.get(SPREADSHEET, 'data', default='miss') == 'miss'
+    cache.set(SPREADSHEET, 'data', None, None, [['new']], cache.generation(SPREADSHEET))
+    assert cache.get(SPREADSHEET, 'data') == [['new']]
+
+
+def test_sync_sheet_and_key_index_read_past_the_cache():
+    with FakeSheetsServer({SPREADSHEET: {'data': [['id', 'name'], ['1', 'a']]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url, disk_cache=DiskCache(':memory:'))
+        google.get_all_info_from_sheet(SPREADSHEET, 'data')
+        google.get_many(SPREADSHEET, ['data!A:A'], major_dimension='COLUMNS')
+        # Changed by another writer, the cached copy is stale.
+        server.spreadsheets[SPREADSHEET].sheet('data')['values'] = [['id', 'name'], ['2', 'b'], ['1', 'a']]
+
+        assert google.key_index(SPREADSHEET, 'data', 'id').lookup('1') == 3
+        google.sync_sheet(SPREADSHEET, 'data', [['id', 'name'], ['1', 'a']])
+        assert server.spreadsheets[SPREADSHEET].sheet('data')['values'][:2] == [['id', 'name'], ['1', 'a']]
@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.errors import BadRequestError
+from google_sheets_utils.retry import RetryBudget, RetryPolicy
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def make_client(server):
+    policy = RetryPolicy(base_delay=0.001, budget=RetryBudget())
+    return GoogleSheets(None, api_endpoint=server.url, retry_policy=policy)
+
+
+def test_injected_errors_are_retried():
+    with FakeSheetsServer({SPREADSHEET: {'data': [['a']]}}) as server:
+        google = make_client(server)
+        server.inject(429, retry_after=0)
+        server.inject(503, count=2)
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data') == [['a']]
+        assert len(server.calls) == 4
+
+
+def test_latency():
+    with FakeSheetsServer({SPREADSHEET: {'data': [['a']]}}, latency=0.05) as server:
+        google = make_client(server)
+        started = time.perf_counter()
+        google.get_all_info_from_sheet(SPREADSHEET, 'data')
+        assert time.perf_counter() - started >= 0.05
+
+
+def test_payload_limits():
+    spreadsheets = {SPREADSHEET: {'data': [['a'] * 100]}}
+    with FakeSheetsServer(spreadsheets, max_request_bytes=500, max_response_bytes=300) as server:
+        google = make_client(server)
+        with pytest.raises(BadRequestError):
+            google.get_all_info_from_sheet(SPREADSHEET, 'data')
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data!A1:B1') == [['a', 'a']]
+        with pytest.raises(BadRequestError):
+            google.update_sheet(SPREADSHEET, 'data!A2', [['b'] * 200])
+        google.update_sheet(SPREADSHEET, 'data!A2', [['b'] * 2])
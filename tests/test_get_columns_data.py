@@ -0,0 +1,21 @@
+from google_sheets_utils.buid import GoogleSheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+DATA = [['ASIN', 'Title', 'Price', 'Qty'], ['a1', 't1', '10', '1'], ['a2', 't2', '20']]
+
+
+def test_only_requested_columns_are_fetched():
+    with FakeSheetsServer({SPREADSHEET: {'read': DATA}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        result = google.get_columns_data(SPREADSHEET, 'read', ['price', 'Q ty', 'missing'])
+        assert result == {'price': ['Price', '10', '20'], 'Q ty': ['Qty', '1'], 'missing': None}
+        assert server.calls[-1] == ('GET', f'/v4/spreadsheets/{SPREADSHEET}/values:batchGet')
+
+
+def test_known_header_and_skip_header():
+    with FakeSheetsServer({SPREADSHEET: {'read': DATA}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        result = google.get_columns_data(SPREADSHEET, 'read', ['ASIN'], columns_row=DATA[0], skip_header=True)
+        assert result == {'ASIN': ['a1', 'a2']}
+        assert len(server.calls) == 1
@@ -0,0 +1,34 @@
+from google_sheets_utils.buid import GoogleSheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def make_server():
+    return FakeSheetsServer({SPREADSHEET: {f'tab{i}': [[f'value{i}']] for i in range(20)}})
+
+
+def batch_gets(server):
+    return [call for call in server.calls if call[1].endswith('values:batchGet')]
+
+
+def test_twenty_tabs_in_one_request():
+    with make_server() as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        names = [f'tab{i}' for i in range(20)]
+        result = google.get_all_info_from_sheet(SPREADSHEET, names)
+        assert result == {f'tab{i}': [[f'value{i}']] for i in range(20)}
+        assert len(batch_gets(server)) == 1
+
+
+def test_split_by_url_length_and_cells():
+    with make_server() as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        ranges = [f'tab{i}!A1:B2' for i in range(20)]
+        result = google.get_many(SPREADSHEET, ranges, max_url_length=400)
+        assert list(result) == ranges and result['tab7!A1:B2'] == [['value7']]
+        assert len(batch_gets(server)) > 1
+
+        calls = len(batch_gets(server))
+        google.get_many(SPREADSHEET, ['tab0', 'tab1', 'tab2!A1'], max_cells=26001)
+        assert len(batch_gets(server)) - calls == 2
@@ -0,0 +1,30 @@
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.header_index import HeaderIndex
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def test_lookups():
+    header = HeaderIndex(['ASIN', 'Buy Box\tPrice', 'asin', 'Qty'])
+    assert header.index('buybox price') == 1
+    assert header.index('asin') == 0 and header.exact_index('asin') == 2
+    assert header.index('missing') is None
+    assert header.indices({'price': 'Buy box price', 'qty': 'QTY', 'x': 'nope'}) == {'price': 1, 'qty': 3}
+
+
+def test_header_is_cached_and_invalidated_by_row_one_writes():
+    with FakeSheetsServer({SPREADSHEET: {'read': [['Name', 'Price'], ['a', '1']]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        for _ in range(100):
+            assert google.get_column_index_by_name(SPREADSHEET, 'read', 'price') == 1
+        header_reads = lambda: len([call for call in server.calls if call[1].endswith('read!1:1')])
+        assert header_reads() == 1
+
+        google.update_sheet(SPREADSHEET, 'read!A5', [['not a header']])
+        assert google.get_column_index_by_column_name(SPREADSHEET, 'read', 'Price') == 1
+        assert header_reads() == 1
+
+        google.update_sheet(SPREADSHEET, 'read!A1', [['Price', 'Name']])
+        assert google.get_column_index_by_name(SPREADSHEET, 'read', 'price') == 0
+        assert header_reads() == 2
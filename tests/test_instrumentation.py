@@ -0,0 +1,77 @@
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.instrumentation import MetricsAggregator, span
+from google_sheets_utils.retry import RetryBudget, RetryPolicy
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def make_client(server, hooks):
+    policy = RetryPolicy(base_delay=0.001, budget=RetryBudget())
+    return GoogleSheets(None, api_endpoint=server.url, retry_policy=policy, hooks=hooks)
+
+
+def test_events_describe_every_attempt():
+    events = []
+    with FakeSheetsServer({SPREADSHEET: {'data': [['a', 'b']], 'other': []}}) as server:
+        google = make_client(server, [events.append])
+        server.inject(503)
+        with span('job'):
+            google.get_all_info_from_sheet(SPREADSHEET, ['data!A1:B2', 'other!A1'])
+        google.update_sheet(SPREADSHEET, 'data!A2', [['c']])
+
+    failed, read, write = events
+    assert (failed.attempt, failed.status, read.attempt, read.status) == (1, 503, 2, 200)
+    assert failed.error is not None and read.error is None
+    assert read.method == 'get_many' and read.api_method == 'sheets.spreadsheets.values.batchGet'
+    assert read.span == 'job' and read.spreadsheet == SPREADSHEET and read.ranges == 2
+    assert read.response_bytes > 0 and read.latency > 0
+    assert write.method == 'update_sheet' and write.kind == 'write' and write.ranges == 1
+    assert write.span is None and write.request_bytes > len('data!A2')
+
+
+def test_metrics_aggregator():
+    metrics = MetricsAggregator()
+    with FakeSheetsServer({SPREADSHEET: {'data': [['a']]}}) as server:
+        google = make_client(server, [metrics])
+        server.inject(429, count=2)
+        for _ in range(10):
+            google.get_all_info_from_sheet(SPREADSHEET, 'data')
+        google.rows_count(SPREADSHEET, 'data')
+
+    summary = metrics.summary()
+    reads = summary['get_all_info_from_sheet']
+    assert (reads['count'], reads['errors'], reads['retries'], reads['quota_cost']) == (12, 2, 2, 12)
+    assert 0 < reads['p50'] <= reads['p95'] <= reads['p99']
+    assert summary['rows_count']['count'] == 1
+    assert '"p99"' in metrics.dump()
+
+
+def test_failing_hook_does_not_fail_the_request(caplog):
+    events = []
+
+    def broken(event):
+        raise ValueError('hook bug')
+
+    with FakeSheetsServer({SPREADSHEET: {'data': [['a']]}}) as server:
+        google = make_client(server, [broken, events.append])
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data') == [['a']]
+    assert len(events) == 1
+    assert 'hook bug' in caplog.text
+
+
+def test_worker_threads_keep_the_caller_and_span():
+    events = []
+    with FakeSheetsServer({SPREADSHEET: {'data': [], 'other': [['x']]}}) as server:
+        google = make_client(server, [events.append])
+        indices = [{'row': row, 'col': 1, 'data': [[row]]} for row in range(1, 7)]
+        with span('job'):
+            google.update_sheet_by_indices(SPREADSHEET, 'data', indices, max_cells=2, max_workers=3)
+            google.map(lambda name: google.get_all_info_from_sheet(SPREADSHEET, name), ['data', 'other'])
+            list(google.iter_rows(SPREADSHEET, 'other', window=1, prefetch=True))
+
+    methods = [(event.method, event.span) for event in events if event.api_method.endswith('values.batchUpdate')]
+    assert methods and set(methods) == {('update_sheet_by_indices', 'job')}
+    reads = [(event.method, event.span) for event in events if event.api_method.endswith('values.get')]
+    assert ('get_all_info_from_sheet', 'job') in reads and ('iter_rows', 'job') in reads
+    assert all(method is not None and label == 'job' for method, label in reads)
@@ -0,0 +1,43 @@
+from google_sheets_utils.buid import GoogleSheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+ROWS = [[str(i)] for i in range(1, 24)]
+ROWS[5:10] = [[], [], [], [], []]
+ROWS[12] = []
+
+
+def make_server():
+    server = FakeSheetsServer({SPREADSHEET: {'big': ROWS}})
+    server.spreadsheets[SPREADSHEET].sheets[0]['properties']['gridProperties']['rowCount'] = 30
+    return server
+
+
+def test_rows_are_read_in_windows():
+    with make_server() as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        assert list(google.iter_rows(SPREADSHEET, 'big', window=5)) == ROWS
+        reads = [path for method, path in server.calls if '/values/' in path]
+        assert reads[0].endswith('big!1:5') and len(reads) == 6
+
+
+def test_batches_without_prefetch():
+    with make_server() as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        batches = list(google.iter_rows(SPREADSHEET, 'big', window=10, batches=True, prefetch=False))
+        assert [len(batch) for batch in batches] == [5, 15, 3]
+        assert sum(batches, []) == ROWS
+
+
+def test_write_past_the_grid_refreshes_the_row_count():
+    with FakeSheetsServer({SPREADSHEET: {'data': [['h']]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        assert google.rows_count(SPREADSHEET, 'data') == 1000
+        google.update_sheet(SPREADSHEET, 'data!A2', [['inside']])
+        metadata_reads = server.calls.count(('GET', f'/v4/spreadsheets/{SPREADSHEET}'))
+        assert google.rows_count(SPREADSHEET, 'data') == 1000
+        assert server.calls.count(('GET', f'/v4/spreadsheets/{SPREADSHEET}')) == metadata_reads
+
+        google.update_sheet(SPREADSHEET, 'data!A1500', [['late']])
+        rows = list(google.iter_rows(SPREADSHEET, 'data', window=500))
+        assert rows[0] == ['h'] and rows[-1] == ['late'] and len(rows) == 1500
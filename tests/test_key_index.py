@@ -0,0 +1,86 @@
+import pytest
+
+from google_sheets_utils.buid import GoogleSheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def data():
+    return {'products': [['ASIN', 'title', 'price'], ['B1', 'one', '1'], ['B2', 'two', '2'], ['', 'empty', '']]}
+
+
+def test_lookup_reads_only_the_key_column():
+    with FakeSheetsServer({SPREADSHEET: data()}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        assert google.lookup(SPREADSHEET, 'products', 'ASIN', 'B2') == 3
+        assert google.lookup(SPREADSHEET, 'products', 'ASIN', 'B9') is None
+        index = google.key_index(SPREADSHEET, 'products', 'ASIN')
+        assert len(index) == 2 and 'B1' in index
+        # The header row and the key column.
+        assert len(server.calls) == 2
+
+
+def test_upsert_updates_in_place_and_appends_new_keys():
+    with FakeSheetsServer({SPREADSHEET: data()}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        google.upsert_rows(SPREADSHEET, 'products', 'ASIN', [['B2', 'two', '20'], ['B3', 'three', '3']])
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'products') == [
+            ['ASIN', 'title', 'price'], ['B1', 'one', '1'], ['B2', 'two', '20'], ['', 'empty'],
+            ['B3', 'three', '3'],
+        ]
+        calls = len(server.calls)
+        # The appended key is indexed from the append response, no re-read of the sheet.
+        google.upsert_rows(SPREADSHEET, 'products', 'ASIN', [['B3', 'three', '30'], ['B1', 'one', '10']])
+        writes = server.calls[calls:]
+        assert len(writes) == 1 and writes[0][1].endswith(':batchUpdate')
+        assert google.lookup(SPREADSHEET, 'products', 'ASIN', 'B3') == 5
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'products')[4] == ['B3', 'three', '30']
+
+
+def test_index_by_position_and_rows_without_key():
+    with FakeSheetsServer({SPREADSHEET: data()}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        index = google.key_index(SPREADSHEET, 'products', 1)
+        assert index.lookup('two') == 3 and index.lookup('empty') == 4
+        with pytest.raises(ValueError):
+            index.upsert([['B4']])
+
+
+def test_structural_change_drops_the_index():
+    with FakeSheetsServer({SPREADSHEET: data()}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        index = google.key_index(SPREADSHEET, 'products', 'ASIN')
+        google.create_sheets(SPREADSHEET, ['other'])
+        assert google.key_index(SPREADSHEET, 'products', 'ASIN') is not index
+
+
+def test_value_writes_drop_the_index():
+    with FakeSheetsServer({SPREADSHEET: data()}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        assert google.lookup(SPREADSHEET, 'products', 'ASIN', 'B2') == 3
+        google.update_sheet(SPREADSHEET, 'products!B2:C3', [['1', '1'], ['2', '2']])
+        calls = len(server.calls)
+        assert google.lookup(SPREADSHEET, 'products', 'ASIN', 'B2') == 3
+        assert len(server.calls) == calls
+        # A key renamed twice by plain writes, then a row added behind the index.
+        google.update_sheet(SPREADSHEET, 'products!A3', [['B5']])
+        google.update_sheet_by_indices(SPREADSHEET, 'products', [{'row': 3, 'col': 1, 'data': [['B6']]}])
+        google.append_rows(SPREADSHEET, 'products', [['B7', 'seven', '7']])
+        assert google.lookup(SPREADSHEET, 'products', 'ASIN', 'B2') is None
+        assert google.lookup(SPREADSHEET, 'products', 'ASIN', 'B5') is None
+        assert google.lookup(SPREADSHEET, 'products', 'ASIN', 'B6') == 3
+        assert google.lookup(SPREADSHEET, 'products', 'ASIN', 'B7') == 5
+
+
+def test_duplicate_keys_are_reported():
+    sheet = data()
+    sheet['products'].append(['B1', 'again', '5'])
+    with FakeSheetsServer({SPREADSHEET: sheet}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        index = google.key_index(SPREADSHEET, 'products', 'ASIN')
+        assert index.lookup('B1') == 2 and index.duplicates == {'B1': [2, 5]}
+        with pytest.raises(ValueError, match='B1'):
+            index.upsert([['B1', 'one', '10']])
+        index.upsert([['B2', 'two', '20']])
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'products')[1] == ['B1', 'one', '1']
@@ -0,0 +1,51 @@
+import time
+
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.metadata import SHEETS_PROPERTIES_FIELDS, MetadataCache
+from tests.fake_sheets_server import FakeSheetsServer
+
+SHEETS = [
+    {'sheetId': 0, 'title': 'read', 'gridProperties': {'rowCount': 1000, 'columnCount': 26}},
+    {'sheetId': 1, 'title': 'write', 'gridProperties': {'rowCount': 1000, 'columnCount': 26}},
+]
+
+
+def test_ttl_expiry():
+    cache = MetadataCache(ttl=0.01)
+    cache.set('spreadsheet', SHEETS)
+    assert cache.get('spreadsheet') == SHEETS
+    time.sleep(0.02)
+    assert cache.get('spreadsheet') is None
+
+
+def test_lru_eviction():
+    cache = MetadataCache(max_size=2)
+    cache.set('a', SHEETS)
+    cache.set('b', SHEETS)
+    cache.get('a')
+    cache.set('c', SHEETS)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_write_through_patches():
+    cache = MetadataCache()
+    cache.set('spreadsheet', SHEETS)
+    cache.add_sheet('spreadsheet', {'sheetId': 7, 'title': 'new'})
+    cache.rename_sheet('spreadsheet', 0, 'renamed')
+    cache.remove_sheet('spreadsheet', 1)
+    assert [sheet['title'] for sheet in cache.get('spreadsheet')] == ['renamed', 'new']
+    assert SHEETS[0]['title'] == 'read'
+
+
+def test_name_based_calls_share_one_metadata_request():
+    tabs = ['main', 'a', 'b', 'c', 'd']
+    with FakeSheetsServer({'spreadsheet': {tab: [['x']] for tab in tabs}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        for tab in tabs[1:]:
+            assert google.clear_range('spreadsheet', 1, 2, 1, 2, sheet_name=tab) is not None
+        metadata = [
+            query for call, query in zip(server.calls, server.queries) if call == ('GET', '/v4/spreadsheets/spreadsheet')
+        ]
+        assert len(metadata) == 1
+        assert metadata[0]['fields'] == [SHEETS_PROPERTIES_FIELDS]
@@ -0,0 +1,87 @@
+from google_sheets_utils.bodies import collect_values_body
+from google_sheets_utils.planner import coalesce_indices, plan_blocks
+
+
+def test_column_of_cells_becomes_one_block():
+    indices = [{'col': 1, 'row': row, 'data': [['hello']]} for row in range(1, 2754)]
+    blocks = coalesce_indices(indices)
+    assert len(blocks) == 1
+    body = collect_values_body(blocks, 'write', 'USER_ENTERED', 'ROWS')
+    assert body['data'][0]['range'] == 'write!A1:A2753'
+
+
+def test_horizontal_and_rectangular_merge():
+    indices = [
+        {'col': 1, 'row': 1, 'data': [['a']]},
+        {'col': 2, 'row': 1, 'data': [['b']]},
+        {'col': 1, 'row': 2, 'data': [['c', 'd']]},
+        {'col': 5, 'row': 2, 'data': [['far']]},
+    ]
+    assert coalesce_indices(indices) == [
+        {'row': 1, 'col': 1, 'data': [['a', 'b'], ['c', 'd']]},
+        {'row': 2, 'col': 5, 'data': [['far']]},
+    ]
+
+
+def test_later_entry_wins_and_columns_are_transposed():
+    indices = [
+        {'col': 2, 'row': 3, 'data': [['x', 'y', 'z']]},
+        {'col': 2, 'row': 4, 'data': [['new'], ['right']]},
+    ]
+    assert coalesce_indices(indices, 'COLUMNS') == [
+        {'row': 3, 'col': 2, 'data': [['x']]},
+        {'row': 4, 'col': 2, 'data': [['new', 'right']]},
+        {'row': 5, 'col': 2, 'data': [['z']]},
+    ]
+
+
+def test_end_range_is_exact():
+    body = collect_values_body([{'col': 2, 'row': 3, 'data': [[1, 2, 3], [4, 5, 6]]}], 'w', 'RAW', 'ROWS')
+    assert body['data'][0]['range'] == 'w!B3:D4'
+    body = collect_values_body([{'col': 2, 'row': 3, 'data': [[1, 2, 3]]}], 'w', 'RAW', 'COLUMNS')
+    assert body['data'][0]['range'] == 'w!B3:B5'
+
+
+def test_large_entries_pass_through():
+    block = [[f'{row}:{col}' for col in range(20)] for row in range(100)]
+    blocks = coalesce_indices([{'row': 1, 'col': 1, 'data': block}, {'row': 200, 'col': 1, 'data': [['a']]}])
+    assert blocks[0]['data'] is block
+    assert blocks[1] == {'row': 200, 'col': 1, 'data': [['a']]}
+
+    columns = coalesce_indices([{'row': 2, 'col': 3, 'data': block}], 'COLUMNS')
+    assert columns == [{'row': 2, 'col': 3, 'data': [list(row) for row in zip(*block)]}]
+
+    ragged = [['a', None, 'c']] * 600 + [['short']]
+    assert coalesce_indices([{'row': 1, 'col': 1, 'data': ragged}])[0]['data'] is ragged
+
+
+def test_small_entries_keep_their_order_around_large_blocks():
+    block = [['big'] * 10 for _ in range(200)]
+    indices = [
+        {'row': 5, 'col': 2, 'data': [['before']]},
+        {'row': 1, 'col': 1, 'data': block},
+        {'row': 6, 'col': 2, 'data': [['after']]},
+        {'row': 500, 'col': 1, 'data': [['far']]},
+    ]
+    blocks = coalesce_indices(indices)
+    assert blocks[0] == {'row': 5, 'col': 2, 'data': [['before']]}
+    assert blocks[1]['data'] is block
+    assert blocks[2:] == [{'row': 6, 'col': 2, 'data': [['after']]}, {'row': 500, 'col': 1, 'data': [['far']]}]
+
+
+def test_plan_reports_overlapping_blocks():
+    first = [['first'] * 40 for _ in range(40)]
+    second = [['second'] * 40 for _ in range(40)]
+    blocks, disjoint = plan_blocks([{'row': 1, 'col': 1, 'data': first}, {'row': 21, 'col': 21, 'data': second}])
+    assert [block['data'] for block in blocks] == [first, second] and not disjoint
+
+    blocks, disjoint = plan_blocks([{'row': 1, 'col': 1, 'data': first}, {'row': 41, 'col': 1, 'data': second}])
+    assert disjoint
+    # Small cells written before and after a large block that covers them.
+    _, disjoint = plan_blocks([
+        {'row': 5, 'col': 5, 'data': [['before']]},
+        {'row': 1, 'col': 1, 'data': first},
+        {'row': 6, 'col': 6, 'data': [['after']]},
+    ])
+    assert not disjoint
+    assert plan_blocks([{'row': row, 'col': 1, 'data': [['a', 'b']]} for row in range(1, 50)])[1]
@@ -0,0 +1,73 @@
+import pytest
+
+from google_sheets_utils.bodies import collect_values_body
+from google_sheets_utils.ranges import (
+    cells_to_a1, column_to_index, contains, format_range, format_ranges, index_to_column, intersect, parse_range,
+    quote_sheet, tiles, union
+)
+
+
+def test_columns_round_trip():
+    for index in (1, 26, 27, 52, 702, 703, 18278, 18279, 20000):
+        assert column_to_index(index_to_column(index)) == index
+    assert [index_to_column(index) for index in (1, 26, 27, 702, 703, 18278)] == ['A', 'Z', 'AA', 'ZZ', 'AAA', 'ZZZ']
+    assert column_to_index('ab') == 28
+
+
+def test_cells_to_a1_matches_per_cell_encoding():
+    pairs = [(row, col) for row in (1, 9, 10, 1000) for col in (1, 26, 27, 18278, 20000)]
+    assert cells_to_a1(pairs) == [index_to_column(col) + str(row) for row, col in pairs]
+    assert cells_to_a1(iter([(3, 2)])) == ['B3']
+
+
+def test_sheet_names_are_quoted():
+    assert quote_sheet('Sheet1') == 'Sheet1'
+    assert quote_sheet('My sheet') == "'My sheet'"
+    assert quote_sheet("Bob's") == "'Bob''s'"
+    assert quote_sheet('A1') == "'A1'" and quote_sheet('R1C1') == "'R1C1'"
+    for sheet in ('Sheet1', 'My sheet', "Bob's", 'A1'):
+        range_ = format_range(sheet, 2, 1, 3, 4)
+        assert parse_range(range_) == (sheet, 2, 1, 3, 4)
+    assert quote_sheet("'My sheet'") == "'My sheet'" and quote_sheet("'Bob''s'") == "'Bob''s'"
+    assert format_range("'My sheet'", 1, 1, 2, 3) == "'My sheet'!A1:C2"
+    assert quote_sheet("'Bob's'") == "'''Bob''s'''"
+
+
+def test_format_range_round_trips_unbounded_sides():
+    for parsed in (('data', None, None, None, None), ('data', 1, None, 1, None), ('data', None, 2, None, 2),
+                   ('data', 2, 3, None, 3), ('data', 5, 1, 5, 1)):
+        assert parse_range(format_range(*parsed)) == parsed
+    assert format_range('data', 1, None, 1, None) == 'data!1:1'
+    assert format_range(None, 1, 1, 2, 2) == 'A1:B2'
+    assert format_ranges('My sheet', [(1, 1, 2, 3), (4, 20000, 4, 20000)]) == [
+        "'My sheet'!A1:C2", f"'My sheet'!{index_to_column(20000)}4:{index_to_column(20000)}4"
+    ]
+
+
+def test_collect_values_body_quotes_the_sheet():
+    body = collect_values_body([{'row': 2, 'col': 2, 'data': [['a', 'b']]}], "Bob's list", 'RAW', 'ROWS')
+    assert body['data'][0]['range'] == "'Bob''s list'!B2:C2"
+
+
+def test_range_algebra():
+    block = ('data', 1, 1, 10, 5)
+    assert contains(('data', None, None, None, None), block)
+    assert contains(block, ('data', 2, 2, 3, 3)) and not contains(block, ('data', 2, 2, 11, 3))
+    assert not contains(block, ('other', 2, 2, 3, 3))
+    assert intersect(block, ('data', 5, 4, 20, 9)) == ('data', 5, 4, 10, 5)
+    assert intersect(block, ('data', None, 3, None, 3)) == ('data', 1, 3, 10, 3)
+    assert intersect(block, ('data', 11, 1, 12, 1)) is None
+    assert union(block, ('data', 12, 7, 12, 7)) == ('data', 1, 1, 12, 7)
+    assert union(block, ('data', None, 7, None, 7)) == ('data', 1, 1, None, 7)
+    assert union(block, ('other', 1, 1, 1, 1)) is None
+
+
+def test_tiles_cover_the_range_once():
+    range_ = ('data', 2, 3, 11, 9)
+    parts = list(tiles(range_, 4, 3))
+    assert parts[0] == ('data', 2, 3, 5, 5) and parts[-1] == ('data', 10, 9, 11, 9)
+    cells = [(row, col) for _, r1, c1, r2, c2 in parts for row in range(r1, r2 + 1) for col in range(c1, c2 + 1)]
+    assert sorted(cells) == [(row, col) for row in range(2, 12) for col in range(3, 10)]
+    assert list(tiles(range_, 100)) == [range_]
+    with pytest.raises(ValueError):
+        list(tiles(('data', None, 1, None, 1), 10))
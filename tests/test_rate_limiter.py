@@ -0,0 +1,77 @@
+import fcntl
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from google_sheets_utils.rate_limiter import FileTokenBucket, QuotaLimiter, TokenBucket
+
+
+def test_bucket_spaces_requests_after_burst():
+    bucket = TokenBucket(rate=100, capacity=2)
+    delays = [bucket.reserve() for _ in range(5)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2:] == sorted(delays[2:]) and 0.01 < delays[-1] <= 0.03
+
+
+def test_bucket_is_thread_safe():
+    bucket = TokenBucket(rate=1, capacity=800)
+    threads = [threading.Thread(target=lambda: [bucket.reserve() for _ in range(100)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert 0 < bucket.reserve() <= 1.0
+
+
+def test_limiter_keeps_read_and_write_apart():
+    limiter = QuotaLimiter(read_per_minute=60, write_per_minute=60, user_read_per_minute=None,
+                           user_write_per_minute=None, burst=0)
+    assert limiter.reserve('read') == 0.0
+    assert limiter.reserve('write') == 0.0
+    assert limiter.reserve('read') > 0.9
+
+
+def _spend(path, count):
+    bucket = FileTokenBucket(path, rate=1, capacity=10)
+    for _ in range(count):
+        bucket.reserve()
+
+
+def test_file_bucket_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'quota')
+    processes = [multiprocessing.Process(target=_spend, args=(path, 5)) for _ in range(4)]
+    started = time.time()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    with FileTokenBucket(path, rate=1, capacity=10) as bucket:
+        delay = bucket.reserve()
+    # 21 tokens from a bucket of 10 refilled at 1 per second; the upper bound leaves room for slow process starts.
+    assert 10 < delay + (time.time() - started) < 20
+
+
+def _reserve_and_report(bucket, done):
+    bucket.reserve()
+    done.set()
+
+
+def test_forked_child_does_not_share_the_file_lock(tmp_path):
+    context = multiprocessing.get_context('fork')
+    bucket = FileTokenBucket(str(tmp_path / 'quota'), rate=1, capacity=10)
+    done = context.Event()
+    fcntl.flock(bucket._fd, fcntl.LOCK_EX)
+    child = context.Process(target=_reserve_and_report, args=(bucket, done))
+    child.start()
+    try:
+        assert not done.wait(0.5)
+    finally:
+        fcntl.flock(bucket._fd, fcntl.LOCK_UN)
+    assert done.wait(10)
+    child.join()
+    bucket.close()
+    bucket.close()
+    with pytest.raises(ValueError):
+        bucket.reserve()
@@ -0,0 +1,89 @@
+import asyncio
+from ssl import SSLError
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from google_sheets_utils.errors import NotFoundError, RetriesExhaustedError
+from google_sheets_utils.retry import RetryBudget, RetryPolicy
+
+
+def http_error(status, **headers):
+    return HttpError(httplib2.Response(dict(status=status, **headers)), b'{}')
+
+
+class Flaky:
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+def test_transient_errors_are_retried():
+    attempt = Flaky(http_error(429), http_error(503), SSLError('bad record mac'))
+    assert RetryPolicy(base_delay=0.001, budget=RetryBudget()).run(attempt) == 'ok'
+    assert attempt.calls == 4
+
+
+def test_final_errors_are_typed():
+    attempt = Flaky(http_error(404))
+    with pytest.raises(NotFoundError):
+        RetryPolicy(budget=RetryBudget()).run(attempt)
+    assert attempt.calls == 1
+
+
+def test_exhausted_retries_raise_instead_of_returning_none():
+    attempt = Flaky(*[http_error(500)] * 3)
+    with pytest.raises(RetriesExhaustedError) as info:
+        RetryPolicy(retries=3, base_delay=0.001, budget=RetryBudget()).run(attempt)
+    assert info.value.attempts == 3 and info.value.last_error.status_code == 500
+
+
+def test_retry_budget_stops_retry_storm():
+    policy = RetryPolicy(base_delay=0.001, budget=RetryBudget(ratio=0, min_per_second=0, capacity=2))
+    with pytest.raises(RetriesExhaustedError) as info:
+        policy.run(Flaky(*[http_error(503)] * 5))
+    assert info.value.budget_exhausted and info.value.attempts == 3
+
+
+def test_retry_after_is_honored():
+    policy = RetryPolicy(base_delay=100)
+    assert policy.backoff(1, http_error(429, **{'retry-after': '0.25'})) == 0.25
+    assert 0 <= policy.backoff(3, http_error(503)) <= 32
+    assert policy.backoff(1, http_error(429, **{'retry-after': '3600'})) == 32
+
+
+def test_non_idempotent_requests_are_retried_only_when_not_applied():
+    policy = RetryPolicy(base_delay=0.001, budget=RetryBudget())
+    for error in (http_error(503), TimeoutError('read timed out'), ConnectionResetError()):
+        attempt = Flaky(error)
+        with pytest.raises(Exception):
+            policy.run(attempt, idempotent=False)
+        assert attempt.calls == 1
+    attempt = Flaky(http_error(429), ConnectionRefusedError(), httplib2.ServerNotFoundError('dns'))
+    assert policy.run(attempt, idempotent=False) == 'ok'
+    assert attempt.calls == 4
+
+
+def test_only_network_os_errors_are_retried():
+    attempt = Flaky(FileNotFoundError('creds.json'))
+    with pytest.raises(FileNotFoundError):
+        RetryPolicy(base_delay=0.001, budget=RetryBudget()).run(attempt)
+    assert attempt.calls == 1
+    attempt = Flaky(ConnectionResetError(), TimeoutError())
+    assert RetryPolicy(base_delay=0.001, budget=RetryBudget()).run(attempt) == 'ok'
+
+
+def test_async_run():
+    attempt = Flaky(http_error(502))
+
+    async def call():
+        return attempt()
+
+    assert asyncio.run(RetryPolicy(base_delay=0.001, budget=RetryBudget()).run_async(call)) == 'ok'
@@ -0,0 +1,184 @@
+import asyncio
+import threading
+
+import pytest
+
+from google_sheets_utils.async_client import AsyncGoogleSheets
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.single_flight import AsyncSingleFlight, SingleFlight, copy_values
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def make_server(**kwargs):
+    return FakeSheetsServer({SPREADSHEET: {'data': [['Name', 'Price'], ['a', '1']]}}, **kwargs)
+
+
+def value_reads(server):
+    return [call for call in server.calls if '/values/' in call[1]]
+
+
+def run_threads(function, count=10):
+    results, errors = [None] * count, [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(number):
+        barrier.wait()
+        try:
+            results[number] = function()
+        except Exception as error:
+            errors[number] = error
+
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_reads_share_one_request():
+    with make_server(latency=0.3) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        results, errors = run_threads(lambda: google.get_all_info_from_sheet(SPREADSHEET, 'data'))
+        assert errors == [None] * 10
+        assert len(value_reads(server)) == 1
+        assert all(result == [['Name', 'Price'], ['a', '1']] for result in results)
+        # Every caller can change its rows.
+        assert len({id(row) for result in results for row in result}) == 20
+
+        # Completed reads are never reused.
+        google.get_all_info_from_sheet(SPREADSHEET, 'data')
+        assert len(value_reads(server)) == 2
+
+
+def test_concurrent_reads_share_the_exception():
+    with make_server(latency=0.3) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        server.inject(403)
+        results, errors = run_threads(lambda: google.get_all_info_from_sheet(SPREADSHEET, 'data'))
+        assert len(value_reads(server)) == 1
+        assert all(error is errors[0] for error in errors) and errors[0] is not None
+
+
+def test_disabled():
+    with make_server(latency=0.2) as server:
+        google = GoogleSheets(None, api_endpoint=server.url, single_flight=False)
+        run_threads(lambda: google.get_all_info_from_sheet(SPREADSHEET, 'data'), count=4)
+        assert len(value_reads(server)) == 4
+
+
+def test_forget_starts_a_new_call():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append('slow')
+        started.set()
+        release.wait()
+        return 'old'
+
+    leader = threading.Thread(target=flight.do, args=(('spreadsheet', 'get', 'A1'), slow))
+    leader.start()
+    started.wait()
+    flight.forget('other')
+    assert len(flight) == 1
+    flight.forget('spreadsheet')
+    assert flight.do(('spreadsheet', 'get', 'A1'), lambda: 'new') == 'new'
+    release.set()
+    leader.join()
+    assert calls == ['slow'] and len(flight) == 0
+
+
+def test_async_reads_share_one_request():
+    async def scenario(google):
+        async with google:
+            first = [google.get_all_info_from_sheet(SPREADSHEET, 'data') for _ in range(10)]
+            names = [google.get_sheets_name(SPREADSHEET) for _ in range(10)]
+            return await asyncio.gather(*first, *names)
+
+    with make_server(latency=0.2) as server:
+        results = asyncio.run(scenario(AsyncGoogleSheets(None, api_endpoint=server.url)))
+        assert results[:10] == [[['Name', 'Price'], ['a', '1']]] * 10 and results[10:] == [['data']] * 10
+        assert len(value_reads(server)) == 1
+        assert server.calls.count(('GET', f'/v4/spreadsheets/{SPREADSHEET}')) == 1
+
+
+def test_async_cancelled_caller_does_not_cancel_others():
+    async def scenario(google):
+        async with google:
+            first = asyncio.ensure_future(google.get_all_info_from_sheet(SPREADSHEET, 'data'))
+            await asyncio.sleep(0.05)
+            second = asyncio.ensure_future(google.get_all_info_from_sheet(SPREADSHEET, 'data'))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+    with make_server(latency=0.3) as server:
+        values = asyncio.run(scenario(AsyncGoogleSheets(None, api_endpoint=server.url)))
+        assert values == [['Name', 'Price'], ['a', '1']]
+        assert len(value_reads(server)) == 1
+
+
+def test_leader_changes_do_not_reach_the_followers():
+    flight = SingleFlight()
+    release = threading.Event()
+    shared = [['a', 'b']]
+
+    def read():
+        release.wait()
+        return shared
+
+    def call(mutate):
+        values = flight.do('key', read, copy_values)
+        if mutate:
+            values[0][0] = 'MUTATED'
+            values.append(['extra'])
+        return values
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(call(True)), daemon=True)
+    followers = [threading.Thread(target=lambda: results.append(call(False)), daemon=True) for _ in range(3)]
+    try:
+        leader.start()
+        while not len(flight):
+            threading.Event().wait(0.001)
+        for thread in followers:
+            thread.start()
+        while flight._calls['key'].followers < 3:
+            threading.Event().wait(0.001)
+    finally:
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+    assert sorted(results) == [[['MUTATED', 'b'], ['extra']]] + [[['a', 'b']]] * 3
+    assert shared == [['a', 'b']]
+    # A call nobody joined returns the result itself.
+    assert flight.do('other', lambda: shared, copy_values) is shared
+
+
+def test_async_leader_changes_do_not_reach_the_followers():
+    shared = [['a', 'b']]
+
+    async def read():
+        await asyncio.sleep(0.01)
+        return shared
+
+    async def call(flight, mutate):
+        values = await flight.do('key', read, copy_values)
+        if mutate:
+            values[0][0] = 'MUTATED'
+            values.append(['extra'])
+        return values
+
+    async def scenario():
+        flight = AsyncSingleFlight()
+        return await asyncio.gather(call(flight, True), call(flight, False), call(flight, False))
+
+    results = asyncio.run(scenario())
+    assert results == [[['MUTATED', 'b'], ['extra']], [['a', 'b']], [['a', 'b']]]
+    assert shared == [['a', 'b']]
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+from google_sheets_utils.buid import GoogleSheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+HEAVY_MODULES = ('gspread', 'googleapiclient.discovery', 'google.oauth2.service_account', 'google_auth_httplib2')
+
+
+def test_import_does_not_load_heavy_modules():
+    script = (
+        'import sys, google_sheets_utils, google_sheets_utils.buid\n'
+        f'print([name for name in {HEAVY_MODULES!r} if name in sys.modules])'
+    )
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '[]'
+
+
+def test_lazy_package_attributes():
+    import google_sheets_utils
+
+    assert google_sheets_utils.GoogleSheets is GoogleSheets
+    assert google_sheets_utils.NotFoundError.__name__ == 'NotFoundError'
+
+
+def test_service_is_built_lazily_and_shared():
+    with FakeSheetsServer({'spreadsheet': {'data': [['a']]}}) as server:
+        first = GoogleSheets(None, api_endpoint=server.url)
+        assert first._resources is None
+        assert first.get_all_info_from_sheet('spreadsheet', 'data') == [['a']]
+        second = GoogleSheets(None, api_endpoint=server.url)
+        assert second.service is first.service
@@ -0,0 +1,91 @@
+import pytest
+
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.sync import align_by_key, diff_matrices
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+TABLE = [['id', 'name', 'qty']] + [[str(i), f'item {i}', str(i * 10)] for i in range(1, 201)]
+
+
+def batch_update_calls(server):
+    return [call for call in server.calls if call[1].endswith('values:batchUpdate')]
+
+
+def test_diff_matrices():
+    old = [['a', 'b', 'c'], ['d', 'e'], ['f']]
+    new = [['a', 'x', 'y'], ['d', 'e', 'z']]
+    assert diff_matrices(old, new) == [
+        {'row': 1, 'col': 2, 'data': [['x', 'y']]},
+        {'row': 2, 'col': 3, 'data': [['z']]},
+        {'row': 3, 'col': 1, 'data': [['']]},
+    ]
+    assert diff_matrices([['1', '2']], [[1, 2]]) == []
+    assert diff_matrices([['TRUE', 'FALSE', '1', '2.5']], [[True, False, 1.0, 2.5]]) == []
+    assert diff_matrices([[True, 1]], [['TRUE', 1.0]]) == []
+    assert diff_matrices([['1']], [[True]]) == [{'row': 1, 'col': 1, 'data': [[True]]}]
+
+
+def test_align_by_key():
+    old = [['id', 'v'], ['a', '1'], ['b', '2'], ['c', '3']]
+    new = [['id', 'v'], ['c', '30'], ['d', '4'], ['a', '1']]
+    assert align_by_key(old, new, 0) == [['id', 'v'], ['a', '1'], [], ['c', '30'], ['d', '4']]
+    with pytest.raises(ValueError, match="'a'"):
+        align_by_key(old + [['a', '5']], new, 0)
+    with pytest.raises(ValueError, match="'c'"):
+        align_by_key(old, new + [['c', '31']], 0)
+
+
+def test_only_changed_cells_are_written():
+    with FakeSheetsServer({SPREADSHEET: {'data': TABLE}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        new = [list(row) for row in TABLE[:-2]]
+        new[10][2] = 'changed'
+        new[11][2] = 'changed'
+        new[50][1] = 'renamed'
+        responses = google.sync_sheet(SPREADSHEET, 'data', new)
+        assert sum(response['totalUpdatedCells'] for response in responses) == 3 + 2 * 3
+        assert len(batch_update_calls(server)) == 1
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data') == new
+        assert google.sync_sheet(SPREADSHEET, 'data', new) == []
+        assert len(batch_update_calls(server)) == 1
+
+
+def test_sync_by_key():
+    with FakeSheetsServer({SPREADSHEET: {'data': TABLE[:4]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        new = [['id', 'name', 'qty'], ['3', 'item 3', '35'], ['9', 'item 9', '90'], ['1', 'item 1', '10']]
+        google.sync_sheet(SPREADSHEET, 'data', new, key='ID')
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data') == [
+            ['id', 'name', 'qty'], ['1', 'item 1', '10'], [], ['3', 'item 3', '35'], ['9', 'item 9', '90'],
+        ]
+
+
+def test_snapshot_skips_the_read():
+    with FakeSheetsServer({SPREADSHEET: {'data': TABLE[:3]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        new = [list(row) for row in TABLE[:3]]
+        new[1][2] = '11'
+        google.sync_sheet(SPREADSHEET, 'data', new, snapshot_ttl=60)
+        reads = len(server.calls) - len(batch_update_calls(server))
+        new[2][2] = '22'
+        google.sync_sheet(SPREADSHEET, 'data', new, snapshot_ttl=60)
+        assert len(server.calls) - len(batch_update_calls(server)) == reads
+        google.update_sheet(SPREADSHEET, 'data!A1', [['other']])
+        google.sync_sheet(SPREADSHEET, 'data', new, snapshot_ttl=60)
+        assert len(server.calls) - len(batch_update_calls(server)) == reads + 1
+        assert google.get_all_info_from_sheet(SPREADSHEET, 'data') == new
+
+
+def test_typed_values_are_not_rewritten():
+    new = [['id', 'active', 'qty', 'price'], [1, True, 3.0, 2.5], [2, False, 4.0, None]]
+    with FakeSheetsServer({SPREADSHEET: {'data': [['id', 'active', 'qty', 'price']]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        assert len(google.sync_sheet(SPREADSHEET, 'data', new)) == 1
+        # The API renders the written cells as strings when they are read back.
+        server.spreadsheets[SPREADSHEET].sheet('data')['values'] = [
+            ['id', 'active', 'qty', 'price'], ['1', 'TRUE', '3', '2.5'], ['2', 'FALSE', '4']
+        ]
+        writes = len(batch_update_calls(server))
+        assert google.sync_sheet(SPREADSHEET, 'data', new) == []
+        assert len(batch_update_calls(server)) == writes
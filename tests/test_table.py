@@ -0,0 +1,42 @@
+import math
+from array import array
+
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.table import Table
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def test_ragged_rows_are_padded():
+    table = Table([['Name', 'Price', 'Comment'], ['a', 1], ['b'], ['c', 3, 'x', 'extra']])
+    assert len(table) == 3 and table.width == 4
+    assert table['name'] == ('a', 'b', 'c')
+    assert table[' PRICE '] == (1, '', 3)
+    assert table.row(1) == ['b', '', '', '']
+    assert table.to_list()[0] == ['Name', 'Price', 'Comment', '']
+    assert table.columns_indices({'price': 'Price', 'missing': 'Nope'}) == {'price': 1}
+
+
+def test_numeric_columns_are_converted_lazily():
+    table = Table([['id', 'qty', 'flag'], [1, 2.5, True], [2, '', False]], numeric=True)
+    assert isinstance(table['id'], array) and list(table['id']) == [1.0, 2.0]
+    qty = table['qty']
+    assert qty[0] == 2.5 and math.isnan(qty[1])
+    assert table['flag'] == (True, False)
+    assert table['qty'] is qty
+
+
+def test_columns_major_dimension():
+    table = Table([['id', 1, 2], [], ['v', 'x']], 'COLUMNS')
+    assert table.header == ['id', '', 'v']
+    assert table[1] == ('', '') and table['v'] == ('x', '')
+
+
+def test_get_all_info_from_sheet_as_table():
+    with FakeSheetsServer({SPREADSHEET: {'data': [['id', 'qty'], [1, 10], [2]]}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        table = google.get_all_info_from_sheet(SPREADSHEET, 'data', 'UNFORMATTED_VALUE', as_table=True)
+        assert list(table['id']) == [1.0, 2.0]
+        tables = google.get_all_info_from_sheet(SPREADSHEET, ['data'], as_table=True)
+        assert tables['data']['qty'] == (10, '')
@@ -0,0 +1,27 @@
+import pytest
+
+from google_sheets_utils.buid import GoogleSheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+
+def test_one_client_shared_by_many_threads():
+    sheets = {f'tab{i}': [[f'row{j}', i] for j in range(50)] for i in range(40)}
+    with FakeSheetsServer({SPREADSHEET: sheets}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url, pool_size=4)
+        results = google.map(lambda name: google.get_all_info_from_sheet(SPREADSHEET, name), list(sheets),
+                             max_workers=16)
+        assert results == list(sheets.values())
+        assert google.http_pool.created <= 4
+
+
+def test_map_reraises():
+    with FakeSheetsServer({SPREADSHEET: {'tab': []}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+
+        def fail(item):
+            raise ValueError(item)
+
+        with pytest.raises(ValueError):
+            google.map(fail, [1, 2])
@@ -0,0 +1,114 @@
+import json
+import subprocess
+import sys
+
+import httplib2
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google_auth_httplib2 import Request
+
+from google_sheets_utils import registry
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.token_cache import FileTokenCache
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+
+_WORKER = '''
+import sys
+import httplib2
+from google.oauth2.service_account import Credentials
+from google_auth_httplib2 import Request
+from google_sheets_utils.token_cache import FileTokenCache
+
+creds = Credentials.from_service_account_file(sys.argv[1], scopes=['https://www.googleapis.com/auth/spreadsheets'])
+shared = FileTokenCache(sys.argv[2]).wrap(creds)
+shared.refresh(Request(httplib2.Http()))
+print(shared.token)
+'''
+
+
+@pytest.fixture
+def server():
+    with FakeSheetsServer({SPREADSHEET: {'data': [['a']]}}, latency=0.1) as server:
+        yield server
+
+
+@pytest.fixture
+def creds_path(tmp_path, server):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    path = tmp_path / 'creds.json'
+    path.write_text(json.dumps({
+        'type': 'service_account', 'project_id': 'test', 'private_key_id': '1', 'private_key': pem,
+        'client_email': 'worker@test.iam.gserviceaccount.com', 'client_id': '1',
+        'token_uri': f'{server.url}/token',
+    }))
+    registry.clear()
+    yield str(path)
+    registry.clear()
+
+
+def test_processes_share_one_token(server, creds_path, tmp_path):
+    cache_path = str(tmp_path / 'tokens.json')
+    workers = [
+        subprocess.Popen([sys.executable, '-c', _WORKER, creds_path, cache_path], stdout=subprocess.PIPE, text=True)
+        for _ in range(4)
+    ]
+    tokens = {worker.communicate()[0].strip() for worker in workers}
+    assert tokens == {'token-1'}
+    assert server.issued_tokens == 1
+
+
+def test_clients_take_the_token_from_the_cache(server, creds_path, tmp_path):
+    cache = FileTokenCache(str(tmp_path / 'tokens.json'))
+    first = GoogleSheets(creds_path, api_endpoint=server.url, token_cache=cache)
+    assert first.get_sheets_name(SPREADSHEET) == ['data']
+    # A new process: credentials are not shared with the first client.
+    registry.clear()
+    second = GoogleSheets(creds_path, api_endpoint=server.url, token_cache=cache)
+    second.get_all_info_from_sheet(SPREADSHEET, 'data')
+    assert server.issued_tokens == 1
+    assert server.authorizations == ['Bearer token-1', 'Bearer token-1']
+    assert second.http_pool.creds.network_refreshes == 0
+
+
+def test_token_is_refreshed_ahead_of_expiry_and_after_rejection(server, creds_path, tmp_path):
+    server.token_lifetime = 200
+    cache = FileTokenCache(str(tmp_path / 'tokens.json'), refresh_margin=300)
+    google = GoogleSheets(creds_path, api_endpoint=server.url, token_cache=cache)
+    google.get_sheets_name(SPREADSHEET)
+    google.get_all_info_from_sheet(SPREADSHEET, 'data')
+    # Every token expires within the margin, so each request gets a new one.
+    assert server.authorizations == ['Bearer token-1', 'Bearer token-2']
+
+    server.token_lifetime = 3600
+    shared = google.http_pool.creds
+    shared.refresh(Request(httplib2.Http()))
+    assert shared.token == 'token-3'
+    # The API rejected the cached token: the holder asks the endpoint instead of re-reading the same token.
+    server.inject(401)
+    google.get_all_info_from_sheet(SPREADSHEET, 'data')
+    assert server.authorizations[-2:] == ['Bearer token-3', 'Bearer token-4']
+
+
+def test_clients_of_one_process_share_the_token(server, creds_path):
+    clients = [GoogleSheets(creds_path, api_endpoint=server.url) for _ in range(5)]
+    for google in clients:
+        google.get_all_info_from_sheet(SPREADSHEET, 'data')
+    assert server.issued_tokens == 1
+    assert len({id(google.http_pool.creds) for google in clients}) == 1
+
+
+def test_cache_file_is_private(tmp_path):
+    path = tmp_path / 'tokens.json'
+    cache = FileTokenCache(str(path))
+    with cache.lock():
+        cache.set('key', 'secret', 4102444800.0)
+    assert cache.get('key') == ('secret', 4102444800.0)
+    assert path.stat().st_mode & 0o777 == 0o600
+    assert (tmp_path / 'tokens.json.lock').stat().st_mode & 0o777 == 0o600
+    assert sorted(item.name for item in tmp_path.iterdir()) == ['tokens.json', 'tokens.json.lock']
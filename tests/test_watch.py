@@ -0,0 +1,93 @@
+import threading
+import time
+
+from google_sheets_utils.buid import GoogleSheets
+from google_sheets_utils.disk_cache import DiskCache
+from google_sheets_utils.watch import RowChange, Snapshot, fingerprints, row_fingerprint
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEET = 'spreadsheet'
+INSERTED, MODIFIED, DELETED = RowChange.INSERTED, RowChange.MODIFIED, RowChange.DELETED
+
+
+def make_rows(count):
+    return [['id', 'status']] + [[str(number), 'new'] for number in range(1, count)]
+
+
+def test_fingerprints_are_compact():
+    rows = make_rows(1000)
+    prints = fingerprints(rows)
+    assert prints.typecode == 'Q' and prints.itemsize == 8 and len(prints) == 1000
+    assert row_fingerprint(['a', 'b', '']) == row_fingerprint(['a', 'b'])
+    assert row_fingerprint(['1']) != row_fingerprint([1]) != row_fingerprint(['', '1'])
+
+
+def test_edits_inserts_and_deletes():
+    old = make_rows(10)
+    snapshot = Snapshot(SPREADSHEET, 'data').advance(old)[1]
+
+    edited = [list(row) for row in old]
+    edited[4][1] = 'done'
+    changes, snapshot = snapshot.advance(edited)
+    assert changes == [RowChange(MODIFIED, 5, ['4', 'done'])]
+
+    inserted = edited[:3] + [['new row']] + edited[3:] + [['last']]
+    changes, snapshot = snapshot.advance(inserted)
+    assert changes == [RowChange(INSERTED, 4, ['new row']), RowChange(INSERTED, 12, ['last'])]
+
+    deleted = inserted[:1] + inserted[2:]
+    deleted[5] = ['changed']
+    changes, snapshot = snapshot.advance(deleted)
+    assert changes == [RowChange(DELETED, 2), RowChange(MODIFIED, 6, ['changed'])]
+
+    assert snapshot.advance([])[0] == [RowChange(DELETED, row) for row in range(1, 12)]
+
+
+def test_delete_and_append_of_equal_count_is_not_a_rewrite():
+    old = make_rows(1000)
+    snapshot = Snapshot(SPREADSHEET, 'data').advance(old)[1]
+    new = old[:1] + old[2:] + [['appended', 'new']]
+    changes, snapshot = snapshot.advance(new)
+    assert changes == [RowChange(DELETED, 2), RowChange(INSERTED, 1000, ['appended', 'new'])]
+
+    edited = [list(row) for row in new]
+    edited[10][1], edited[900][1] = 'done', 'done'
+    changes = snapshot.advance(edited)[0]
+    assert changes == [RowChange(MODIFIED, 11, edited[10]), RowChange(MODIFIED, 901, edited[900])]
+
+
+def test_changes_since_reads_the_sheet_once_per_call(tmp_path):
+    with FakeSheetsServer({SPREADSHEET: {'data': make_rows(5)}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url, disk_cache=DiskCache(str(tmp_path / 'cache.db')))
+        snapshot = google.snapshot_range(SPREADSHEET, 'data')
+        assert len(snapshot) == 5
+        assert google.changes_since(snapshot)[0] == []
+
+        # Edited by someone else: the disk cache must not hide the change.
+        server.spreadsheets[SPREADSHEET].sheet('data')['values'][2][1] = 'done'
+        changes, snapshot = google.changes_since(snapshot)
+        assert changes == [RowChange(MODIFIED, 3, ['2', 'done'])]
+        assert len(server.calls) == 3
+
+        changes, _ = google.changes_since(Snapshot(SPREADSHEET, 'data'))
+        assert [change.kind for change in changes] == [INSERTED] * 5
+
+
+def test_watch_range_yields_only_polls_with_changes():
+    with FakeSheetsServer({SPREADSHEET: {'data': make_rows(3)}}) as server:
+        google = GoogleSheets(None, api_endpoint=server.url)
+        stop = threading.Event()
+        watcher = google.watch_range(SPREADSHEET, 'data', interval=0.02, stop=stop)
+        values = server.spreadsheets[SPREADSHEET].sheet('data')['values']
+
+        def edit():
+            time.sleep(0.1)
+            values.append(['3', 'new'])
+
+        threading.Thread(target=edit).start()
+        assert next(watcher) == [RowChange(INSERTED, 4, ['3', 'new'])]
+        stop.set()
+        assert list(watcher) == []
+
+        existing = google.watch_range(SPREADSHEET, 'data', interval=0.01, include_existing=True)
+        assert [change.row for change in next(existing)] == [1, 2, 3, 4]